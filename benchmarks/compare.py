@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""Compare two reports written by ``benchmarks/suite.py``.
+
+    python benchmarks/compare.py before.json after.json
+
+Prints throughput, p95 latency and queries per request for every route,
+with the relative change.
+"""
+
+import argparse
+import json
+import sys
+
+
+def change(before, after):
+    if before is None or after is None:
+        return ""
+    if not before:
+        return "" if not after else "new"
+    return f"{(after - before) / before:+.0%}"
+
+
+def row(name, before, after):
+    cells = [name]
+    for key in ("throughput", "p95_ms", "queries_per_request"):
+        old = before.get(key) if before else None
+        new = after.get(key) if after else None
+        cells.append(f"{old} → {new} {change(old, new)}".strip())
+    return cells
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args(argv)
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    for report, label in ((before, "before"), (after, "after")):
+        meta = report["meta"]
+        print(
+            f"{label}: {meta['revision'] or '?'}{' (dirty)' if meta['dirty'] else ''}"
+            f" {meta['date']}, {meta['samples']} samples, "
+            f"concurrency {meta['concurrency']}"
+        )
+
+    rows = [["route", "req/s", "p95 ms", "queries/request"]]
+    names = list(before["routes"])
+    names += [name for name in after["routes"] if name not in before["routes"]]
+    for name in names:
+        rows.append(row(name, before["routes"].get(name), after["routes"].get(name)))
+    rows.append(row("mix", before["mix"], after["mix"]))
+
+    widths = [max(len(r[i]) for r in rows) for i in range(len(rows[0]))]
+    for r in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(r, widths)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""Closed-loop HTTP load generator.
+
+Each of ``--concurrency`` threads keeps one connection open and requests
+the given paths round-robin for ``--duration`` seconds. Reports throughput
+and latency percentiles, optionally as JSON. When the server sends a
+``Server-Timing`` header (``RequestMetricsMiddleware``), the database
+queries per request are reported too.
+
+    python benchmarks/http_load.py http://localhost:8000 / /samples/ \\
+        --concurrency 16 --duration 30
+"""
+
+import argparse
+import http.client
+import json
+import re
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+# The "db" entry of the Server-Timing header, e.g. db;dur=1.2;desc="3 queries"
+DB_QUERIES = re.compile(r'\bdb;[^,]*desc="(\d+) queries"')
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def worker(base, targets, offset, deadline, results, errors):
+    parts = urlsplit(base)
+    connection_class = (
+        http.client.HTTPSConnection
+        if parts.scheme == "https"
+        else http.client.HTTPConnection
+    )
+    connection = connection_class(parts.netloc, timeout=60)
+    i = offset
+    while time.perf_counter() < deadline:
+        label, path = targets[i % len(targets)]
+        i += 1
+        start = time.perf_counter()
+        for attempt in range(2):
+            try:
+                connection.request("GET", parts.path.rstrip("/") + path)
+                response = connection.getresponse()
+                response.read()
+                break
+            except (OSError, http.client.HTTPException):
+                # A kept-alive connection may have been closed by a worker
+                # restart; retry once on a fresh one, as browsers do.
+                connection.close()
+                connection = connection_class(parts.netloc, timeout=60)
+        else:
+            errors.append(label)
+            continue
+        elapsed = time.perf_counter() - start
+        if response.status >= 400:
+            errors.append(label)
+        match = DB_QUERIES.search(response.getheader("Server-Timing") or "")
+        results.append((label, elapsed, int(match.group(1)) if match else None))
+    connection.close()
+
+
+def summarize(results, duration):
+    latencies = sorted(elapsed for _label, elapsed, _queries in results)
+    queries = [q for _label, _elapsed, q in results if q is not None]
+    return {
+        "requests": len(latencies),
+        "throughput": round(len(latencies) / duration, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "queries_per_request": (
+            round(statistics.fmean(queries), 1) if queries else None
+        ),
+    }
+
+
+def run(base, paths, concurrency, duration, warmup=0):
+    """Load ``base`` with ``paths`` and return the report.
+
+    A path may be given as a ``(label, path)`` pair; results are then
+    grouped by label, e.g. to report many detail pages as one route.
+    """
+    targets = [(p, p) if isinstance(p, str) else tuple(p) for p in paths]
+    if warmup:
+        run(base, targets, concurrency, warmup)
+    results, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=worker, args=(base, targets, n, deadline, results, errors)
+        )
+        for n in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = summarize(results, duration)
+    report["errors"] = len(errors)
+    report["paths"] = {}
+    for label, _path in targets:
+        if label not in report["paths"]:
+            report["paths"][label] = summarize(
+                [result for result in results if result[0] == label], duration
+            )
+            report["paths"][label]["errors"] = errors.count(label)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("base", help="Base URL, e.g. http://localhost:8000")
+    parser.add_argument("paths", nargs="+", help="Paths to request round-robin")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.base, args.paths, args.concurrency, args.duration, args.warmup)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        print(
+            "{requests} requests, {throughput} req/s, p50 {p50_ms} ms, "
+            "p95 {p95_ms} ms, p99 {p99_ms} ms, {errors} errors".format(**report)
+        )
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
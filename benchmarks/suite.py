@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+"""End-to-end load benchmark of the sample_tracker pages.
+
+Seeds the database with ``generate_lab_data`` up to ``--scale`` samples,
+then loads the dashboard and every list, detail and create page of
+``sample_tracker/urls.py`` in turn, followed by a run with all of them
+mixed. Detail routes rotate over ``--objects`` random rows. Writes a JSON
+report that ``benchmarks/compare.py`` compares between commits.
+
+Run it with the settings of the server under test, so that it seeds and
+picks rows from the same database:
+
+    cd src
+    python ../benchmarks/suite.py --scale 100000 --start-server \\
+        --output ../bench-$(git rev-parse --short HEAD).json
+
+Without ``--start-server`` it loads an already running server at
+``--base``; that server needs ``REQUEST_METRICS_SAMPLE_RATE=1`` for
+queries per request to be reported.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(os.path.dirname(BENCHMARKS), "src")
+sys.path[:0] = [BENCHMARKS, SRC]
+
+import http_load  # noqa: E402
+
+SEED_PREFIX = "BENCH"
+# Route name suffixes of the pages under test; edit, delete, export and
+# import pages are left out.
+ROUTE_SUFFIXES = ("_list", "_detail", "_create", "_barcode")
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "reslab_manager.settings")
+    import django
+
+    django.setup()
+
+
+def seed(scale, seed_value):
+    """Generate benchmark rows until there are ``scale`` of them."""
+    from django.core.management import call_command
+
+    from sample_tracker.models import Sample
+
+    existing = Sample.objects.filter(sample_id__startswith=SEED_PREFIX).count()
+    if existing < scale:
+        call_command(
+            "generate_lab_data",
+            samples=scale - existing,
+            studies=max(1, scale // 20_000),
+            seed=seed_value,
+            prefix=SEED_PREFIX,
+        )
+
+
+def sample_pks(model, count, rnd):
+    """Return up to ``count`` random primary keys of ``model``."""
+    from django.db.models import Max, Min
+
+    bounds = model.objects.aggregate(low=Min("pk"), high=Max("pk"))
+    if bounds["low"] is None:
+        return []
+    candidates = {rnd.randint(bounds["low"], bounds["high"]) for _ in range(count * 4)}
+    pks = sorted(model.objects.filter(pk__in=candidates).values_list("pk", flat=True))
+    rnd.shuffle(pks)
+    return pks[:count]
+
+
+def has_template(view_class):
+    """Whether the view's template exists; pages without one only error."""
+    from django.template import TemplateDoesNotExist
+    from django.template.loader import get_template
+
+    try:
+        get_template(view_class.template_name)
+    except TemplateDoesNotExist:
+        return False
+    return True
+
+
+def routes(objects, rnd):
+    """Return ``{route name: [path, ...]}`` for the pages under test.
+
+    Pages whose template does not exist are skipped with a note.
+    """
+    from django.urls import get_resolver, reverse
+
+    from sample_tracker.management.commands.audit_query_plans import iter_patterns
+    from sample_tracker.models import Sample
+
+    targets = {}
+    for name, pattern in iter_patterns(get_resolver().url_patterns):
+        if not name or not name.startswith("sample_tracker:"):
+            continue
+        converters = set(pattern.pattern.converters)
+        if name == "sample_tracker:dashboard_home":
+            targets[name] = [reverse(name)]
+        elif not name.endswith(ROUTE_SUFFIXES) or "import" in name:
+            continue
+        elif not has_template(pattern.callback.view_class):
+            print(f"{name}: template missing, skipped", file=sys.stderr)
+        elif not converters:
+            targets[name] = [reverse(name)]
+        elif converters == {"pk"}:
+            model = pattern.callback.view_class.model
+            pks = sample_pks(model, objects, rnd)
+            targets[name] = [reverse(name, kwargs={"pk": pk}) for pk in pks]
+        elif converters == {"sample_id"}:
+            pks = sample_pks(Sample, objects, rnd)
+            targets[name] = [
+                reverse(name, kwargs={"sample_id": sample_id})
+                for sample_id in Sample.objects.filter(pk__in=pks).values_list(
+                    "sample_id", flat=True
+                )
+            ]
+    return {name: paths for name, paths in targets.items() if paths}
+
+
+def start_server(base):
+    """Start gunicorn from ``src`` and wait until it answers at ``base``."""
+    env = dict(
+        os.environ,
+        GUNICORN_BIND=base.split("://", 1)[1].rstrip("/"),
+        GUNICORN_LOG_LEVEL="warning",
+        REQUEST_METRICS_SAMPLE_RATE="1",
+    )
+    log = tempfile.NamedTemporaryFile(
+        "w", prefix="benchmark-gunicorn-", suffix=".log", delete=False
+    )
+    server = subprocess.Popen(
+        ["gunicorn", "--config", "gunicorn_config.py"],
+        cwd=SRC,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(base + "/status/db/", timeout=5).read()
+            return server
+        except (OSError, urllib.error.URLError):
+            if server.poll() is not None:
+                raise SystemExit(f"gunicorn exited during startup, see {log.name}.")
+            time.sleep(0.5)
+    server.terminate()
+    raise SystemExit(f"Server at {base} did not start, see {log.name}.")
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=BENCHMARKS,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=BENCHMARKS,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return revision, bool(dirty)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--base", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--scale", type=int, default=10_000, help="Samples to seed (default 10000)."
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--no-seed", action="store_true", help="Use the data as is.")
+    parser.add_argument(
+        "--objects",
+        type=int,
+        default=50,
+        help="Rows each detail route rotates over (default 50).",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--duration", type=float, default=5, help="Seconds per route (default 5)."
+    )
+    parser.add_argument(
+        "--mix-duration",
+        type=float,
+        default=30,
+        help="Seconds of the mixed run (default 30).",
+    )
+    parser.add_argument("--warmup", type=float, default=1)
+    parser.add_argument(
+        "--start-server",
+        action="store_true",
+        help="Run gunicorn with gunicorn_config.py for the duration of the run.",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    args = parser.parse_args(argv)
+    base = args.base.rstrip("/")
+
+    setup_django()
+    from django.db import connection
+
+    from sample_tracker.models import Sample
+
+    if not args.no_seed:
+        seed(args.scale, args.seed)
+    samples = Sample.objects.count()
+    targets = routes(args.objects, random.Random(args.seed))
+    # The server holds its own connections; do not keep one open meanwhile.
+    connection.close()
+
+    server = start_server(base) if args.start_server else None
+    try:
+        results = {}
+        for name, paths in targets.items():
+            report = http_load.run(
+                base,
+                [(name, path) for path in paths],
+                args.concurrency,
+                args.duration,
+                args.warmup,
+            )
+            del report["paths"]
+            results[name] = report
+            print(
+                f"{name:45} {report['throughput']:8.1f} req/s  "
+                f"p95 {report['p95_ms']} ms  "
+                f"{report['queries_per_request']} queries  "
+                f"{report['errors']} errors",
+                file=sys.stderr,
+            )
+        mixed = [(name, path) for name, paths in targets.items() for path in paths]
+        random.Random(args.seed).shuffle(mixed)
+        mix = http_load.run(
+            base, mixed, args.concurrency, args.mix_duration, args.warmup
+        )
+        del mix["paths"]
+        print(
+            "mix: {throughput} req/s, p50 {p50_ms} ms, p95 {p95_ms} ms, "
+            "p99 {p99_ms} ms, {errors} errors".format(**mix),
+            file=sys.stderr,
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    revision, dirty = git_revision()
+    report = {
+        "meta": {
+            "revision": revision,
+            "dirty": dirty,
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "samples": samples,
+            "scale": args.scale,
+            "seed": args.seed,
+            "objects": args.objects,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "mix_duration": args.mix_duration,
+            "worker_mode": (
+                os.environ.get("GUNICORN_WORKER_MODE", "sync")
+                if args.start_server
+                else None
+            ),
+        },
+        "routes": results,
+        "mix": mix,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 1 if mix["errors"] or any(r["errors"] for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="is_active",
+            field=models.BooleanField(default=True, verbose_name="active"),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="is_staff",
+            field=models.BooleanField(default=False, verbose_name="staff status"),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="is_superuser",
+            field=models.BooleanField(
+                default=False,
+                help_text="Designates that this user has all permissions without explicitly assigning them.",
+                verbose_name="superuser status",
+            ),
+        ),
+    ]
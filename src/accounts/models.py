@@ -46,18 +46,6 @@ class User(AbstractBaseUser, PermissionsMixin, TimeStampedModel):
     def has_module_perms(self, app_label):
         return self.is_staff
 
-    @property
-    def is_superuser(self):
-        return self.is_staff
-
-    @property
-    def is_active(self):
-        return self.is_active
-
-    @property
-    def is_staff(self):
-        return self.is_staff
-
     @property
     def date_created(self):
         return self.created_at
@@ -1,3 +1,36 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from reslab_manager.testing import QueryBudgetMixin
+
+from .models import User
+
+
+@override_settings(
+    # A fast hasher keeps the render budget about the view, not PBKDF2.
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    REQUEST_METRICS_SAMPLE_RATE=0,
+)
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Hold the login and logout views to a fixed number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user(email="lab@example.org", password="secret")
+
+    def test_login_page(self):
+        self.assertQueryBudget(reverse("accounts:login"), 0)
+
+    def test_login_with_wrong_password(self):
+        # One lookup of the user by email.
+        self.assertQueryBudget(
+            reverse("accounts:login"),
+            1,
+            method="post",
+            data={"username": "lab@example.org", "password": "wrong"},
+        )
+
+    def test_logout(self):
+        self.assertQueryBudget(
+            reverse("accounts:logout"), 0, method="post", status_code=302
+        )
@@ -1,9 +1,120 @@
 # -*- encoding: utf-8 -*-
 
-bind = "0.0.0.0:8000"
-workers = 1
+# Worker settings are read from GUNICORN_* environment variables (see
+# env.sample); anything left unset is sized from the CPUs and memory
+# available to the container.
+#
+#   GUNICORN_WORKER_MODE  sync (default) | gthread | uvicorn
+#   GUNICORN_WORKERS      worker processes (default: sized from CPU/memory)
+#   GUNICORN_THREADS      threads per gthread worker (default: 4)
+#   GUNICORN_WORKER_MEMORY_MB  resident memory budgeted per worker (default: 200)
+#   GUNICORN_MAX_REQUESTS, GUNICORN_MAX_REQUESTS_JITTER  recycle workers
+#   GUNICORN_TIMEOUT      seconds before a silent worker is restarted
+#
+# With PROMETHEUS_MULTIPROC_DIR set, workers write their metrics there and
+# /metrics aggregates them (see reslab_manager/metrics.py).
+
+import glob
+import math
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _cpu_count():
+    """CPUs this process may use, honouring affinity and cgroup quotas."""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            count = min(count, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return count
+
+
+def _memory_bytes():
+    """Memory available to this container, or ``None`` if unknown."""
+    limits = []
+    for path in (
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ):
+        try:
+            with open(path) as f:
+                limits.append(int(f.read().strip()))
+        except (OSError, ValueError):
+            pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    limits.append(int(line.split()[1]) * 1024)
+                    break
+    except (OSError, ValueError):
+        pass
+    return min(limits) if limits else None
+
+
+WORKER_MODE = os.environ.get("GUNICORN_WORKER_MODE", "sync")
+if WORKER_MODE not in ("sync", "gthread", "uvicorn"):
+    raise ValueError(f"Unknown GUNICORN_WORKER_MODE {WORKER_MODE!r}")
+
+cpus = _cpu_count()
+memory = _memory_bytes()
+worker_memory = _env_int("GUNICORN_WORKER_MEMORY_MB", 200) * 1024 * 1024
+
+# Blocking sync workers need extra processes to cover I/O waits; gthread
+# and uvicorn workers overlap I/O inside each process, so one per CPU
+# (plus one) is enough.
+default_workers = 2 * cpus + 1 if WORKER_MODE == "sync" else cpus + 1
+if memory is not None:
+    default_workers = min(default_workers, max(1, memory // worker_memory))
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = _env_int("GUNICORN_WORKERS", default_workers)
+
+if WORKER_MODE == "gthread":
+    worker_class = "gthread"
+    threads = _env_int("GUNICORN_THREADS", 4)
+    wsgi_app = "reslab_manager.wsgi:application"
+elif WORKER_MODE == "uvicorn":
+    worker_class = "uvicorn_worker.UvicornWorker"
+    wsgi_app = "reslab_manager.asgi:application"
+else:
+    worker_class = "sync"
+    wsgi_app = "reslab_manager.wsgi:application"
+
+# Recycle workers periodically to bound memory growth; the jitter stops
+# them all from restarting at once.
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+
 accesslog = "-"  # stdout
 errorlog = "-"  # stdout
-loglevel = "debug"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "debug")
 capture_output = True
 enable_stdio_inheritance = True
+
+
+def on_starting(server):
+    # Metrics files from a previous run would be added to this run's totals.
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        for name in glob.glob(os.path.join(path, "*.db")):
+            os.remove(name)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,32 @@
+# -*- encoding: utf-8 -*-
+
+from django_redis.cache import RedisCache
+
+from .instrumentation import record_cache_lookup
+
+_MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    """Count cache hits and misses for ``RequestMetricsMiddleware``."""
+
+    def get(self, key, default=None, version=None, **kwargs):
+        value = super().get(key, _MISSING, version=version, **kwargs)
+        if value is _MISSING:
+            record_cache_lookup(0, 1)
+            return default
+        record_cache_lookup(1, 0)
+        return value
+
+    def get_many(self, keys, version=None, **kwargs):
+        keys = list(keys)
+        values = super().get_many(keys, version=version, **kwargs)
+        hits = sum(key in values for key in keys)
+        record_cache_lookup(hits, len(keys) - hits)
+        # django-redis returns one shared dict while Redis is unreachable;
+        # callers must not be able to fill it in.
+        return dict(values)
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    pass
@@ -4,9 +4,11 @@ from __future__ import absolute_import, unicode_literals
 
 import os
 
-from celery import Celery
+from celery import Celery, signals
 from django.conf import settings
 
+from . import metrics
+
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "reslab_manager.settings")
 
@@ -18,3 +20,9 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
+
+# Task runtimes and failures for /metrics (see reslab_manager.metrics).
+signals.worker_init.connect(lambda **kwargs: metrics.clear_multiprocess_dir())
+signals.task_prerun.connect(metrics.task_started)
+signals.task_postrun.connect(metrics.task_finished)
+signals.task_failure.connect(metrics.task_failed)
@@ -0,0 +1,126 @@
+# -*- encoding: utf-8 -*-
+
+import contextvars
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import observe_request
+
+logger = logging.getLogger("reslab_manager.requests")
+error_logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """Timings and counters collected while serving one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.total = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper() around the request.
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+    def server_timing(self):
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+                f"tpl;dur={self.template_time * 1000:.1f}",
+                f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+                f"total;dur={self.total * 1000:.1f}",
+            ]
+        )
+
+    def as_dict(self):
+        return {
+            "total_ms": round(self.total * 1000, 1),
+            "db_queries": self.db_queries,
+            "db_ms": round(self.db_time * 1000, 1),
+            "template_ms": round(self.template_time * 1000, 1),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+def record_cache_lookup(hits, misses):
+    """Count cache hits and misses against the current request, if any."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+class RequestMetricsMiddleware:
+    """Measure database, template, cache and total time for each request.
+
+    Metrics are collected for every request, kept on ``request.metrics``
+    and added to the Prometheus metrics served at ``/metrics``; a
+    ``REQUEST_METRICS_SAMPLE_RATE`` fraction of responses also gets a
+    ``Server-Timing`` header and a JSON line on the
+    ``reslab_manager.requests`` logger. Queries run while a streaming
+    response is consumed are not counted. A failure to record metrics is
+    logged and never replaces the response.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = request.metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        metrics.total = time.perf_counter() - metrics.start
+        try:
+            observe_request(request, response, metrics)
+        except Exception:
+            error_logger.exception("Could not record metrics for %s", request.path)
+
+        if random.random() < settings.REQUEST_METRICS_SAMPLE_RATE:
+            response.headers["Server-Timing"] = metrics.server_timing()
+            match = request.resolver_match
+            logger.info(
+                json.dumps(
+                    {
+                        "method": request.method,
+                        "path": request.path,
+                        "route": match.view_name if match else None,
+                        "status": response.status_code,
+                        **metrics.as_dict(),
+                    }
+                )
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        metrics = request.metrics
+        start = time.perf_counter()
+
+        def rendered(response):
+            metrics.template_time += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,147 @@
+# -*- encoding: utf-8 -*-
+
+"""Prometheus metrics for the web tier, the Celery worker and the broker.
+
+Under gunicorn and Celery's prefork pool every process keeps its own
+counters. Point ``PROMETHEUS_MULTIPROC_DIR`` at a directory per service
+(one for the web workers, one for the Celery worker) and list them all in
+``METRICS_MULTIPROC_DIRS`` on the web service; ``/metrics`` then
+aggregates the files every process writes there. Without it ``/metrics``
+only reports the process that serves it.
+"""
+
+import glob
+import logging
+import os
+import time
+
+import redis
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent serving a request.",
+    ["method", "route"],
+)
+REQUESTS = Counter(
+    "http_requests",
+    "Responses served, by status code.",
+    ["method", "route", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run while serving a request.",
+    ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups",
+    "Cache lookups made while serving requests.",
+    ["result"],
+)
+TASK_RUNTIME = Histogram(
+    "celery_task_duration_seconds",
+    "Time spent running a Celery task.",
+    ["task"],
+    buckets=(0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600),
+)
+TASK_FAILURES = Counter(
+    "celery_task_failures",
+    "Celery tasks that raised an exception.",
+    ["task"],
+)
+
+
+def observe_request(request, response, metrics):
+    """Record a finished request measured by ``RequestMetricsMiddleware``."""
+    match = request.resolver_match
+    # Unmatched paths share one label so scanners cannot grow the series.
+    route = match.view_name if match else "unmatched"
+    REQUEST_LATENCY.labels(request.method, route).observe(metrics.total)
+    REQUESTS.labels(request.method, route, response.status_code).inc()
+    REQUEST_DB_QUERIES.labels(route).observe(metrics.db_queries)
+    if metrics.cache_hits:
+        CACHE_LOOKUPS.labels("hit").inc(metrics.cache_hits)
+    if metrics.cache_misses:
+        CACHE_LOOKUPS.labels("miss").inc(metrics.cache_misses)
+
+
+_task_started = {}
+
+
+def task_started(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+def task_finished(task_id=None, task=None, **kwargs):
+    start = _task_started.pop(task_id, None)
+    if start is not None:
+        TASK_RUNTIME.labels(task.name).observe(time.perf_counter() - start)
+
+
+def task_failed(sender=None, **kwargs):
+    TASK_FAILURES.labels(sender.name).inc()
+
+
+class BrokerQueueCollector:
+    """Report the length of each Celery queue when scraped."""
+
+    def collect(self):
+        url = settings.CELERY_BROKER_URL
+        if not url.startswith(("redis://", "rediss://")):
+            return
+        gauge = GaugeMetricFamily(
+            "celery_queue_length",
+            "Messages waiting in a broker queue.",
+            labels=["queue"],
+        )
+        client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        try:
+            for queue in settings.METRICS_CELERY_QUEUES:
+                gauge.add_metric([queue], client.llen(queue))
+        except redis.RedisError:
+            logger.warning("Could not read Celery queue lengths from the broker.")
+            return
+        finally:
+            client.close()
+        yield gauge
+
+
+def clear_multiprocess_dir():
+    """Remove the files left in ``PROMETHEUS_MULTIPROC_DIR`` by a previous run."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        for name in glob.glob(os.path.join(path, "*.db")):
+            os.remove(name)
+
+
+def metrics_view(request):
+    """Serve all metrics in the Prometheus text format."""
+    registry = CollectorRegistry()
+    if settings.METRICS_MULTIPROC_DIRS:
+        for path in settings.METRICS_MULTIPROC_DIRS:
+            multiprocess.MultiProcessCollector(registry, path=path)
+    else:
+        registry.register(_DefaultCollectors())
+    registry.register(BrokerQueueCollector())
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+class _DefaultCollectors:
+    # This process's metrics, without registering the broker collector on
+    # the global registry.
+    def collect(self):
+        return REGISTRY.collect()
@@ -1,21 +1,165 @@
 # -*- encoding: utf-8 -*-
 
-import json
 import logging
 import os
+import queue
+import threading
+import time
 
 import redis
-from django.utils import timezone
 
 
 class RedisHandler(logging.Handler):
-    def __init__(self, host="redis", port=6379, password="", key="reslab_manager:logs"):
+    """Ship formatted log records to a Redis list without blocking the caller.
+
+    ``emit()`` only formats the record and puts it on a bounded in-memory
+    queue. A daemon thread drains the queue and sends the records in
+    pipelined batches of up to ``batch_size``, trimming the list to its
+    newest ``max_length`` entries.
+
+    Under backpressure records below ``WARNING`` are shed once the queue is
+    ``shed_ratio`` full, and everything is dropped once it is full; batches
+    that cannot be sent while Redis is unreachable are dropped too. The
+    number of dropped records is logged to the list once it recovers.
+    """
+
+    def __init__(
+        self,
+        host="redis",
+        port=6379,
+        password="",
+        key="reslab_manager:logs",
+        max_length=100_000,
+        queue_size=10_000,
+        batch_size=500,
+        flush_interval=1.0,
+        shed_ratio=0.8,
+        max_retry_interval=30.0,
+    ):
         super().__init__()
         self.redis = redis.StrictRedis(
-            host=host, port=port, password=password, decode_responses=True
+            host=host,
+            port=port,
+            password=password,
+            decode_responses=True,
+            socket_timeout=5,
+            socket_connect_timeout=5,
+            health_check_interval=30,
         )
         self.key = key
+        self.max_length = max_length
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.shed_size = int(queue_size * shed_ratio)
+        self.max_retry_interval = max_retry_interval
+        self.dropped = 0
+        # emit() counts drops on request threads while the flusher takes
+        # and resets the count.
+        self._dropped_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._flusher = None
+        self._pid = None
+
+    def _ensure_flusher(self):
+        # Threads do not survive fork(), so each gunicorn worker that
+        # inherits this handler starts its own flusher and queue.
+        if self._pid == os.getpid():
+            return
+        with self.lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.Queue(maxsize=self.queue_size)
+            # The parent's flusher may have held the lock when it forked.
+            self._dropped_lock = threading.Lock()
+            self.dropped = 0
+            self._flusher = threading.Thread(
+                target=self._run, name="redis-log-flusher", daemon=True
+            )
+            self._flusher.start()
+            self._pid = os.getpid()
 
     def emit(self, record):
-        log_entry = self.format(record)
-        self.redis.rpush(self.key, log_entry)
+        self._ensure_flusher()
+        if record.levelno < logging.WARNING and self.queue.qsize() >= self.shed_size:
+            self._count_dropped(1)
+            return
+        try:
+            self.queue.put_nowait(self.format(record))
+        except queue.Full:
+            self._count_dropped(1)
+        except Exception:
+            self.handleError(record)
+
+    def _count_dropped(self, count):
+        with self._dropped_lock:
+            self.dropped += count
+
+    def _take_dropped(self):
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+    def _next_batch(self):
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _dropped_notice(self, dropped):
+        record = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": logging.getLevelName(logging.WARNING),
+                "msg": "RedisHandler dropped %d log records.",
+                "args": (dropped,),
+            }
+        )
+        return self.format(record)
+
+    def _send(self, batch):
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.rpush(self.key, *batch)
+        if self.max_length:
+            pipe.ltrim(self.key, -self.max_length, -1)
+        pipe.execute()
+
+    def _run(self):
+        retry_interval = self.flush_interval
+        while not (self._stopping.is_set() and self.queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            dropped = self._take_dropped()
+            notice = [self._dropped_notice(dropped)] if dropped else []
+            try:
+                self._send(batch + notice)
+            except redis.RedisError:
+                # The connection pool reconnects on the next attempt; back
+                # off until then instead of hammering an unavailable server.
+                self._count_dropped(dropped + len(batch))
+                self._stopping.wait(retry_interval)
+                retry_interval = min(retry_interval * 2, self.max_retry_interval)
+            else:
+                retry_interval = self.flush_interval
+
+    def flush(self):
+        """Wait briefly for queued records to be sent."""
+        if self._flusher is None or self._pid != os.getpid():
+            return
+        deadline = time.monotonic() + self.flush_interval * 5
+        while not self.queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def close(self):
+        if self._flusher is not None and self._pid == os.getpid():
+            self._stopping.set()
+            self._flusher.join(timeout=self.flush_interval * 5)
+        super().close()
@@ -10,9 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import importlib.util
 import os
 from pathlib import Path
 
+from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -50,6 +54,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack.
+    "reslab_manager.instrumentation.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -91,6 +97,20 @@ DB_PASSWORD = os.environ.get("DB_PASSWORD", "")
 DB_HOST = os.environ.get("DB_HOST", "")
 DB_PORT = os.environ.get("DB_PORT", "")
 
+# Partition the sample event tables by year (PostgreSQL only, applied by
+# migration 0007 or ``manage.py partition_tables``), keeping partitions
+# PARTITION_YEARS_AHEAD years ahead of today.
+DB_PARTITIONING = os.environ.get("DB_PARTITIONING", "False") == "True"
+PARTITION_YEARS_AHEAD = int(os.environ.get("PARTITION_YEARS_AHEAD", 1))
+
+# Connections are kept open for DB_CONN_MAX_AGE seconds (0 closes them after
+# every request or task) and checked before being reused. Set DB_POOL=True
+# to draw PostgreSQL connections from a psycopg 3 pool instead; this needs
+# the psycopg[pool] package. Pools are per process, so DB_POOL_MAX_SIZE
+# bounds the connections of each gunicorn worker and Celery child process.
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", 60))
+DB_POOL = os.environ.get("DB_POOL", "False") == "True"
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends." + DB_ENGINE,
@@ -99,9 +119,29 @@ DATABASES = {
         "PASSWORD": DB_PASSWORD,
         "HOST": DB_HOST,
         "PORT": DB_PORT,
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+if DB_POOL and DB_ENGINE == "postgresql":
+    # Django would fall back to psycopg2 and reject the "pool" option with
+    # a less helpful error.
+    if importlib.util.find_spec("psycopg_pool") is None:
+        raise ImproperlyConfigured(
+            'DB_POOL=True needs psycopg 3 with its pool: pip install "psycopg[binary,pool]"'
+        )
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 1)),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 4)),
+            # Seconds a request waits for a free connection before failing.
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+            "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+        }
+    }
+
 AUTH_USER_MODEL = "accounts.User"
 
 
@@ -161,14 +201,99 @@ CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "Africa/Dar_es_Salaam"
+# Synced into django_celery_beat's database scheduler when beat starts.
+CELERY_BEAT_SCHEDULE = {
+    "archive-samples": {
+        "task": "sample_tracker.tasks.archive_samples",
+        "schedule": crontab(hour=2, minute=0),
+    },
+    "refresh-rollups": {
+        "task": "sample_tracker.tasks.refresh_rollups",
+        "schedule": crontab(minute="*/5"),
+    },
+    "rebuild-rollups": {
+        "task": "sample_tracker.tasks.refresh_rollups",
+        "schedule": crontab(hour=4, minute=0),
+        "kwargs": {"full": True},
+    },
+    "rotate-partitions": {
+        "task": "sample_tracker.tasks.rotate_partitions",
+        "schedule": crontab(hour=3, minute=0, day_of_month=1),
+    },
+}
 
 # Redis settings
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        # django-redis, counting hits and misses for request metrics.
+        "BACKEND": "reslab_manager.cache.InstrumentedRedisCache",
         "LOCATION": CELERY_BROKER_URL,
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # Treat an unreachable Redis as a cache miss rather than an error.
+            "IGNORE_EXCEPTIONS": True,
         },
     }
 }
+
+# REST API settings
+REST_FRAMEWORK = {
+    # JSON only: the browsable API renders related-object dropdowns from
+    # whole tables.
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+    # Reads need a login, writes the model's add/change/delete permission.
+    # Session-authenticated writes are CSRF-checked.
+    "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.DjangoModelPermissions"],
+}
+
+# Seconds the dashboard counters may be served from cache. Saves and deletes
+# invalidate them immediately; the timeout covers bulk writes that bypass
+# model signals.
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get("DASHBOARD_CACHE_TIMEOUT", 60))
+
+# Seconds rendered list and detail fragments may be served from cache. Saves
+# and deletes bump a per-model version that is part of every fragment key.
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get("FRAGMENT_CACHE_TIMEOUT", 600))
+
+# Seconds a sample's lineage page may be served from cache. Edits to the
+# sample or its history invalidate it immediately.
+LINEAGE_CACHE_TIMEOUT = int(os.environ.get("LINEAGE_CACHE_TIMEOUT", 300))
+
+# Samples of studies whose end date is this many days past, and that were
+# not edited or restored for as long, are moved to the archive nightly, in
+# transactions of ARCHIVE_BATCH_SIZE samples.
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", 180))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", 500))
+
+# Fraction of responses (0.0-1.0) that get a Server-Timing header and a
+# structured log line with their database, template, cache and total time.
+REQUEST_METRICS_SAMPLE_RATE = float(os.environ.get("REQUEST_METRICS_SAMPLE_RATE", 1.0))
+
+# Directories written by prometheus_client in multiprocess mode (each
+# service's PROMETHEUS_MULTIPROC_DIR) that /metrics aggregates. Defaults to
+# this process's own directory.
+METRICS_MULTIPROC_DIRS = [
+    path
+    for path in os.environ.get(
+        "METRICS_MULTIPROC_DIRS", os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+    ).split(",")
+    if path
+]
+
+# Celery queues whose length /metrics reads from the broker.
+METRICS_CELERY_QUEUES = os.environ.get("METRICS_CELERY_QUEUES", "celery").split(",")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "reslab_manager.requests": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
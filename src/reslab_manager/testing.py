@@ -0,0 +1,77 @@
+# -*- encoding: utf-8 -*-
+
+"""Helpers for tests that hold views to a query and render-time budget."""
+
+import re
+import time
+from collections import Counter
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Seconds a page may take to render in tests, best of ``render_repeats``.
+RENDER_BUDGET = 0.5
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """Replace literals in ``sql`` so that repeated queries compare equal."""
+    sql = _NUMBER.sub("?", _STRING.sub("?", sql))
+    return _SPACE.sub(" ", _LIST.sub("(...)", sql)).strip()
+
+
+def format_queries(queries):
+    """Group ``queries`` by normalized form, most frequent first."""
+    counts = Counter(normalize_sql(query["sql"]) for query in queries)
+    return "\n".join(f"{count:4d} × {sql}" for sql, count in counts.most_common())
+
+
+class QueryBudgetMixin:
+    """``TestCase`` mixin measuring the queries and time of a request."""
+
+    render_repeats = 3
+
+    def measure(self, url, method="get", data=None):
+        """Request ``url`` and return ``(response, queries, seconds)``.
+
+        The request is repeated ``render_repeats`` times; the time is the
+        fastest run, so template compilation and noise are not counted.
+        """
+        best = None
+        for _repeat in range(self.render_repeats):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = getattr(self.client, method)(url, data)
+                if response.streaming:
+                    # Streaming views query while the body is consumed.
+                    b"".join(response.streaming_content)
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return response, context.captured_queries, best
+
+    def assertQueryBudget(
+        self,
+        url,
+        max_queries,
+        max_seconds=RENDER_BUDGET,
+        method="get",
+        data=None,
+        status_code=200,
+    ):
+        response, queries, seconds = self.measure(url, method, data)
+        self.assertEqual(response.status_code, status_code, url)
+        if len(queries) > max_queries:
+            self.fail(
+                f"{method.upper()} {url} ran {len(queries)} queries, "
+                f"budget {max_queries}:\n{format_queries(queries)}"
+            )
+        self.assertLessEqual(
+            seconds,
+            max_seconds,
+            f"{method.upper()} {url} took {seconds:.3f}s, budget {max_seconds}s",
+        )
+        return response
@@ -0,0 +1,107 @@
+import logging
+import os
+import queue
+
+import redis
+from django.test import SimpleTestCase
+
+from .redis_logging import RedisHandler
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def rpush(self, key, *values):
+        self.commands.append(("rpush", key, list(values)))
+
+    def ltrim(self, key, start, end):
+        self.commands.append(("ltrim", key, start, end))
+
+    def execute(self):
+        if self.client.failures:
+            self.client.failures -= 1
+            raise redis.ConnectionError("Redis is down.")
+        self.client.commands.extend(self.commands)
+
+
+class FakeRedis:
+    """Records pipelined commands; fails the next ``failures`` executes."""
+
+    def __init__(self):
+        self.commands = []
+        self.failures = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def batches(self):
+        return [command[2] for command in self.commands if command[0] == "rpush"]
+
+
+class RedisHandlerTests(SimpleTestCase):
+    """Batch, shed and drop log records on the way to Redis."""
+
+    def make_handler(self, **kwargs):
+        handler = RedisHandler(flush_interval=0.01, **kwargs)
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        handler.redis = FakeRedis()
+        # Flush from the test thread instead of a background one.
+        handler.queue = queue.Queue(maxsize=handler.queue_size)
+        handler._pid = os.getpid()
+        return handler
+
+    def log(self, handler, count, level=logging.INFO):
+        for i in range(count):
+            handler.handle(
+                logging.makeLogRecord(
+                    {
+                        "levelno": level,
+                        "levelname": logging.getLevelName(level),
+                        "msg": f"record {i}",
+                    }
+                )
+            )
+
+    def drain(self, handler):
+        """Run the flusher until the queue is empty."""
+        handler._stopping.set()
+        handler._run()
+        handler._stopping.clear()
+
+    def test_batches(self):
+        handler = self.make_handler(batch_size=3, max_length=10)
+        self.log(handler, 7)
+        self.drain(handler)
+        self.assertEqual([len(batch) for batch in handler.redis.batches()], [3, 3, 1])
+        self.assertIn(("ltrim", handler.key, -10, -1), handler.redis.commands)
+
+    def test_shedding(self):
+        handler = self.make_handler(queue_size=10, shed_ratio=0.5)
+        # Debug and info records stop at half the queue, the rest when full.
+        self.log(handler, 8)
+        self.log(handler, 6, logging.WARNING)
+        self.assertEqual(handler.queue.qsize(), 10)
+        self.assertEqual(handler.dropped, 4)
+
+        self.drain(handler)
+        (batch,) = handler.redis.batches()
+        self.assertEqual(len(batch), 11)
+        self.assertEqual(batch[-1], "WARNING RedisHandler dropped 4 log records.")
+        self.assertEqual(handler.dropped, 0)
+
+    def test_outage(self):
+        handler = self.make_handler()
+        handler.redis.failures = 1
+        self.log(handler, 2)
+        self.drain(handler)
+        self.assertEqual(handler.redis.batches(), [])
+        self.assertEqual(handler.dropped, 2)
+
+        self.log(handler, 1)
+        self.drain(handler)
+        self.assertEqual(
+            handler.redis.batches(),
+            [["INFO record 0", "WARNING RedisHandler dropped 2 log records."]],
+        )
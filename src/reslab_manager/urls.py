@@ -18,8 +18,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from sample_tracker.api import router as api_router
+
+from .metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/", include("accounts.urls")),
+    path("api/", include(api_router.urls)),
+    path("metrics", metrics_view, name="metrics"),
     path("", include("sample_tracker.urls")),
 ]
@@ -0,0 +1,248 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.translation import gettext_lazy as _
+from rest_framework import routers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .archive import HISTORY_MODELS
+from .caching import model_versions
+from .extractions import create_plate_extractions
+from .models import (
+    Address,
+    DNAExtraction,
+    MolecularDiagnostic,
+    Plate,
+    Pooling,
+    QualityCheck,
+    Sample,
+    Storage,
+    Study,
+    StudySite,
+)
+from .pagination import KeysetCursorPagination
+from .serializers import (
+    AddressSerializer,
+    DNAExtractionSerializer,
+    MolecularDiagnosticSerializer,
+    PlateExtractionSerializer,
+    PlateSerializer,
+    PoolingSerializer,
+    QualityCheckSerializer,
+    SampleLineageSerializer,
+    SampleSerializer,
+    StorageSerializer,
+    StudySerializer,
+    StudySiteSerializer,
+)
+
+
+def _query_list(request, name):
+    value = request.query_params.get(name, "")
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class SampleTrackerViewSet(viewsets.ModelViewSet):
+    """Read/write endpoint for one model.
+
+    ``?fields=a,b`` limits both the payload and the columns loaded from the
+    database. Reads carry an ``ETag`` built, before anything is serialised,
+    from the versions of ``etag_models``, the newest ``updated_at`` and the
+    query string; a matching ``If-None-Match`` gets 304 Not Modified.
+    """
+
+    pagination_class = KeysetCursorPagination
+    keyset_ordering = ("-created_at", "-id")
+    etag_models = None
+    etag = None
+
+    def get_sparse_fields(self):
+        if self.request.method not in ("GET", "HEAD"):
+            return None
+        fields = _query_list(self.request, "fields")
+        if not fields:
+            return None
+        available = self.get_serializer_class()().fields
+        unknown = [name for name in fields if name not in available]
+        if unknown:
+            raise ValidationError(
+                {"fields": _("Unknown field(s): %s.") % ", ".join(unknown)}
+            )
+        return fields
+
+    def get_only_fields(self, fields):
+        """Return the model columns needed to render ``fields``."""
+        model = self.queryset.model
+        names = {"id"} | {name.lstrip("-") for name in self.keyset_ordering}
+        for name in fields:
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete:
+                names.add(name)
+        return sorted(names)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields:
+            queryset = queryset.only(*self.get_only_fields(fields))
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self.get_sparse_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_etag_models(self):
+        """The models whose writes change the response; saves bump them."""
+        if self.etag_models is not None:
+            return list(self.etag_models)
+        return [self.queryset.model]
+
+    def not_modified(self, last_modified):
+        """Set ``self.etag`` and return a 304 if the client already has it."""
+        parts = [
+            model_versions(*self.get_etag_models()),
+            last_modified.isoformat() if last_modified else "",
+            self.request.get_full_path(),
+        ]
+        digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+        self.etag = f'"{digest.hexdigest()}"'
+        return get_conditional_response(self.request, etag=self.etag)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        last_modified = queryset.aggregate(Max("updated_at"))["updated_at__max"]
+        return self.not_modified(last_modified) or super().list(
+            request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.not_modified(instance.updated_at) or Response(
+            self.get_serializer(instance).data
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.etag and response.status_code in (200, 304):
+            response["ETag"] = self.etag
+            # Make clients revalidate instead of guessing a freshness lifetime.
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class AddressViewSet(SampleTrackerViewSet):
+    queryset = Address.objects.all()
+    serializer_class = AddressSerializer
+
+
+class StudyViewSet(SampleTrackerViewSet):
+    queryset = Study.objects.all()
+    serializer_class = StudySerializer
+
+
+class StudySiteViewSet(SampleTrackerViewSet):
+    queryset = StudySite.objects.all()
+    serializer_class = StudySiteSerializer
+
+
+class SampleViewSet(SampleTrackerViewSet):
+    """Samples; ``?expand=lineage`` nests each sample's history."""
+
+    queryset = Sample.objects.all()
+    serializer_class = SampleSerializer
+    keyset_ordering = ("-collection_date", "-id")
+
+    def expand_lineage(self):
+        return self.request.method in ("GET", "HEAD") and "lineage" in _query_list(
+            self.request, "expand"
+        )
+
+    def get_queryset(self):
+        if self.expand_lineage():
+            # The history is prefetched per page, so columns are not trimmed.
+            return Sample.objects.with_lineage()
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.expand_lineage():
+            return SampleLineageSerializer
+        return super().get_serializer_class()
+
+    def get_etag_models(self):
+        if self.expand_lineage():
+            return [Sample, Plate, *HISTORY_MODELS.values()]
+        return super().get_etag_models()
+
+
+class PlateViewSet(SampleTrackerViewSet):
+    queryset = Plate.objects.all()
+    serializer_class = PlateSerializer
+
+    @action(detail=True, methods=["post"])
+    def extractions(self, request, pk=None):
+        """Record a whole plate of DNA extractions in one transaction."""
+        plate = self.get_object()
+        serializer = PlateExtractionSerializer(
+            data=request.data, context={"plate": plate}
+        )
+        serializer.is_valid(raise_exception=True)
+        extractions = create_plate_extractions(
+            plate,
+            serializer.validated_data["extraction_date"],
+            serializer.validated_data["expert_initials"],
+            serializer.sample_pks,
+        )
+        return Response(
+            DNAExtractionSerializer(extractions, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class DNAExtractionViewSet(SampleTrackerViewSet):
+    queryset = DNAExtraction.objects.all()
+    serializer_class = DNAExtractionSerializer
+    keyset_ordering = ("-extraction_date", "-id")
+
+
+class MolecularDiagnosticViewSet(SampleTrackerViewSet):
+    queryset = MolecularDiagnostic.objects.all()
+    serializer_class = MolecularDiagnosticSerializer
+    keyset_ordering = ("-processing_date", "-id")
+
+
+class StorageViewSet(SampleTrackerViewSet):
+    queryset = Storage.objects.all()
+    serializer_class = StorageSerializer
+    keyset_ordering = ("-storage_date", "-id")
+
+
+class QualityCheckViewSet(SampleTrackerViewSet):
+    queryset = QualityCheck.objects.all()
+    serializer_class = QualityCheckSerializer
+    keyset_ordering = ("-qc_date", "-id")
+
+
+class PoolingViewSet(SampleTrackerViewSet):
+    queryset = Pooling.objects.all()
+    serializer_class = PoolingSerializer
+    keyset_ordering = ("-pooling_date", "-id")
+
+
+router = routers.DefaultRouter()
+router.register("addresses", AddressViewSet)
+router.register("studies", StudyViewSet)
+router.register("study-sites", StudySiteViewSet)
+router.register("samples", SampleViewSet)
+router.register("plates", PlateViewSet)
+router.register("dna-extractions", DNAExtractionViewSet)
+router.register("molecular-diagnostics", MolecularDiagnosticViewSet)
+router.register("storages", StorageViewSet)
+router.register("quality-checks", QualityCheckViewSet)
+router.register("poolings", PoolingViewSet)
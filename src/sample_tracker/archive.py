@@ -0,0 +1,237 @@
+"""Move samples of finished studies out of the hot tables and back.
+
+Each archived sample becomes one ``Archive`` row: the sample and its DNA
+extractions, molecular diagnostics, storage moves and quality checks,
+serialised field by field to JSON and compressed with zlib. Rows keep their
+primary keys, so a restore puts them back exactly as they were.
+
+Archived samples leave the hot tables, so they drop out of the status
+rollups; both directions rebuild the rollups of the weeks they touch.
+"""
+
+import datetime
+import json
+import zlib
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import bump_model_version, invalidate_dashboard, invalidate_lineage
+from .deletion import raw_delete
+from .models import (
+    Archive,
+    DNAExtraction,
+    MolecularDiagnostic,
+    Plate,
+    QualityCheck,
+    Sample,
+    Storage,
+)
+from .rollups import refresh_site_weeks, week_ranges
+
+# The history archived with each sample, by the attribute that
+# ``Sample.objects.with_lineage()`` loads it into.
+HISTORY_MODELS = {
+    "extractions": DNAExtraction,
+    "diagnostics": MolecularDiagnostic,
+    "storages": Storage,
+    "quality_checks": QualityCheck,
+}
+ARCHIVED_MODELS = (Sample, *HISTORY_MODELS.values())
+
+
+def archivable_samples(today=None):
+    """Samples of studies that ended ``ARCHIVE_AFTER_DAYS`` ago.
+
+    Samples edited or restored within that time stay in the hot tables.
+    """
+    cutoff = (today or timezone.localdate()) - datetime.timedelta(
+        days=settings.ARCHIVE_AFTER_DAYS
+    )
+    # A bound on the column itself, not on its date, can use its index.
+    cutoff_time = timezone.make_aware(
+        datetime.datetime.combine(cutoff, datetime.time())
+    )
+    return Sample.objects.filter(
+        study_site__study__end_date__lt=cutoff,
+        updated_at__lt=cutoff_time,
+    )
+
+
+def dump_row(instance):
+    return {
+        field.attname: field.value_from_object(instance)
+        for field in instance._meta.concrete_fields
+    }
+
+
+def load_row(model, values):
+    """Build an unsaved ``model`` instance from ``dump_row()`` output."""
+    return model(
+        **{
+            field.attname: field.to_python(values[field.attname])
+            for field in model._meta.concrete_fields
+            if field.attname in values
+        }
+    )
+
+
+class ArchiveJSONEncoder(DjangoJSONEncoder):
+    """``DjangoJSONEncoder`` keeping the microseconds of datetimes."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def compress(payload):
+    return zlib.compress(json.dumps(payload, cls=ArchiveJSONEncoder).encode())
+
+
+def decompress(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def sample_weeks(samples):
+    return week_ranges(
+        (sample.study_site_id, sample.collection_date, sample.collection_date)
+        for sample in samples
+    )
+
+
+def archive_samples(sample_pks):
+    """Archive the samples ``sample_pks`` and their history.
+
+    Runs in one transaction and returns the number of samples archived.
+    """
+    with transaction.atomic():
+        samples = list(
+            Sample.objects.with_lineage()
+            .filter(pk__in=sample_pks)
+            .select_for_update(of=("self",))
+        )
+        pks = [sample.pk for sample in samples]
+        archives = []
+        for sample in samples:
+            payload = {"sample": dump_row(sample), "plates": {}}
+            for attr in HISTORY_MODELS:
+                payload[attr] = [dump_row(row) for row in getattr(sample, attr)]
+            for extraction in sample.extractions:
+                payload["plates"][extraction.plate_id] = extraction.plate.plate_number
+            archives.append(
+                Archive(
+                    sample_pk=sample.pk,
+                    sample_id=sample.sample_id,
+                    study_id=sample.study_site.study_id,
+                    study_site_id=sample.study_site_id,
+                    collection_date=sample.collection_date,
+                    data=compress(payload),
+                )
+            )
+        Archive.objects.bulk_create(archives)
+        # Set-based deletes: the per-row signal receivers only invalidate
+        # caches, which is done once for the batch below. The history goes
+        # first, as raw deletes do not cascade.
+        for model in HISTORY_MODELS.values():
+            raw_delete(model.objects.filter(sample_id__in=pks))
+        raw_delete(Sample.objects.filter(pk__in=pks))
+
+    refresh_site_weeks(sample_weeks(samples))
+    invalidate_lineage(*pks)
+    invalidate_dashboard()
+    bump_model_version(Archive, *ARCHIVED_MODELS)
+    return len(samples)
+
+
+def archived_sample(archive):
+    """Rebuild an unsaved ``Sample`` with its history from ``archive``.
+
+    The result renders like ``Sample.objects.with_lineage()`` rows, without
+    touching the hot tables. ``study_site`` comes from ``archive``, so
+    select it with the archive to avoid a query.
+    """
+    payload = decompress(archive.data)
+    sample = load_row(Sample, payload["sample"])
+    sample.study_site = archive.study_site
+    plates = {
+        int(pk): Plate(pk=int(pk), plate_number=number)
+        for pk, number in payload["plates"].items()
+    }
+    for attr, model in HISTORY_MODELS.items():
+        rows = [load_row(model, values) for values in payload[attr]]
+        for row in rows:
+            if model is DNAExtraction:
+                row.plate = plates[row.plate_id]
+        setattr(sample, attr, rows)
+    return sample
+
+
+def restore_samples(archives):
+    """Move ``archives`` back into the hot tables under their old keys.
+
+    Extractions are attached to their plate by number if the plate was
+    re-created meanwhile. Raises ``ValidationError`` if a sample ID has been
+    reused or a plate no longer exists; nothing is restored then.
+    """
+    archives = list(archives)
+    payloads = [decompress(archive.data) for archive in archives]
+    sample_ids = [archive.sample_id for archive in archives]
+    taken = list(
+        Sample.objects.filter(sample_id__in=sample_ids).values_list(
+            "sample_id", flat=True
+        )
+    )
+    if taken:
+        raise ValidationError(
+            "Samples with these IDs already exist: %(ids)s",
+            params={"ids": ", ".join(sorted(taken))},
+        )
+
+    numbers = {
+        int(pk): number
+        for payload in payloads
+        for pk, number in payload["plates"].items()
+    }
+    plate_ids = dict(
+        Plate.objects.filter(plate_number__in=numbers.values()).values_list(
+            "plate_number", "pk"
+        )
+    )
+    missing = sorted(set(numbers.values()) - set(plate_ids))
+    if missing:
+        raise ValidationError(
+            "These plates no longer exist: %(plates)s",
+            params={"plates": ", ".join(missing)},
+        )
+
+    rows = {model: [] for model in ARCHIVED_MODELS}
+    for payload in payloads:
+        rows[Sample].append(load_row(Sample, payload["sample"]))
+        for attr, model in HISTORY_MODELS.items():
+            for values in payload[attr]:
+                row = load_row(model, values)
+                if model is DNAExtraction:
+                    row.plate_id = plate_ids[numbers[row.plate_id]]
+                rows[model].append(row)
+
+    with transaction.atomic():
+        for model, objs in rows.items():
+            stamps = [(obj.created_at, obj.updated_at) for obj in objs]
+            # auto_now(_add) stamps the insert time; put the originals back.
+            # bulk_update() leaves auto_now alone.
+            model.objects.bulk_create(objs)
+            for obj, (created_at, updated_at) in zip(objs, stamps):
+                obj.created_at, obj.updated_at = created_at, updated_at
+            model.objects.bulk_update(
+                objs, ["created_at", "updated_at"], batch_size=500
+            )
+        Archive.objects.filter(pk__in=[archive.pk for archive in archives]).delete()
+
+    refresh_site_weeks(sample_weeks(rows[Sample]))
+    invalidate_dashboard()
+    bump_model_version(Archive, *ARCHIVED_MODELS)
+    return len(archives)
@@ -0,0 +1,48 @@
+import time
+
+from django.core.cache import cache
+
+DASHBOARD_CACHE_KEY = "sample_tracker:dashboard"
+
+
+def invalidate_dashboard():
+    cache.delete(DASHBOARD_CACHE_KEY)
+
+
+def lineage_cache_key(sample_pk):
+    return f"sample_tracker:lineage:{sample_pk}"
+
+
+def invalidate_lineage(*sample_pks):
+    cache.delete_many([lineage_cache_key(pk) for pk in sample_pks])
+
+
+def model_version_key(model):
+    return f"sample_tracker:version:{model._meta.label_lower}"
+
+
+def model_versions(*models):
+    """Return a token that changes whenever a row of ``models`` is written.
+
+    Used in template fragment cache keys, so bumping a model's version
+    orphans every fragment rendered from it.
+    """
+    keys = [model_version_key(model) for model in models]
+    # A copy: django-redis hands out one shared dict while Redis is down.
+    versions = dict(cache.get_many(keys))
+    for key in keys:
+        if key not in versions:
+            # Start from the clock so a counter lost to eviction never
+            # repeats a version that old fragments were cached under.
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return ".".join(str(versions[key]) for key in keys)
+
+
+def bump_model_version(*models):
+    for model in models:
+        key = model_version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
@@ -0,0 +1,55 @@
+import threading
+
+from django.db import connections
+
+_lock = threading.Lock()
+_opened = {}
+_seen = set()
+
+
+def record_connection(connection):
+    """Count a connection opened by this process (``connection_created``)."""
+    with _lock:
+        _opened[connection.alias] = _opened.get(connection.alias, 0) + 1
+        _seen.add((connection.alias, threading.get_ident()))
+
+
+def connection_stats(alias="default"):
+    """Return this process's connection counters for ``alias``.
+
+    With persistent connections every thread should open one connection and
+    keep it, so ``reconnects`` counts connections opened beyond that: ones
+    that expired, failed a health check or were closed after an error. With
+    a psycopg 3 pool the checkouts, waits and lost connections come from the
+    pool itself.
+    """
+    connection = connections[alias]
+    with _lock:
+        opened = _opened.get(alias, 0)
+        threads = sum(1 for seen_alias, _thread in _seen if seen_alias == alias)
+    stats = {
+        "alias": alias,
+        "vendor": connection.vendor,
+        "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+        "pooled": False,
+        "connections_opened": opened,
+        "reconnects": opened - threads,
+    }
+
+    pool = getattr(connection, "pool", None)
+    if pool is not None:
+        pool_stats = pool.get_stats()
+        stats.update(
+            pooled=True,
+            pool_size=pool_stats.get("pool_size", 0),
+            pool_available=pool_stats.get("pool_available", 0),
+            pool_max_size=pool.max_size,
+            # Django sends connection_created on every checkout from a pool.
+            connections_opened=pool_stats.get("connections_num", 0),
+            checkouts=pool_stats.get("requests_num", 0),
+            waits=pool_stats.get("requests_queued", 0),
+            wait_ms=pool_stats.get("requests_wait_ms", 0),
+            timeouts=pool_stats.get("requests_errors", 0),
+            reconnects=pool_stats.get("connections_lost", 0),
+        )
+    return stats
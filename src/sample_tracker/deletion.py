@@ -0,0 +1,139 @@
+"""Delete studies and study sites in the background, a batch at a time.
+
+Deleting a study through the ORM loads every site, sample and event row
+into memory and deletes them in one transaction. Instead the rows that
+cascade from the object are deleted depth first, ``DELETE_BATCH_SIZE`` at
+a time and each batch in its own transaction: a batch of sites, then
+batches of their samples, each after the events of those samples. Every
+batch is found by the primary keys of its parents, so it is an index
+lookup however large the tables are. The object itself goes last.
+"""
+
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
+
+from .caching import bump_model_version, invalidate_dashboard, invalidate_lineage
+from .models import Deletion, Sample
+from .signals import CACHE_RECEIVERS
+
+# Rows deleted per transaction.
+DELETE_BATCH_SIZE = 1000
+
+
+def cascade_relations(model):
+    """The foreign keys to ``model`` that cascade its deletes."""
+    return [
+        relation
+        for relation in model._meta.related_objects
+        if relation.one_to_many and relation.on_delete is models.CASCADE
+    ]
+
+
+def related_rows(relation, parents):
+    return relation.related_model._base_manager.filter(
+        **{f"{relation.field.name}__in": parents}
+    )
+
+
+def cascade_querysets(queryset):
+    """Return ``{model: queryset}`` of the rows deleted along with ``queryset``."""
+    plan = {}
+    for relation in cascade_relations(queryset.model):
+        related = related_rows(relation, queryset)
+        for model, dependent in [
+            (related.model, related),
+            *cascade_querysets(related).items(),
+        ]:
+            # Rows reached twice, e.g. archives by study and by site.
+            plan[model] = plan[model] | dependent if model in plan else dependent
+    return plan
+
+
+def needs_signals(model):
+    """Whether deleting ``model`` rows must send per-object signals.
+
+    ``Signal._live_receivers()`` is private Django API (checked against
+    Django 5.1); the public ``has_listeners()`` cannot tell our cache
+    receivers from others.
+    """
+    for signal in (pre_delete, post_delete):
+        sync_receivers, async_receivers = signal._live_receivers(model)
+        if any(r not in CACHE_RECEIVERS for r in sync_receivers + async_receivers):
+            return True
+    return False
+
+
+def raw_delete(queryset):
+    """Delete ``queryset`` in one ``DELETE``, without signals or cascades.
+
+    ``QuerySet._raw_delete()`` is private Django API (checked against
+    Django 5.1). Callers delete dependent rows first and invalidate the
+    caches the signal receivers would have.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_batch(model, pks):
+    """Delete the ``model`` rows ``pks`` and drop the caches they fed."""
+    queryset = model._base_manager.filter(pk__in=pks)
+    with transaction.atomic():
+        if needs_signals(model):
+            queryset.delete()
+        else:
+            raw_delete(queryset)
+    if model is Sample:
+        invalidate_lineage(*pks)
+    invalidate_dashboard()
+    bump_model_version(model)
+
+
+def delete_dependents(model, pks, deletion):
+    """Delete the rows cascading from the ``model`` rows ``pks``."""
+    for relation in cascade_relations(model):
+        queryset = related_rows(relation, pks).order_by()
+        while batch := list(queryset.values_list("pk", flat=True)[:DELETE_BATCH_SIZE]):
+            delete_dependents(relation.related_model, batch, deletion)
+            delete_batch(relation.related_model, batch)
+            deletion.deleted_rows += len(batch)
+            deletion.save(update_fields=["deleted_rows", "updated_at"])
+
+
+def run_deletion(deletion):
+    """Carry out ``deletion``, recording progress on it."""
+    model = apps.get_model(deletion.object_label)
+    root = model._base_manager.filter(pk=deletion.object_pk)
+    plan = cascade_querysets(root)
+    deletion.status = Deletion.RUNNING
+    deletion.total_rows = 1 + sum(queryset.count() for queryset in plan.values())
+    deletion.deleted_rows = 0
+    deletion.save(update_fields=["status", "total_rows", "deleted_rows", "updated_at"])
+
+    try:
+        delete_dependents(model, [deletion.object_pk], deletion)
+        # Whatever was added meanwhile goes with the object, through the ORM.
+        obj = root.first()
+        if obj is not None:
+            deletion.deleted_rows += obj.delete()[0]
+    except Exception as exc:
+        deletion.status = Deletion.FAILED
+        deletion.error = str(exc)
+        # List the object again, so the delete can be retried.
+        root.update(pending_deletion=False)
+        bump_model_version(model)
+        raise
+    else:
+        deletion.status = Deletion.COMPLETED
+    finally:
+        deletion.finished_at = timezone.now()
+        deletion.save(
+            update_fields=[
+                "status",
+                "deleted_rows",
+                "error",
+                "finished_at",
+                "updated_at",
+            ]
+        )
+    return deletion
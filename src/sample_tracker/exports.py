@@ -0,0 +1,127 @@
+import csv
+
+from django.utils.translation import gettext_lazy as _
+
+from .models import DNAExtraction, MolecularDiagnostic, QualityCheck, Sample, Storage
+
+# Rows fetched per database round trip (and per server-side cursor fetch on
+# PostgreSQL), and rows rendered into each chunk of the streamed response.
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_ROWS_PER_WRITE = 500
+
+EXPORT_FORMATS = {
+    "csv": (",", "text/csv"),
+    "tsv": ("\t", "text/tab-separated-values"),
+}
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+class ExportDataset:
+    """A flat, study-scoped table of one model, exported column by column."""
+
+    def __init__(self, model, label, study_lookup, columns):
+        self.model = model
+        self.label = label
+        self.study_lookup = study_lookup
+        self.columns = columns
+
+    @property
+    def headers(self):
+        return [header for header, _lookup in self.columns]
+
+    def get_queryset(self, study):
+        return (
+            self.model.objects.filter(**{self.study_lookup: study})
+            .order_by("pk")
+            .values_list(*(lookup for _header, lookup in self.columns))
+        )
+
+    def stream(self, study, delimiter=","):
+        """Yield the dataset as delimited text, a batch of rows at a time."""
+        writer = csv.writer(Echo(), delimiter=delimiter)
+        yield writer.writerow(self.headers)
+
+        batch = []
+        rows = self.get_queryset(study).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        for row in rows:
+            batch.append(writer.writerow(row))
+            if len(batch) >= EXPORT_ROWS_PER_WRITE:
+                yield "".join(batch)
+                batch = []
+        if batch:
+            yield "".join(batch)
+
+
+EXPORT_DATASETS = {
+    "samples": ExportDataset(
+        Sample,
+        _("Samples"),
+        "study_site__study",
+        [
+            ("sample_id", "sample_id"),
+            ("sample_type", "sample_type"),
+            ("study_site", "study_site__name"),
+            ("collection_date", "collection_date"),
+            ("status", "status"),
+            ("small_bag_number", "small_bag_number"),
+            ("large_bag_number", "large_bag_number"),
+            ("container_label", "container_label"),
+            ("container_location", "container_location"),
+            ("receiver_initials", "receiver_initials"),
+        ],
+    ),
+    "dna-extractions": ExportDataset(
+        DNAExtraction,
+        _("DNA Extractions"),
+        "sample__study_site__study",
+        [
+            ("sample_id", "sample__sample_id"),
+            ("extraction_date", "extraction_date"),
+            ("plate_number", "plate__plate_number"),
+            ("expert_initials", "expert_initials"),
+        ],
+    ),
+    "molecular-diagnostics": ExportDataset(
+        MolecularDiagnostic,
+        _("Molecular Diagnostics"),
+        "sample__study_site__study",
+        [
+            ("sample_id", "sample__sample_id"),
+            ("technique", "technique"),
+            ("processing_date", "processing_date"),
+            ("plasmodium_species", "plasmodium_species"),
+            ("expert_initials", "expert_initials"),
+        ],
+    ),
+    "storages": ExportDataset(
+        Storage,
+        _("Storage"),
+        "sample__study_site__study",
+        [
+            ("sample_id", "sample__sample_id"),
+            ("container_number", "container_number"),
+            ("container_label", "container_label"),
+            ("container_location", "container_location"),
+            ("storage_type", "storage_type"),
+            ("storage_date", "storage_date"),
+            ("expert_initials", "expert_initials"),
+        ],
+    ),
+    "quality-checks": ExportDataset(
+        QualityCheck,
+        _("Quality Checks"),
+        "sample__study_site__study",
+        [
+            ("sample_id", "sample__sample_id"),
+            ("status", "status"),
+            ("qc_date", "qc_date"),
+            ("expert_initials", "expert_initials"),
+        ],
+    ),
+}
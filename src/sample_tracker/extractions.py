@@ -0,0 +1,102 @@
+import re
+from collections import Counter
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+
+from .caching import bump_model_version, invalidate_lineage
+from .models import DNAExtraction, Sample
+
+# A 384-well plate is the largest format the lab runs.
+PLATE_MAX_WELLS = 384
+
+
+def parse_sample_ids(value):
+    """Split pasted or scanned sample IDs on whitespace and commas."""
+    return [sample_id for sample_id in re.split(r"[\s,;]+", value or "") if sample_id]
+
+
+def resolve_plate_samples(plate, sample_ids):
+    """Return the primary keys of ``sample_ids``, in order, for a plate run.
+
+    All samples are looked up with one ``IN`` query. Raises ``ValidationError``
+    listing every unknown, repeated or already extracted sample ID, or if the
+    plate lacks free wells for them.
+    """
+    if not sample_ids:
+        raise ValidationError(_("Enter at least one sample ID."), code="required")
+    if len(sample_ids) > PLATE_MAX_WELLS:
+        raise ValidationError(
+            _("A plate holds at most %(max)s samples; %(count)s were entered."),
+            code="max_wells",
+            params={"max": PLATE_MAX_WELLS, "count": len(sample_ids)},
+        )
+    free = PLATE_MAX_WELLS - DNAExtraction.objects.filter(plate=plate).count()
+    if len(sample_ids) > free:
+        raise ValidationError(
+            _("Plate %(plate)s has %(free)s free wells; %(count)s were entered."),
+            code="max_wells",
+            params={"plate": plate, "free": free, "count": len(sample_ids)},
+        )
+
+    errors = []
+    counts = Counter(sample_ids)
+    repeated = [sample_id for sample_id, count in counts.items() if count > 1]
+    if repeated:
+        errors.append(
+            ValidationError(
+                _("Sample IDs entered more than once: %(ids)s."),
+                code="duplicate",
+                params={"ids": ", ".join(sorted(repeated))},
+            )
+        )
+
+    sample_pks = dict(
+        Sample.objects.filter(sample_id__in=counts).values_list("sample_id", "pk")
+    )
+    unknown = set(counts) - set(sample_pks)
+    if unknown:
+        errors.append(
+            ValidationError(
+                _("Unknown sample IDs: %(ids)s."),
+                code="unknown",
+                params={"ids": ", ".join(sorted(unknown))},
+            )
+        )
+
+    extracted = set(
+        DNAExtraction.objects.filter(
+            plate=plate, sample__in=sample_pks.values()
+        ).values_list("sample__sample_id", flat=True)
+    )
+    if extracted:
+        errors.append(
+            ValidationError(
+                _("Already extracted onto plate %(plate)s: %(ids)s."),
+                code="extracted",
+                params={"plate": plate, "ids": ", ".join(sorted(extracted))},
+            )
+        )
+
+    if errors:
+        raise ValidationError(errors)
+    return [sample_pks[sample_id] for sample_id in sample_ids]
+
+
+def create_plate_extractions(plate, extraction_date, expert_initials, sample_pks):
+    """Record a whole plate of extractions with a single ``bulk_create``."""
+    with transaction.atomic():
+        extractions = DNAExtraction.objects.bulk_create(
+            DNAExtraction(
+                sample_id=sample_pk,
+                plate=plate,
+                extraction_date=extraction_date,
+                expert_initials=expert_initials,
+            )
+            for sample_pk in sample_pks
+        )
+    # bulk_create() sends no post_save signals.
+    invalidate_lineage(*sample_pks)
+    bump_model_version(DNAExtraction)
+    return extractions
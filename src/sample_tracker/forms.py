@@ -1,5 +1,12 @@
+import csv
+
 from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from django.utils.translation import gettext_lazy as _
 
+from .extractions import PLATE_MAX_WELLS, parse_sample_ids, resolve_plate_samples
+from .imports import IMPORT_MAX_BYTES, missing_columns
 from .models import (
     Address,
     DNAExtraction,
@@ -8,12 +15,50 @@ from .models import (
     Pooling,
     QualityCheck,
     Sample,
+    SampleImport,
     Storage,
     Study,
     StudySite,
 )
 
 
+class AutocompleteSelect(forms.Select):
+    """Select whose options are fetched from a JSON endpoint as the user types.
+
+    Only the current value is rendered into the page, so the size of the
+    form no longer grows with the size of the related table.
+    """
+
+    def __init__(self, url_name, attrs=None):
+        attrs = {"class": "ui search selection dropdown", **(attrs or {})}
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs["data-autocomplete-url"] = reverse(self.url_name)
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        iterator = self.choices
+        choices = []
+        if iterator.field.empty_label is not None:
+            choices.append(("", iterator.field.empty_label))
+        selected = [v for v in value if v not in (None, "")]
+        if selected:
+            try:
+                objects = list(iterator.queryset.filter(pk__in=selected))
+            except (TypeError, ValueError, ValidationError):
+                objects = []
+            choices.extend(iterator.choice(obj) for obj in objects)
+
+        self.choices = choices
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = iterator
+
+
 class AddressForm(forms.ModelForm):
     """Form for creating or updating address details."""
 
@@ -128,6 +173,42 @@ class SampleForm(forms.ModelForm):
         }
 
 
+class SampleImportForm(forms.ModelForm):
+    """Form for uploading a CSV manifest of samples."""
+
+    file = forms.FileField(
+        label=_("Manifest (CSV)"),
+        widget=forms.ClearableFileInput(attrs={"class": "ui input", "accept": ".csv"}),
+    )
+
+    class Meta:
+        model = SampleImport
+        fields = []
+
+    def clean_file(self):
+        upload = self.cleaned_data["file"]
+        if upload.size > IMPORT_MAX_BYTES:
+            raise forms.ValidationError(
+                _("The manifest must be smaller than %(size)s MB."),
+                params={"size": IMPORT_MAX_BYTES // (1024 * 1024)},
+            )
+        try:
+            manifest = upload.read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise forms.ValidationError(_("The manifest must be a UTF-8 CSV file."))
+
+        header = next(csv.reader(manifest.splitlines()[:1]), [])
+        missing = missing_columns(header)
+        if missing:
+            raise forms.ValidationError(
+                _("The manifest is missing the columns: %(columns)s."),
+                params={"columns": ", ".join(missing)},
+            )
+        self.instance.filename = upload.name
+        self.instance.manifest = manifest
+        return upload
+
+
 class PlateForm(forms.ModelForm):
     """Form for creating or updating a plate."""
 
@@ -168,17 +249,54 @@ class DNAExtractionForm(forms.ModelForm):
         model = DNAExtraction
         fields = ["sample", "extraction_date", "plate", "expert_initials"]
         widgets = {
-            "sample": forms.Select(attrs={"class": "ui dropdown"}),
+            "sample": AutocompleteSelect("sample_tracker:sample_autocomplete"),
             "extraction_date": forms.DateInput(
                 attrs={"class": "ui input", "type": "date"}
             ),
-            "plate": forms.Select(attrs={"class": "ui dropdown"}),
+            "plate": AutocompleteSelect("sample_tracker:plate_autocomplete"),
             "expert_initials": forms.TextInput(
                 attrs={"class": "ui input", "placeholder": "Enter expert initials"}
             ),
         }
 
 
+class PlateExtractionForm(forms.Form):
+    """Form for recording a whole plate of DNA extractions at once."""
+
+    extraction_date = forms.DateField(
+        label=_("Extraction Date"),
+        widget=forms.DateInput(attrs={"class": "ui input", "type": "date"}),
+    )
+    expert_initials = forms.CharField(
+        label=_("Expert’s Initials"),
+        max_length=10,
+        widget=forms.TextInput(
+            attrs={"class": "ui input", "placeholder": "Enter expert initials"}
+        ),
+    )
+    sample_ids = forms.CharField(
+        label=_("Sample IDs"),
+        help_text=_("Scan or paste up to %(max)s sample IDs, one per well.")
+        % {"max": PLATE_MAX_WELLS},
+        widget=forms.Textarea(
+            attrs={
+                "class": "ui input",
+                "placeholder": "One sample ID per line",
+                "rows": 12,
+            }
+        ),
+    )
+
+    def __init__(self, *args, plate, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.plate = plate
+
+    def clean_sample_ids(self):
+        sample_ids = parse_sample_ids(self.cleaned_data["sample_ids"])
+        self.sample_pks = resolve_plate_samples(self.plate, sample_ids)
+        return sample_ids
+
+
 class MolecularDiagnosticForm(forms.ModelForm):
     """Form for recording molecular diagnostics/genetic analysis details."""
 
@@ -192,7 +310,7 @@ class MolecularDiagnosticForm(forms.ModelForm):
             "expert_initials",
         ]
         widgets = {
-            "sample": forms.Select(attrs={"class": "ui dropdown"}),
+            "sample": AutocompleteSelect("sample_tracker:sample_autocomplete"),
             "technique": forms.Select(attrs={"class": "ui dropdown"}),
             "processing_date": forms.DateInput(
                 attrs={"class": "ui input", "type": "date"}
@@ -221,7 +339,7 @@ class StorageForm(forms.ModelForm):
             "expert_initials",
         ]
         widgets = {
-            "sample": forms.Select(attrs={"class": "ui dropdown"}),
+            "sample": AutocompleteSelect("sample_tracker:sample_autocomplete"),
             "container_number": forms.TextInput(
                 attrs={"class": "ui input", "placeholder": "Enter container number"}
             ),
@@ -248,7 +366,7 @@ class QualityCheckForm(forms.ModelForm):
         model = QualityCheck
         fields = ["sample", "status", "qc_date", "expert_initials"]
         widgets = {
-            "sample": forms.Select(attrs={"class": "ui dropdown"}),
+            "sample": AutocompleteSelect("sample_tracker:sample_autocomplete"),
             "status": forms.Select(attrs={"class": "ui dropdown"}),
             "qc_date": forms.DateInput(attrs={"class": "ui input", "type": "date"}),
             "expert_initials": forms.TextInput(
@@ -278,7 +396,7 @@ class PoolingForm(forms.ModelForm):
             "pool_name": forms.TextInput(
                 attrs={"class": "ui input", "placeholder": "Enter pool name"}
             ),
-            "capture_plate": forms.Select(attrs={"class": "ui dropdown"}),
+            "capture_plate": AutocompleteSelect("sample_tracker:plate_autocomplete"),
             "number_of_plates": forms.NumberInput(
                 attrs={"class": "ui input", "placeholder": "Enter number of plates"}
             ),
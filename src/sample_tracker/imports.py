@@ -0,0 +1,156 @@
+import csv
+import io
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .caching import bump_model_version, invalidate_dashboard
+from .models import Sample, SampleImport, StudySite
+
+# Rows validated, checked for duplicates and inserted per transaction.
+IMPORT_BATCH_SIZE = 500
+IMPORT_MAX_BYTES = 20 * 1024 * 1024
+
+IMPORT_COLUMNS = (
+    "sample_id",
+    "sample_type",
+    "study_site",
+    "collection_date",
+    "status",
+    "small_bag_number",
+    "large_bag_number",
+    "container_label",
+    "container_location",
+    "receiver_initials",
+)
+OPTIONAL_COLUMNS = ("small_bag_number", "large_bag_number")
+REQUIRED_COLUMNS = tuple(c for c in IMPORT_COLUMNS if c not in OPTIONAL_COLUMNS)
+
+
+def missing_columns(header):
+    """Return the required manifest columns absent from ``header``."""
+    present = {name.strip() for name in header or ()}
+    return [name for name in REQUIRED_COLUMNS if name not in present]
+
+
+def build_sample(row, site_ids):
+    """Build an unsaved ``Sample`` from a manifest row.
+
+    ``site_ids`` maps study site names to primary keys, so validation runs
+    no queries; uniqueness is checked per batch by the caller.
+    """
+    values = {name: (row.get(name) or "").strip() for name in IMPORT_COLUMNS}
+    site_name = values.pop("study_site")
+    sample = Sample(study_site_id=site_ids.get(site_name), **values)
+
+    errors = {}
+    if sample.study_site_id is None:
+        errors["study_site"] = [f"Unknown study site “{site_name}”."]
+    try:
+        sample.full_clean(
+            exclude=["study_site"], validate_unique=False, validate_constraints=False
+        )
+    except ValidationError as exc:
+        for field, messages in exc.message_dict.items():
+            errors.setdefault(field, []).extend(str(m) for m in messages)
+    return sample, errors
+
+
+def _row_error(line, sample_id, errors):
+    return {"line": line, "sample_id": sample_id, "errors": errors}
+
+
+def import_batch(rows, first_line, site_ids, seen):
+    """Validate and insert one batch of manifest rows.
+
+    Returns the number of samples created and the per-row errors.
+    """
+    errors = []
+    candidates = []
+    for line, row in enumerate(rows, start=first_line):
+        sample, row_errors = build_sample(row, site_ids)
+        if not row_errors and sample.sample_id in seen:
+            row_errors = {"sample_id": ["Duplicate sample ID in this manifest."]}
+        seen.add(sample.sample_id)
+        if row_errors:
+            errors.append(_row_error(line, sample.sample_id, row_errors))
+        else:
+            candidates.append((line, sample))
+
+    existing = set(
+        Sample.objects.filter(
+            sample_id__in=[sample.sample_id for _line, sample in candidates]
+        ).values_list("sample_id", flat=True)
+    )
+    valid = []
+    for line, sample in candidates:
+        if sample.sample_id in existing:
+            errors.append(
+                _row_error(
+                    line,
+                    sample.sample_id,
+                    {"sample_id": ["Sample with this Sample ID already exists."]},
+                )
+            )
+        else:
+            valid.append((line, sample))
+
+    try:
+        with transaction.atomic():
+            Sample.objects.bulk_create([sample for _line, sample in valid])
+    except IntegrityError as exc:
+        # Lost a race with a concurrent writer; report the whole batch.
+        errors.extend(
+            _row_error(line, sample.sample_id, {"__all__": [str(exc)]})
+            for line, sample in valid
+        )
+        valid = []
+    errors.sort(key=lambda error: error["line"])
+    return len(valid), errors
+
+
+def run_sample_import(job):
+    """Import ``job.manifest`` in batches, recording progress on the job."""
+    rows = list(csv.DictReader(io.StringIO(job.manifest)))
+    job.status = SampleImport.RUNNING
+    job.total_rows = len(rows)
+    job.processed_rows = job.created_rows = 0
+    job.errors = []
+    job.save(
+        update_fields=[
+            "status",
+            "total_rows",
+            "processed_rows",
+            "created_rows",
+            "errors",
+            "updated_at",
+        ]
+    )
+
+    try:
+        site_ids = dict(StudySite.objects.values_list("name", "pk"))
+        seen = set()
+        for start in range(0, len(rows), IMPORT_BATCH_SIZE):
+            batch = rows[start : start + IMPORT_BATCH_SIZE]
+            # Line 1 of the file is the header.
+            created, errors = import_batch(batch, start + 2, site_ids, seen)
+            job.processed_rows += len(batch)
+            job.created_rows += created
+            job.errors.extend(errors)
+            job.save(
+                update_fields=["processed_rows", "created_rows", "errors", "updated_at"]
+            )
+    except Exception:
+        job.status = SampleImport.FAILED
+        raise
+    else:
+        job.status = SampleImport.COMPLETED
+    finally:
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "finished_at", "updated_at"])
+        # bulk_create() sends no post_save signals.
+        if job.created_rows:
+            invalidate_dashboard()
+            bump_model_version(Sample)
+    return job
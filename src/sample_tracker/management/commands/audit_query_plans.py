@@ -0,0 +1,113 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.views.generic.list import MultipleObjectMixin
+
+from sample_tracker.pagination import KeysetPaginationMixin, KeysetPaginator
+
+# Plan lines that mean a table is read in full.
+SEQUENTIAL_SCAN = {
+    # PostgreSQL: "Seq Scan on sample_tracker_sample  (cost=...)"
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    # SQLite: "SCAN sample_tracker_sample" (index scans read "... USING INDEX")
+    "sqlite": re.compile(r"\bSCAN (\w+)(?!.*\bUSING\b)"),
+}
+
+
+def iter_patterns(patterns, namespace=""):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            prefix = pattern.namespace or namespace
+            yield from iter_patterns(pattern.url_patterns, prefix)
+        elif isinstance(pattern, URLPattern):
+            name = f"{namespace}:{pattern.name}" if namespace else pattern.name
+            yield name, pattern
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the queryset behind every sample_tracker view and flag "
+        "plans that scan a whole table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Print the full plan of every query, not just flagged ones.",
+        )
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Exit with an error if any plan scans a sequence.",
+        )
+
+    def view_queries(self):
+        """Yield (route name, queryset) for every view backed by a queryset."""
+        factory = RequestFactory()
+        seen = set()
+        for name, pattern in iter_patterns(get_resolver().url_patterns):
+            view_class = getattr(pattern.callback, "view_class", None)
+            if (
+                not name
+                or not name.startswith("sample_tracker:")
+                or view_class is None
+                or not hasattr(view_class, "get_queryset")
+                or view_class in seen
+            ):
+                continue
+            seen.add(view_class)
+
+            view = view_class()
+            kwargs = {key: 1 for key in pattern.pattern.converters}
+            view.setup(factory.get("/"), **kwargs)
+            if "pk" in kwargs:
+                # What SingleObjectMixin.get_object() runs.
+                queryset = view.get_queryset().filter(pk=kwargs["pk"])
+            elif isinstance(view, KeysetPaginationMixin):
+                queryset = KeysetPaginator(
+                    view.get_queryset(), view.keyset_ordering, view.paginate_by
+                ).get_page_queryset()
+            elif isinstance(view, MultipleObjectMixin):
+                queryset = view.get_queryset()
+            else:
+                # Create views never query their model.
+                continue
+            yield name, queryset
+
+    def handle(self, *args, **options):
+        pattern = SEQUENTIAL_SCAN.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f"Unsupported database backend: {connection.vendor}")
+
+        flagged = []
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # On small or empty tables the planner prefers a sequential
+                # scan even when an index applies. Making it the last resort
+                # leaves only the plans that have no usable index.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for name, queryset in self.view_queries():
+                plan = queryset.explain()
+                scans = sorted(set(pattern.findall(plan)))
+                if scans:
+                    flagged.append(name)
+                    self.stdout.write(
+                        self.style.WARNING(f"SEQ SCAN  {name}: {', '.join(scans)}")
+                    )
+                else:
+                    self.stdout.write(f"ok        {name}")
+                if scans or options["verbose_plans"]:
+                    self.stdout.write(f"    {queryset.query}")
+                    for line in plan.splitlines():
+                        self.stdout.write(f"    {line}")
+
+        if flagged and options["fail"]:
+            raise CommandError(f"{len(flagged)} view(s) scan a sequence.")
+        if not flagged:
+            self.stdout.write(self.style.SUCCESS("No sequential scans found."))
@@ -0,0 +1,454 @@
+import datetime
+import io
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from sample_tracker.caching import bump_model_version, invalidate_dashboard
+from sample_tracker.models import (
+    Address,
+    DNAExtraction,
+    MolecularDiagnostic,
+    Plate,
+    Pooling,
+    QualityCheck,
+    Sample,
+    Storage,
+    Study,
+    StudySite,
+)
+
+REGIONS = {
+    "Dar es Salaam": ("Ilala", "Kinondoni", "Temeke", "Ubungo"),
+    "Kagera": ("Bukoba", "Karagwe", "Muleba", "Ngara"),
+    "Kigoma": ("Kasulu", "Kibondo", "Uvinza"),
+    "Morogoro": ("Kilosa", "Morogoro", "Ulanga"),
+    "Mtwara": ("Masasi", "Newala", "Tandahimba"),
+    "Mwanza": ("Ilemela", "Magu", "Nyamagana", "Sengerema"),
+    "Tanga": ("Handeni", "Korogwe", "Muheza", "Pangani"),
+}
+INITIALS = ("AM", "BK", "CJ", "DN", "EM", "FS", "GL", "HM", "JK", "NR")
+WELLS_PER_PLATE = 96
+PLATES_PER_POOL = 4
+
+# Share of samples (or of the previous step) reaching each stage.
+EXTRACTED = 0.85
+RE_EXTRACTED = 0.05
+DIAGNOSED = 0.8
+GENOTYPED = 0.5
+SEQUENCED = 0.2
+SECOND_STORAGE = 0.1
+QC_CHECKED = 0.9
+QC_ACCEPTED = 0.92
+DBS = 0.85
+SPECIES = (("P. falciparum", 90), ("P. malariae", 5), ("P. ovale", 5))
+
+MODELS = (
+    Address,
+    Study,
+    StudySite,
+    Sample,
+    Plate,
+    DNAExtraction,
+    MolecularDiagnostic,
+    Storage,
+    QualityCheck,
+    Pooling,
+)
+
+
+class BulkCreateWriter:
+    """Insert rows with ``bulk_create``; works on every backend."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+
+    def insert(self, model, rows):
+        objs = model.objects.bulk_create(
+            [model(**row) for row in rows], batch_size=self.batch_size
+        )
+        return [obj.pk for obj in objs]
+
+
+class CopyWriter:
+    """Insert rows with PostgreSQL ``COPY``, reserving ids from the sequence."""
+
+    def insert(self, model, rows):
+        if not rows:
+            return []
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+                "FROM generate_series(1, %s)",
+                [table, len(rows)],
+            )
+            pks = [pk for (pk,) in cursor.fetchall()]
+
+            columns = ["id", *rows[0]]
+            buffer = io.StringIO()
+            for pk, row in zip(pks, rows):
+                buffer.write(f"{pk}\t")
+                buffer.write("\t".join(map(_copy_value, row.values())))
+                buffer.write("\n")
+            sql = "COPY {} ({}) FROM STDIN".format(
+                connection.ops.quote_name(table),
+                ", ".join(connection.ops.quote_name(column) for column in columns),
+            )
+            raw = cursor.cursor
+            if hasattr(raw, "copy_expert"):  # psycopg2
+                buffer.seek(0)
+                raw.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+        return pks
+
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value):
+    """Format ``value`` for COPY's text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic studies, sites, samples and their lab history for "
+        "performance testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--samples", type=int, default=10_000, help="Samples to create."
+        )
+        parser.add_argument("--studies", type=int, default=5, help="Studies to create.")
+        parser.add_argument(
+            "--sites-per-study",
+            type=int,
+            default=8,
+            help="Average number of sites per study.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed, for repeatable data."
+        )
+        parser.add_argument(
+            "--prefix",
+            default="SYN",
+            help="Prefix of generated sample IDs, plate numbers and names.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Samples generated and inserted per transaction.",
+        )
+        parser.add_argument(
+            "--method",
+            choices=("auto", "bulk", "copy"),
+            default="auto",
+            help="Insert with bulk_create or COPY (default: COPY on PostgreSQL).",
+        )
+
+    def handle(self, *args, **options):
+        method = options["method"]
+        if method == "auto":
+            method = "copy" if connection.vendor == "postgresql" else "bulk"
+        if method == "copy" and connection.vendor != "postgresql":
+            raise CommandError("--method copy needs PostgreSQL.")
+        if options["samples"] < 0 or options["studies"] < 1:
+            raise CommandError("Need at least one study and no negative counts.")
+
+        self.random = random.Random(options["seed"])
+        self.prefix = options["prefix"]
+        self.now = timezone.now()
+        self.writer = (
+            CopyWriter()
+            if method == "copy"
+            else BulkCreateWriter(options["batch_size"])
+        )
+        self.counts = dict.fromkeys(MODELS, 0)
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            sites = self.create_sites(options["studies"], options["sites_per_study"])
+        self.plate_number = Plate.objects.filter(
+            plate_number__startswith=self.prefix
+        ).count()
+        self.pooled_plates = []
+
+        remaining = options["samples"]
+        first = Sample.objects.filter(sample_id__startswith=self.prefix).count()
+        while remaining > 0:
+            size = min(remaining, options["batch_size"])
+            with transaction.atomic():
+                self.create_samples(sites, first, size)
+            first += size
+            remaining -= size
+            self.stdout.write(
+                f"{options['samples'] - remaining} / {options['samples']} samples"
+            )
+
+        # Neither bulk_create() nor COPY sends post_save signals.
+        invalidate_dashboard()
+        bump_model_version(*MODELS)
+
+        elapsed = time.perf_counter() - started
+        total = sum(self.counts.values())
+        for model, count in self.counts.items():
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {count}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {total} rows in {elapsed:.1f}s "
+                f"({total / max(elapsed, 1e-9):.0f} rows/s, {method})."
+            )
+        )
+
+    def insert(self, model, rows):
+        pks = self.writer.insert(model, rows)
+        self.counts[model] += len(pks)
+        return pks
+
+    def stamp(self, **values):
+        return {"created_at": self.now, "updated_at": self.now, **values}
+
+    def initials(self):
+        return self.random.choice(INITIALS)
+
+    def create_sites(self, studies, sites_per_study):
+        """Create studies with a varying number of sites and one address each.
+
+        Returns ``(pk, start_date, end_date, weight, positivity)`` per site;
+        weights are skewed so a few sites collect most samples.
+        """
+        rnd = self.random
+        offset = Study.objects.filter(code__startswith=self.prefix).count()
+        today = datetime.date.today()
+        study_rows = []
+        for i in range(offset, offset + studies):
+            # Studies last one to four years; older ones have ended.
+            start = today - datetime.timedelta(days=rnd.randint(90, 10 * 365))
+            end = start + datetime.timedelta(days=rnd.randint(365, 4 * 365))
+            study_rows.append(
+                self.stamp(
+                    name=f"{self.prefix} Study {i + 1}",
+                    code=f"{self.prefix}-S{i + 1}",
+                    description=f"Synthetic study {i + 1}.",
+                    start_date=start,
+                    end_date=end,
+                )
+            )
+        study_pks = self.insert(Study, study_rows)
+
+        site_studies = []
+        for pk, row in zip(study_pks, study_rows):
+            count = max(1, round(rnd.gauss(sites_per_study, sites_per_study / 3)))
+            site_studies.extend([(pk, row)] * count)
+
+        address_rows = []
+        for _ in site_studies:
+            region = rnd.choice(list(REGIONS))
+            address_rows.append(
+                self.stamp(
+                    street="",
+                    ward=f"Ward {rnd.randint(1, 40)}",
+                    district=rnd.choice(REGIONS[region]),
+                    region=region,
+                    postal_code=str(rnd.randint(10000, 99999)),
+                )
+            )
+        address_pks = self.insert(Address, address_rows)
+
+        offset = StudySite.objects.filter(name__startswith=self.prefix).count()
+        site_rows = [
+            self.stamp(
+                study_id=study_pk,
+                name=f"{self.prefix} Site {offset + i + 1}",
+                address_id=address_pk,
+                phone=f"+2557{rnd.randint(10_000_000, 99_999_999)}",
+                email=f"site{offset + i + 1}@example.org",
+            )
+            for i, ((study_pk, _study), address_pk) in enumerate(
+                zip(site_studies, address_pks)
+            )
+        ]
+        site_pks = self.insert(StudySite, site_rows)
+
+        order = list(range(len(site_pks)))
+        rnd.shuffle(order)
+        return [
+            (
+                pk,
+                study["start_date"],
+                min(study["end_date"], today),
+                1 / (rank + 1) ** 1.1,
+                rnd.uniform(0.05, 0.4),
+            )
+            for rank, (pk, (_study_pk, study)) in zip(
+                order, zip(site_pks, site_studies)
+            )
+        ]
+
+    def create_samples(self, sites, first, count):
+        """Create ``count`` samples and their lab history."""
+        rnd = self.random
+        days = datetime.timedelta
+        weights = [site[3] for site in sites]
+
+        sample_rows = []
+        positive = []
+        for i, site in enumerate(rnd.choices(sites, weights, k=count)):
+            pk, start, end, _weight, positivity = site
+            collected = start + days(rnd.randint(0, max(0, (end - start).days)))
+            is_positive = rnd.random() < positivity
+            positive.append(is_positive)
+            sample_rows.append(
+                self.stamp(
+                    sample_id=f"{self.prefix}{first + i + 1:09d}",
+                    sample_type="DBS" if rnd.random() < DBS else "DNA",
+                    study_site_id=pk,
+                    collection_date=collected,
+                    status="POS" if is_positive else "NEG",
+                    small_bag_number=f"SB{rnd.randint(1, 500)}",
+                    large_bag_number=f"LB{rnd.randint(1, 50)}",
+                    container_label=f"Box {rnd.randint(1, 200)}",
+                    container_location=f"Freezer {rnd.randint(1, 12)}",
+                    receiver_initials=self.initials(),
+                )
+            )
+        sample_pks = self.insert(Sample, sample_rows)
+        samples = list(zip(sample_pks, sample_rows, positive))
+
+        # Extractions fill plates in collection order, 96 wells at a time.
+        # Re-extractions follow on plates of their own, so a sample is never
+        # extracted twice onto the same plate.
+        extracted = [s for s in samples if rnd.random() < EXTRACTED]
+        extracted.sort(key=lambda s: s[1]["collection_date"])
+        repeated = [s for s in extracted if rnd.random() < RE_EXTRACTED]
+        plates = [
+            run[start : start + WELLS_PER_PLATE]
+            for run in (extracted, repeated)
+            for start in range(0, len(run), WELLS_PER_PLATE)
+        ]
+        plate_rows = []
+        for wells in plates:
+            self.plate_number += 1
+            plate_rows.append(
+                self.stamp(
+                    plate_number=f"{self.prefix}-P{self.plate_number:07d}",
+                    plate_label=f"Plate {self.plate_number}",
+                    status="POS" if any(w[2] for w in wells) else "NEG",
+                    volume=Decimal(rnd.choice((50, 100, 150, 200))),
+                    freezer_number=str(rnd.randint(1, 12)),
+                    shelf_number=str(rnd.randint(1, 6)),
+                )
+            )
+        plate_pks = self.insert(Plate, plate_rows)
+
+        extraction_rows = []
+        for plate_pk, wells in zip(plate_pks, plates):
+            extraction_date = wells[-1][1]["collection_date"] + days(
+                rnd.randint(7, 120)
+            )
+            initials = self.initials()
+            extraction_rows.extend(
+                self.stamp(
+                    sample_id=pk,
+                    extraction_date=extraction_date,
+                    plate_id=plate_pk,
+                    expert_initials=initials,
+                )
+                for pk, _row, _positive in wells
+            )
+        self.insert(DNAExtraction, extraction_rows)
+
+        diagnostic_rows = []
+        for pk, row, is_positive in extracted:
+            if rnd.random() >= DIAGNOSED:
+                continue
+            processed = row["collection_date"] + days(rnd.randint(30, 180))
+            techniques = ["qPCR"]
+            if is_positive and rnd.random() < GENOTYPED:
+                techniques.append("Genotyping")
+            if is_positive and rnd.random() < SEQUENCED:
+                techniques.append("MIP")
+            for technique in techniques:
+                diagnostic_rows.append(
+                    self.stamp(
+                        sample_id=pk,
+                        technique=technique,
+                        processing_date=processed,
+                        plasmodium_species=(
+                            rnd.choices(*zip(*SPECIES))[0] if is_positive else ""
+                        ),
+                        expert_initials=self.initials(),
+                    )
+                )
+                processed += days(rnd.randint(7, 60))
+        self.insert(MolecularDiagnostic, diagnostic_rows)
+
+        storage_rows = []
+        for pk, row, _positive in samples:
+            stored = row["collection_date"] + days(rnd.randint(1, 14))
+            types = ["Processing", "Archived"] if rnd.random() < SECOND_STORAGE else []
+            types = types or [rnd.choice(("Archived", "Archived", "Processing"))]
+            for storage_type in types:
+                storage_rows.append(
+                    self.stamp(
+                        sample_id=pk,
+                        container_number=str(rnd.randint(1, 500)),
+                        container_label=f"Rack {rnd.randint(1, 100)}",
+                        container_location=f"Freezer {rnd.randint(1, 12)}",
+                        storage_type=storage_type,
+                        storage_date=stored,
+                        expert_initials=self.initials(),
+                    )
+                )
+                stored += days(rnd.randint(30, 365))
+        self.insert(Storage, storage_rows)
+
+        self.insert(
+            QualityCheck,
+            [
+                self.stamp(
+                    sample_id=pk,
+                    status="Accepted" if rnd.random() < QC_ACCEPTED else "Rejected",
+                    qc_date=row["collection_date"] + days(rnd.randint(1, 21)),
+                    expert_initials=self.initials(),
+                )
+                for pk, row, _positive in samples
+                if rnd.random() < QC_CHECKED
+            ],
+        )
+
+        # Plates are pooled in groups for capture and sequencing.
+        self.pooled_plates.extend(zip(plate_pks, plates))
+        pooling_rows = []
+        while len(self.pooled_plates) >= PLATES_PER_POOL:
+            group = self.pooled_plates[:PLATES_PER_POOL]
+            del self.pooled_plates[:PLATES_PER_POOL]
+            capture_pk, wells = group[-1]
+            pooling_rows.append(
+                self.stamp(
+                    pooling_date=wells[-1][1]["collection_date"]
+                    + days(rnd.randint(130, 240)),
+                    pool_name=f"Pool {capture_pk}",
+                    capture_plate_id=capture_pk,
+                    number_of_plates=len(group),
+                    rack_compartment_number=str(rnd.randint(1, 20)),
+                    fridge_freezer_number=str(rnd.randint(1, 12)),
+                    expert_initials=self.initials(),
+                )
+            )
+        self.insert(Pooling, pooling_rows)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from sample_tracker.partitioning import partition_tables, rotate_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Partition the storage, quality check and molecular diagnostic tables "
+        "by year on PostgreSQL, then create any missing partitions. Locks "
+        "each table while its rows are copied."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the SQL that would run instead of running it.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Partitioning needs PostgreSQL.")
+        if options["dry_run"]:
+            statements = []
+            partition_tables(statements=statements)
+            rotate_partitions(statements=statements)
+            for sql in statements:
+                self.stdout.write(f"{sql};")
+            return
+        for table in partition_tables():
+            self.stdout.write(f"Partitioned {table}.")
+        for partition in rotate_partitions():
+            self.stdout.write(f"Created partition {partition}.")
+        self.stdout.write(self.style.SUCCESS("Partitions are up to date."))
@@ -0,0 +1,65 @@
+from django.db import models
+from django.db.models import Prefetch, Q
+
+# Columns searched by SampleQuerySet.search(). On PostgreSQL each one has a
+# pg_trgm GIN index on UPPER(column), which is the expression Django's
+# icontains lookup compares against (see migration 0003).
+SAMPLE_SEARCH_FIELDS = (
+    "sample_id",
+    "container_label",
+    "small_bag_number",
+    "large_bag_number",
+)
+
+# Trigram indexes cannot narrow terms shorter than a trigram, so shorter
+# terms only match whole sample IDs.
+SEARCH_MIN_LENGTH = 3
+
+
+class SampleQuerySet(models.QuerySet):
+    def search(self, term):
+        """Filter to samples whose identifiers or labels contain ``term``."""
+        term = (term or "").strip()
+        if not term:
+            return self
+        if len(term) < SEARCH_MIN_LENGTH:
+            return self.filter(sample_id__iexact=term)
+        condition = Q()
+        for field in SAMPLE_SEARCH_FIELDS:
+            condition |= Q(**{f"{field}__icontains": term})
+        return self.filter(condition)
+
+    def with_lineage(self):
+        """Load each sample's full processing history in fixed queries.
+
+        The history is attached, newest first, as ``extractions`` (with
+        their plates), ``diagnostics``, ``storages`` and ``quality_checks``.
+        """
+        from .models import DNAExtraction, MolecularDiagnostic, QualityCheck, Storage
+
+        return self.select_related("study_site").prefetch_related(
+            Prefetch(
+                "dnaextraction_set",
+                queryset=DNAExtraction.objects.select_related("plate").order_by(
+                    "-extraction_date", "-id"
+                ),
+                to_attr="extractions",
+            ),
+            Prefetch(
+                "moleculardiagnostic_set",
+                queryset=MolecularDiagnostic.objects.order_by(
+                    "-processing_date", "-id"
+                ),
+                to_attr="diagnostics",
+            ),
+            Prefetch(
+                "storage_set",
+                queryset=Storage.objects.order_by("-storage_date", "-id"),
+                to_attr="storages",
+            ),
+            Prefetch(
+                "qualitycheck_set",
+                queryset=QualityCheck.objects.order_by("-qc_date", "-id"),
+                to_attr="quality_checks",
+            ),
+        )
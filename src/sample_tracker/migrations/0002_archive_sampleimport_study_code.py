@@ -0,0 +1,102 @@
+# Generated by Django 5.1.6 on 2026-10-18 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sample_tracker", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Archive",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="SampleImport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "filename",
+                    models.CharField(max_length=255, verbose_name="File Name"),
+                ),
+                ("manifest", models.TextField(verbose_name="Manifest")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("RUNNING", "Running"),
+                            ("COMPLETED", "Completed"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="PENDING",
+                        max_length=10,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "total_rows",
+                    models.PositiveIntegerField(default=0, verbose_name="Total Rows"),
+                ),
+                (
+                    "processed_rows",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Processed Rows"
+                    ),
+                ),
+                (
+                    "created_rows",
+                    models.PositiveIntegerField(default=0, verbose_name="Created Rows"),
+                ),
+                (
+                    "errors",
+                    models.JSONField(blank=True, default=list, verbose_name="Errors"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finished At"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Sample Import",
+                "verbose_name_plural": "Sample Imports",
+            },
+        ),
+        migrations.AddField(
+            model_name="study",
+            name="code",
+            field=models.CharField(
+                blank=True, max_length=50, unique=True, verbose_name="Study Code"
+            ),
+        ),
+    ]
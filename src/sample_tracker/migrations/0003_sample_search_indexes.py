@@ -0,0 +1,42 @@
+from django.db import migrations
+
+SEARCH_COLUMNS = (
+    "sample_id",
+    "container_label",
+    "small_bag_number",
+    "large_bag_number",
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Trigram GIN indexes are PostgreSQL-only; other backends fall back to
+    # unindexed substring matching.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS sample_{column}_trgm "
+            f"ON sample_tracker_sample USING gin (UPPER({column}) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS sample_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and avoids
+    # blocking writes to the sample table while the indexes build.
+    atomic = False
+
+    dependencies = [
+        ("sample_tracker", "0002_archive_sampleimport_study_code"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
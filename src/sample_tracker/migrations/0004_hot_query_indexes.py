@@ -0,0 +1,99 @@
+# Generated by Django 5.1.6 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sample_tracker", "0003_sample_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="address",
+            index=models.Index(fields=["created_at", "id"], name="address_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="dnaextraction",
+            index=models.Index(
+                fields=["extraction_date", "id"], name="dnaextraction_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dnaextraction",
+            index=models.Index(
+                fields=["sample", "extraction_date"],
+                name="dnaextraction_sample_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="moleculardiagnostic",
+            index=models.Index(
+                fields=["processing_date", "id"], name="moleculardiag_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="moleculardiagnostic",
+            index=models.Index(
+                fields=["sample", "processing_date"],
+                name="moleculardiag_sample_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="plate",
+            index=models.Index(fields=["created_at", "id"], name="plate_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="pooling",
+            index=models.Index(fields=["pooling_date", "id"], name="pooling_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="qualitycheck",
+            index=models.Index(fields=["qc_date", "id"], name="qualitycheck_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="qualitycheck",
+            index=models.Index(
+                fields=["sample", "qc_date"], name="qualitycheck_sample_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sample",
+            index=models.Index(
+                fields=["collection_date", "id"], name="sample_collection_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sample",
+            index=models.Index(
+                fields=["status", "collection_date"], name="sample_status_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sample",
+            index=models.Index(
+                fields=["study_site", "collection_date"], name="sample_site_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="storage",
+            index=models.Index(fields=["storage_date", "id"], name="storage_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="storage",
+            index=models.Index(
+                fields=["sample", "storage_date"], name="storage_sample_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="study",
+            index=models.Index(fields=["created_at", "id"], name="study_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="studysite",
+            index=models.Index(
+                fields=["created_at", "id"], name="studysite_created_idx"
+            ),
+        ),
+    ]
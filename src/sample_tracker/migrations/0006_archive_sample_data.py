@@ -0,0 +1,76 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def delete_empty_archives(apps, schema_editor):
+    # Archive rows had nothing but timestamps until now, so there is no
+    # sample to fill the new NOT NULL (and unique) columns with.
+    Archive = apps.get_model("sample_tracker", "Archive")
+    Archive.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sample_tracker", "0005_updated_at_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_empty_archives, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name="archive",
+            options={
+                "verbose_name": "Archived Sample",
+                "verbose_name_plural": "Archived Samples",
+            },
+        ),
+        migrations.AddField(
+            model_name="archive",
+            name="sample_pk",
+            field=models.PositiveBigIntegerField(unique=True),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="archive",
+            name="sample_id",
+            field=models.CharField(
+                max_length=100, unique=True, verbose_name="Sample ID"
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="archive",
+            name="study",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_samples",
+                to="sample_tracker.study",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="archive",
+            name="study_site",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_samples",
+                to="sample_tracker.studysite",
+                verbose_name="Study Site",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="archive",
+            name="collection_date",
+            field=models.DateField(verbose_name="Collection Date"),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="archive",
+            name="data",
+            field=models.BinaryField(),
+            preserve_default=False,
+        ),
+    ]
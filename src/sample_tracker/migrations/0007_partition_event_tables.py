@@ -0,0 +1,122 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:02
+
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+# A frozen copy of sample_tracker.partitioning as of this migration, so later
+# changes to that module cannot change what the migration does.
+PARTITION_KEYS = {
+    "moleculardiagnostic": "processing_date",
+    "storage": "storage_date",
+    "qualitycheck": "qc_date",
+}
+
+
+def create_year_partition(cursor, quote, table, column, year):
+    partition = f"{table}_y{year}"
+    start, end = f"'{year}-01-01'", f"'{year + 1}-01-01'"
+    cursor.execute(
+        f"CREATE TABLE {quote(partition)} (LIKE {quote(table)} INCLUDING DEFAULTS)"
+    )
+    cursor.execute(
+        f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(partition)} "
+        f"FOR VALUES FROM ({start}) TO ({end})"
+    )
+
+
+def partition_table(cursor, quote, table, column):
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+        [table],
+    )
+    if cursor.fetchone() is not None:
+        return
+    old = f"{table}_unpartitioned"
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = %s "
+        "AND indexname <> %s",
+        [table, f"{table}_pkey"],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = to_regclass(%s) AND contype IN ('c', 'f')",
+        [table],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {quote(table)}")
+    last_id = cursor.fetchone()[0]
+    cursor.execute(
+        f"SELECT DISTINCT EXTRACT(YEAR FROM {quote(column)})::int "
+        f"FROM {quote(table)}"
+    )
+    years = {row[0] for row in cursor.fetchall()}
+    this_year = timezone.localdate().year
+    years.update(range(this_year, this_year + settings.PARTITION_YEARS_AHEAD + 1))
+
+    cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+    cursor.execute(
+        f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS) "
+        f"PARTITION BY RANGE ({quote(column)})"
+    )
+    cursor.execute(
+        f"CREATE TABLE {quote(table + '_default')} "
+        f"PARTITION OF {quote(table)} DEFAULT"
+    )
+    # The default partition is still empty, so no rows need moving.
+    for year in sorted(years):
+        create_year_partition(cursor, quote, table, column, year)
+    cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+    cursor.execute(f"DROP TABLE {quote(old)}")
+
+    sequence = f"{table}_id_seq"
+    cursor.execute(f"CREATE SEQUENCE {quote(sequence)} OWNED BY {quote(table)}.id")
+    cursor.execute(
+        "SELECT setval(%s, %s, %s)", [sequence, max(last_id, 1), last_id > 0]
+    )
+    cursor.execute(
+        f"ALTER TABLE {quote(table)} ALTER COLUMN id "
+        f"SET DEFAULT nextval('{sequence}'::regclass)"
+    )
+    cursor.execute(
+        f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + '_pkey')} "
+        f"PRIMARY KEY (id, {quote(column)})"
+    )
+    for name, definition in constraints:
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}"
+        )
+    for definition in indexes:
+        cursor.execute(definition)
+
+
+def partition_event_tables(apps, schema_editor):
+    # Opt-in and PostgreSQL-only; see sample_tracker.partitioning. Run
+    # ``manage.py partition_tables`` to partition after this migration.
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or not settings.DB_PARTITIONING:
+        return
+    with connection.cursor() as cursor:
+        for model_name, field_name in PARTITION_KEYS.items():
+            model = apps.get_model("sample_tracker", model_name)
+            partition_table(
+                cursor,
+                connection.ops.quote_name,
+                model._meta.db_table,
+                model._meta.get_field(field_name).column,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sample_tracker", "0006_archive_sample_data"),
+    ]
+
+    operations = [
+        # The partitioned tables keep their columns and index names, so the
+        # model state does not change and there is nothing to reverse.
+        migrations.RunPython(partition_event_tables, migrations.RunPython.noop),
+    ]
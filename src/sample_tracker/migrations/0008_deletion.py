@@ -0,0 +1,81 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sample_tracker", "0007_partition_event_tables"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Deletion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                (
+                    "object_label",
+                    models.CharField(max_length=100, verbose_name="Model"),
+                ),
+                ("object_pk", models.PositiveBigIntegerField(verbose_name="Object ID")),
+                (
+                    "object_repr",
+                    models.CharField(max_length=255, verbose_name="Object"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("RUNNING", "Running"),
+                            ("COMPLETED", "Completed"),
+                            ("FAILED", "Failed"),
+                        ],
+                        default="PENDING",
+                        max_length=10,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "total_rows",
+                    models.PositiveIntegerField(default=0, verbose_name="Total Rows"),
+                ),
+                (
+                    "deleted_rows",
+                    models.PositiveIntegerField(default=0, verbose_name="Deleted Rows"),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Error")),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Finished At"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Deletion",
+                "verbose_name_plural": "Deletions",
+            },
+        ),
+        migrations.AddField(
+            model_name="study",
+            name="pending_deletion",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="studysite",
+            name="pending_deletion",
+            field=models.BooleanField(default=False),
+        ),
+    ]
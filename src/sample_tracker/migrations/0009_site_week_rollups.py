@@ -0,0 +1,112 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sample_tracker", "0008_deletion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("updated_until", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SiteWeekRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+                ("week", models.DateField(verbose_name="Week")),
+                (
+                    "samples",
+                    models.PositiveIntegerField(default=0, verbose_name="Samples"),
+                ),
+                (
+                    "positive_samples",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Positive Samples"
+                    ),
+                ),
+                (
+                    "extracted_samples",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Extracted Samples"
+                    ),
+                ),
+                (
+                    "diagnosed_samples",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Diagnosed Samples"
+                    ),
+                ),
+                (
+                    "stored_samples",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Stored Samples"
+                    ),
+                ),
+                (
+                    "qc_checked_samples",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="QC Checked Samples"
+                    ),
+                ),
+                (
+                    "qc_accepted_samples",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="QC Accepted Samples"
+                    ),
+                ),
+                (
+                    "study",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="sample_tracker.study",
+                    ),
+                ),
+                (
+                    "study_site",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rollups",
+                        to="sample_tracker.studysite",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Site Week Rollup",
+                "verbose_name_plural": "Site Week Rollups",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("study_site", "week"), name="rollup_site_week_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
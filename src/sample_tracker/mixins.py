@@ -0,0 +1,176 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.messages import get_messages
+from django.db import transaction
+from django.db.models import Max
+from django.http import HttpResponseRedirect
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.generic.list import MultipleObjectMixin
+
+from .caching import model_versions
+from .models import Deletion
+
+
+class RelatedObjectsMixin:
+    """Declarative relation loading for generic views.
+
+    ``select_related`` and ``prefetch_related`` name the relations the
+    view's template walks, and ``only_fields`` optionally narrows the
+    columns loaded, so rendering any number of rows costs a fixed number
+    of queries.
+    """
+
+    select_related = ()
+    prefetch_related = ()
+    only_fields = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only_fields:
+            queryset = queryset.only(*self.only_fields)
+        return queryset
+
+
+class FragmentCacheMixin:
+    """Expose ``fragment_version`` for ``{% cache %}`` keys in templates.
+
+    The version changes whenever a row of ``get_fragment_models()`` is saved
+    or deleted: the models named in ``select_related`` and, for list views,
+    the view's own model. Detail fragments should also vary on the object's
+    ``updated_at``.
+    """
+
+    fragment_models = None
+
+    def get_fragment_models(self):
+        if self.fragment_models is not None:
+            return list(self.fragment_models)
+        models = [self.model] if isinstance(self, MultipleObjectMixin) else []
+        for lookup in getattr(self, "select_related", ()):
+            related = self.model
+            for name in lookup.split("__"):
+                related = related._meta.get_field(name).related_model
+            models.append(related)
+        return models
+
+    def get_fragment_version(self):
+        if not hasattr(self, "_fragment_version"):
+            models = self.get_fragment_models()
+            self._fragment_version = model_versions(*models) if models else ""
+        return self._fragment_version
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["fragment_cache_timeout"] = settings.FRAGMENT_CACHE_TIMEOUT
+        context["fragment_version"] = self.get_fragment_version()
+        return context
+
+
+class ConditionalGetMixin(FragmentCacheMixin):
+    """Answer GETs for unchanged pages with 304 Not Modified.
+
+    The ETag covers the fragment version, so deletes and edits to related
+    rows change it, and the object's ``updated_at`` on detail views or the
+    newest ``updated_at`` of the filtered queryset on list views. Detail
+    views also send that time as ``Last-Modified``. List views do not:
+    deleting a row leaves the newest ``updated_at`` where it was, so
+    ``If-Modified-Since`` alone would keep answering 304. The ETag also
+    covers the CSRF secret, so pages are re-rendered with fresh form tokens
+    once it rotates. Validators are checked before the page is rendered.
+    """
+
+    def get_last_modified(self):
+        if isinstance(self, MultipleObjectMixin):
+            return self.get_queryset().aggregate(Max("updated_at"))["updated_at__max"]
+        return self.object.updated_at
+
+    def get_etag(self, last_modified):
+        user = self.request.user
+        parts = [
+            self.get_fragment_version(),
+            last_modified.isoformat() if last_modified else "",
+            str(user.pk) if user.is_authenticated else "",
+            # Read from the cookie (or session) by CsrfViewMiddleware.
+            self.request.META.get("CSRF_COOKIE", ""),
+        ]
+        digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+        return f'"{digest.hexdigest()}"'
+
+    def set_validators(self, response, etag, last_modified):
+        response.headers["ETag"] = etag
+        if last_modified:
+            response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+        # Make browsers revalidate instead of guessing a freshness lifetime.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        if not isinstance(self, MultipleObjectMixin):
+            self.object = self.get_object()
+        last_modified = self.get_last_modified()
+        etag = self.get_etag(last_modified)
+        if isinstance(self, MultipleObjectMixin):
+            last_modified = None
+
+        # Pending flash messages must be rendered, so always send the page.
+        if not get_messages(request):
+            response = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=last_modified and int(last_modified.timestamp()),
+            )
+            if response is not None:
+                return self.set_validators(response, etag, last_modified)
+
+        if isinstance(self, MultipleObjectMixin):
+            response = super().get(request, *args, **kwargs)
+        else:
+            response = self.render_to_response(
+                self.get_context_data(object=self.object)
+            )
+        return self.set_validators(response, etag, last_modified)
+
+
+class BackgroundDeleteMixin:
+    """``DeleteView`` mixin deleting the object with a background task.
+
+    The object is marked ``pending_deletion`` and a ``Deletion`` records the
+    progress of ``delete_in_chunks``; the user is sent to its progress page.
+    Deleting an object that is already being deleted leads to the progress
+    page of that deletion instead of queuing another.
+    """
+
+    def form_valid(self, form):
+        from .tasks import delete_in_chunks
+
+        label = self.object._meta.label_lower
+        with transaction.atomic():
+            # Locked, so concurrent requests cannot both queue a deletion.
+            self.object = (
+                type(self.object).objects.select_for_update().get(pk=self.object.pk)
+            )
+            if self.object.pending_deletion:
+                deletion = Deletion.objects.filter(
+                    object_label=label, object_pk=self.object.pk
+                ).latest("pk")
+                messages.info(self.request, f"{self.object} is already being deleted.")
+            else:
+                self.object.pending_deletion = True
+                self.object.save(update_fields=["pending_deletion", "updated_at"])
+                deletion = Deletion.objects.create(
+                    object_label=label,
+                    object_pk=self.object.pk,
+                    object_repr=str(self.object)[:255],
+                )
+                transaction.on_commit(lambda: delete_in_chunks.delay(deletion.pk))
+        return HttpResponseRedirect(
+            reverse("sample_tracker:deletion_detail", args=[deletion.pk])
+        )
@@ -2,10 +2,13 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .managers import SampleQuerySet
+
 
 class TimeStampedModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # Indexed for conditional GETs, which read the newest value of a list.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         abstract = True
@@ -28,6 +31,9 @@ class Address(TimeStampedModel, models.Model):
     class Meta:
         verbose_name = _("Address")
         verbose_name_plural = _("Addresses")
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="address_created_idx"),
+        ]
 
 
 class Study(TimeStampedModel, models.Model):
@@ -40,6 +46,8 @@ class Study(TimeStampedModel, models.Model):
     description = models.TextField()
     start_date = models.DateField()
     end_date = models.DateField()
+    # Set while a background ``Deletion`` removes the study.
+    pending_deletion = models.BooleanField(default=False)
 
     def __str__(self):
         return self.name
@@ -47,6 +55,9 @@ class Study(TimeStampedModel, models.Model):
     class Meta:
         verbose_name = _("Study")
         verbose_name_plural = _("Studies")
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="study_created_idx"),
+        ]
 
 
 class StudySite(TimeStampedModel, models.Model):
@@ -61,6 +72,8 @@ class StudySite(TimeStampedModel, models.Model):
     )
     phone = models.CharField(max_length=255)
     email = models.EmailField()
+    # Set while a background ``Deletion`` removes the site.
+    pending_deletion = models.BooleanField(default=False)
 
     def __str__(self):
         return self.name
@@ -68,6 +81,9 @@ class StudySite(TimeStampedModel, models.Model):
     class Meta:
         verbose_name = _("Study Site")
         verbose_name_plural = _("Study Sites")
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="studysite_created_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -113,12 +129,25 @@ class Sample(TimeStampedModel, models.Model):
         max_length=10, verbose_name=_("Receiver’s Initials")
     )
 
+    objects = SampleQuerySet.as_manager()
+
     def __str__(self):
         return self.sample_id
 
     class Meta:
         verbose_name = _("Sample")
         verbose_name_plural = _("Samples")
+        indexes = [
+            models.Index(
+                fields=["collection_date", "id"], name="sample_collection_date_idx"
+            ),
+            models.Index(
+                fields=["status", "collection_date"], name="sample_status_date_idx"
+            ),
+            models.Index(
+                fields=["study_site", "collection_date"], name="sample_site_date_idx"
+            ),
+        ]
 
 
 class Plate(TimeStampedModel, models.Model):
@@ -143,6 +172,9 @@ class Plate(TimeStampedModel, models.Model):
     class Meta:
         verbose_name = _("Plate")
         verbose_name_plural = _("Plates")
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="plate_created_idx"),
+        ]
 
 
 class DNAExtraction(TimeStampedModel, models.Model):
@@ -163,6 +195,15 @@ class DNAExtraction(TimeStampedModel, models.Model):
     class Meta:
         verbose_name = _("DNA Extraction")
         verbose_name_plural = _("DNA Extractions")
+        indexes = [
+            models.Index(
+                fields=["extraction_date", "id"], name="dnaextraction_date_idx"
+            ),
+            models.Index(
+                fields=["sample", "extraction_date"],
+                name="dnaextraction_sample_date_idx",
+            ),
+        ]
 
 
 class MolecularDiagnostic(TimeStampedModel, models.Model):
@@ -194,6 +235,15 @@ class MolecularDiagnostic(TimeStampedModel, models.Model):
     class Meta:
         verbose_name = _("Molecular Diagnostic")
         verbose_name_plural = _("Molecular Diagnostics")
+        indexes = [
+            models.Index(
+                fields=["processing_date", "id"], name="moleculardiag_date_idx"
+            ),
+            models.Index(
+                fields=["sample", "processing_date"],
+                name="moleculardiag_sample_date_idx",
+            ),
+        ]
 
 
 class Storage(TimeStampedModel, models.Model):
@@ -230,6 +280,12 @@ class Storage(TimeStampedModel, models.Model):
     class Meta:
         verbose_name = _("Storage")
         verbose_name_plural = _("Storages")
+        indexes = [
+            models.Index(fields=["storage_date", "id"], name="storage_date_idx"),
+            models.Index(
+                fields=["sample", "storage_date"], name="storage_sample_date_idx"
+            ),
+        ]
 
 
 class QualityCheck(TimeStampedModel, models.Model):
@@ -257,6 +313,12 @@ class QualityCheck(TimeStampedModel, models.Model):
     class Meta:
         verbose_name = _("Quality Check")
         verbose_name_plural = _("Quality Checks")
+        indexes = [
+            models.Index(fields=["qc_date", "id"], name="qualitycheck_date_idx"),
+            models.Index(
+                fields=["sample", "qc_date"], name="qualitycheck_sample_date_idx"
+            ),
+        ]
 
 
 class Pooling(TimeStampedModel, models.Model):
@@ -287,7 +349,194 @@ class Pooling(TimeStampedModel, models.Model):
     class Meta:
         verbose_name = _("Pooling")
         verbose_name_plural = _("Pooling")
+        indexes = [
+            models.Index(fields=["pooling_date", "id"], name="pooling_date_idx"),
+        ]
+
+
+class SampleImport(TimeStampedModel, models.Model):
+    """A CSV manifest of samples imported in the background."""
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    STATUSES = (
+        (PENDING, _("Pending")),
+        (RUNNING, _("Running")),
+        (COMPLETED, _("Completed")),
+        (FAILED, _("Failed")),
+    )
+
+    filename = models.CharField(max_length=255, verbose_name=_("File Name"))
+    manifest = models.TextField(verbose_name=_("Manifest"))
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING, verbose_name=_("Status")
+    )
+    total_rows = models.PositiveIntegerField(default=0, verbose_name=_("Total Rows"))
+    processed_rows = models.PositiveIntegerField(
+        default=0, verbose_name=_("Processed Rows")
+    )
+    created_rows = models.PositiveIntegerField(
+        default=0, verbose_name=_("Created Rows")
+    )
+    errors = models.JSONField(default=list, blank=True, verbose_name=_("Errors"))
+    finished_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Finished At")
+    )
+
+    def __str__(self):
+        return f"Import of {self.filename} ({self.get_status_display()})"
+
+    @property
+    def progress(self):
+        if not self.total_rows:
+            return 100 if self.status == self.COMPLETED else 0
+        return round(100 * self.processed_rows / self.total_rows)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.COMPLETED, self.FAILED)
+
+    class Meta:
+        verbose_name = _("Sample Import")
+        verbose_name_plural = _("Sample Imports")
 
 
 class Archive(TimeStampedModel, models.Model):
-    pass
+    """A sample moved out of the hot tables with its processing history.
+
+    ``data`` holds the sample, its DNA extractions, molecular diagnostics,
+    storage moves and quality checks as zlib-compressed JSON (see
+    ``sample_tracker.archive``). The columns beside it are the ones lookups
+    and restores filter on.
+    """
+
+    sample_pk = models.PositiveBigIntegerField(unique=True)
+    sample_id = models.CharField(
+        max_length=100, unique=True, verbose_name=_("Sample ID")
+    )
+    study = models.ForeignKey(
+        Study, on_delete=models.CASCADE, related_name="archived_samples"
+    )
+    study_site = models.ForeignKey(
+        StudySite,
+        on_delete=models.CASCADE,
+        related_name="archived_samples",
+        verbose_name=_("Study Site"),
+    )
+    collection_date = models.DateField(verbose_name=_("Collection Date"))
+    data = models.BinaryField()
+
+    def __str__(self):
+        return f"Archived {self.sample_id}"
+
+    class Meta:
+        verbose_name = _("Archived Sample")
+        verbose_name_plural = _("Archived Samples")
+
+
+class Deletion(TimeStampedModel, models.Model):
+    """A study or study site deleted in the background, with its progress.
+
+    The deleted object is referenced by label and primary key, so the
+    record outlives it.
+    """
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    STATUSES = (
+        (PENDING, _("Pending")),
+        (RUNNING, _("Running")),
+        (COMPLETED, _("Completed")),
+        (FAILED, _("Failed")),
+    )
+
+    object_label = models.CharField(max_length=100, verbose_name=_("Model"))
+    object_pk = models.PositiveBigIntegerField(verbose_name=_("Object ID"))
+    object_repr = models.CharField(max_length=255, verbose_name=_("Object"))
+    status = models.CharField(
+        max_length=10, choices=STATUSES, default=PENDING, verbose_name=_("Status")
+    )
+    total_rows = models.PositiveIntegerField(default=0, verbose_name=_("Total Rows"))
+    deleted_rows = models.PositiveIntegerField(
+        default=0, verbose_name=_("Deleted Rows")
+    )
+    error = models.TextField(blank=True, verbose_name=_("Error"))
+    finished_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Finished At")
+    )
+
+    def __str__(self):
+        return f"Deletion of {self.object_repr} ({self.get_status_display()})"
+
+    @property
+    def progress(self):
+        if not self.total_rows:
+            return 100 if self.status == self.COMPLETED else 0
+        return min(100, round(100 * self.deleted_rows / self.total_rows))
+
+    @property
+    def is_finished(self):
+        return self.status in (self.COMPLETED, self.FAILED)
+
+    class Meta:
+        verbose_name = _("Deletion")
+        verbose_name_plural = _("Deletions")
+
+
+class SiteWeekRollup(TimeStampedModel, models.Model):
+    """Status counts of the samples a study site collected in one week.
+
+    Maintained by ``sample_tracker.rollups``; ``week`` is the Monday of the
+    collection week. Stage counts are samples with at least one such event.
+    """
+
+    study = models.ForeignKey(Study, on_delete=models.CASCADE, related_name="rollups")
+    study_site = models.ForeignKey(
+        StudySite, on_delete=models.CASCADE, related_name="rollups"
+    )
+    week = models.DateField(verbose_name=_("Week"))
+    samples = models.PositiveIntegerField(default=0, verbose_name=_("Samples"))
+    positive_samples = models.PositiveIntegerField(
+        default=0, verbose_name=_("Positive Samples")
+    )
+    extracted_samples = models.PositiveIntegerField(
+        default=0, verbose_name=_("Extracted Samples")
+    )
+    diagnosed_samples = models.PositiveIntegerField(
+        default=0, verbose_name=_("Diagnosed Samples")
+    )
+    stored_samples = models.PositiveIntegerField(
+        default=0, verbose_name=_("Stored Samples")
+    )
+    qc_checked_samples = models.PositiveIntegerField(
+        default=0, verbose_name=_("QC Checked Samples")
+    )
+    qc_accepted_samples = models.PositiveIntegerField(
+        default=0, verbose_name=_("QC Accepted Samples")
+    )
+
+    def __str__(self):
+        return f"{self.study_site} week of {self.week}"
+
+    class Meta:
+        verbose_name = _("Site Week Rollup")
+        verbose_name_plural = _("Site Week Rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["study_site", "week"], name="rollup_site_week_uniq"
+            ),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """How far the rollups have read ``updated_at`` of their source rows."""
+
+    name = models.CharField(max_length=50, unique=True)
+    updated_until = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} until {self.updated_until}"
@@ -0,0 +1,208 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPage:
+    """A single page of results produced by ``KeysetPaginator``."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Seek-method paginator.
+
+    Pages are addressed by an opaque cursor holding the ordering values of
+    the row at the page boundary, so fetching any page is a bounded index
+    range scan rather than an ``OFFSET`` over everything before it. The
+    ordering must be unique (end it with ``id``) and use non-null fields.
+    """
+
+    NEXT = "n"
+    PREVIOUS = "p"
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = int(per_page)
+        self.fields = [
+            (queryset.model._meta.get_field(name.lstrip("-")), name.startswith("-"))
+            for name in self.ordering
+        ]
+
+    def encode_cursor(self, obj, direction):
+        values = [field.value_to_string(obj) for field, _desc in self.fields]
+        payload = json.dumps([direction, values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            direction, raw_values = json.loads(base64.urlsafe_b64decode(padded))
+            if direction not in (self.NEXT, self.PREVIOUS):
+                raise ValueError(direction)
+            if len(raw_values) != len(self.fields):
+                raise ValueError(raw_values)
+            values = [
+                field.to_python(value)
+                for (field, _desc), value in zip(self.fields, raw_values)
+            ]
+        except (TypeError, ValueError, ValidationError, binascii.Error):
+            raise Http404(_("Invalid page cursor."))
+        return direction, values
+
+    def _seek_filter(self, values, forward):
+        # (a, b) after (x, y)  <=>  a > x OR (a = x AND b > y), with the
+        # comparison flipped for descending fields and for backward seeks.
+        condition = Q()
+        for i, (field, descending) in enumerate(self.fields):
+            lookup = "lt" if descending == forward else "gt"
+            clause = Q(**{f"{field.name}__{lookup}": values[i]})
+            for (prev_field, _desc), value in zip(self.fields[:i], values[:i]):
+                clause &= Q(**{prev_field.name: value})
+            condition |= clause
+        # Redundant, but a bound on the leading field alone lets the planner
+        # start the index scan at the cursor instead of at the first row.
+        field, descending = self.fields[0]
+        lookup = "lte" if descending == forward else "gte"
+        return Q(**{f"{field.name}__{lookup}": values[0]}) & condition
+
+    def _reverse_ordering(self):
+        return [
+            name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering
+        ]
+
+    def get_page_queryset(self, values=None, forward=True):
+        """Return the query for the page after (or before) ``values``."""
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, forward))
+        queryset = queryset.order_by(
+            *(self.ordering if forward else self._reverse_ordering())
+        )
+        # One extra row tells us whether another page follows.
+        return queryset[: self.per_page + 1]
+
+    def page(self, cursor=None):
+        direction, values = self.decode_cursor(cursor) if cursor else (self.NEXT, None)
+        forward = direction == self.NEXT
+
+        rows = list(self.get_page_queryset(values, forward))
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if not forward:
+            rows.reverse()
+
+        if forward:
+            has_next, has_previous = has_more, values is not None
+        else:
+            has_next, has_previous = True, has_more
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(rows[-1], self.NEXT)
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(rows[0], self.PREVIOUS)
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+class KeysetPaginationMixin:
+    """Cursor pagination for ``ListView`` subclasses.
+
+    Set ``keyset_ordering`` to a unique ordering backed by an index; the
+    current cursor is read from ``?cursor=`` and the links to the adjacent
+    pages are exposed as ``next_page_url`` and ``previous_page_url``.
+    """
+
+    paginate_by = 50
+    keyset_ordering = ("-created_at", "-id")
+    cursor_kwarg = "cursor"
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, self.keyset_ordering, page_size)
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def _page_url(self, cursor):
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params[self.cursor_kwarg] = cursor
+        return f"?{params.urlencode()}"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get("page_obj")
+        if page is not None:
+            context["next_page_url"] = self._page_url(page.next_cursor)
+            context["previous_page_url"] = self._page_url(page.previous_cursor)
+        return context
+
+
+class KeysetCursorPagination(BasePagination):
+    """Cursor pagination backed by ``KeysetPaginator``.
+
+    Uses the view's ``keyset_ordering``, so API pages are served by the
+    same index range scans as the HTML list pages.
+    """
+
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(
+            queryset, view.keyset_ordering, self.get_page_size(request)
+        )
+        self.page = paginator.page(request.query_params.get(self.cursor_query_param))
+        return self.page.object_list
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_link(self.page.next_cursor),
+                "previous": self.get_link(self.page.previous_cursor),
+                "results": data,
+            }
+        )
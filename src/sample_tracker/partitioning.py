@@ -0,0 +1,212 @@
+"""Yearly range partitions of the sample event tables on PostgreSQL.
+
+With ``DB_PARTITIONING=True`` migration 0007 turns the storage, quality
+check and molecular diagnostic tables into tables partitioned by their
+event date, one partition per calendar year plus a default partition for
+dates outside them. ``rotate_partitions()`` runs from Celery beat: it adds
+the partitions of the coming years and moves rows that landed in the
+default partition into partitions of their own.
+
+The primary key of a partitioned table has to include the partition key,
+so it becomes ``(id, <date>)``; ids stay unique because they come from the
+table's sequence. ``Sample`` is not partitioned: its ``sample_id`` must be
+unique across all dates and the event tables reference its ``id``, neither
+of which PostgreSQL can enforce on a table partitioned by date.
+"""
+
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db import connection as default_connection
+from django.db import transaction
+from django.utils import timezone
+
+# Partitioned models of this app and their partition key.
+PARTITION_KEYS = {
+    "moleculardiagnostic": "processing_date",
+    "storage": "storage_date",
+    "qualitycheck": "qc_date",
+}
+
+
+def partitioned_models(apps=global_apps):
+    """Yield ``(model, partition key column)`` for ``PARTITION_KEYS``."""
+    for model_name, field_name in PARTITION_KEYS.items():
+        model = apps.get_model("sample_tracker", model_name)
+        yield model, model._meta.get_field(field_name).column
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+        [table],
+    )
+    return cursor.fetchone() is not None
+
+
+def partition_names(cursor, table):
+    cursor.execute(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(%s)",
+        [table],
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def upcoming_years():
+    this_year = timezone.localdate().year
+    return range(this_year, this_year + settings.PARTITION_YEARS_AHEAD + 1)
+
+
+def year_partition(table, year):
+    return f"{table}_y{year}"
+
+
+def default_partition(table):
+    return f"{table}_default"
+
+
+def writer(cursor, statements=None):
+    """Return a function running a write statement on ``cursor``.
+
+    With a ``statements`` list the statements are appended to it instead,
+    for a dry run; the catalog reads deciding them still run.
+    """
+    return cursor.execute if statements is None else statements.append
+
+
+def create_year_partition(execute, quote, table, column, year):
+    """Attach the partition of ``year``, moving its rows out of the default.
+
+    PostgreSQL refuses a new partition while the default partition holds
+    rows in its range, so the rows are moved into the new table before it
+    is attached.
+    """
+    partition = year_partition(table, year)
+    start, end = f"'{year}-01-01'", f"'{year + 1}-01-01'"
+    execute(f"CREATE TABLE {quote(partition)} (LIKE {quote(table)} INCLUDING DEFAULTS)")
+    execute(
+        f"WITH moved AS (DELETE FROM {quote(default_partition(table))} "
+        f"WHERE {quote(column)} >= {start} AND {quote(column)} < {end} "
+        f"RETURNING *) INSERT INTO {quote(partition)} SELECT * FROM moved"
+    )
+    execute(
+        f"ALTER TABLE {quote(table)} ATTACH PARTITION {quote(partition)} "
+        f"FOR VALUES FROM ({start}) TO ({end})"
+    )
+    return partition
+
+
+def partition_table(model, column, connection=default_connection, statements=None):
+    """Convert ``model``'s table into one range-partitioned by ``column``.
+
+    Copies the rows into a partition for each year they cover and recreates
+    the indexes and constraints under their old names, holding an exclusive
+    lock on the table meanwhile. Returns False if the table is already
+    partitioned. See ``writer()`` for ``statements``.
+    """
+    table = model._meta.db_table
+    quote = connection.ops.quote_name
+    old = f"{table}_unpartitioned"
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if is_partitioned(cursor, table):
+            return False
+        execute = writer(cursor, statements)
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = %s "
+            "AND indexname <> %s",
+            [table, f"{table}_pkey"],
+        )
+        indexes = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype IN ('c', 'f')",
+            [table],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {quote(table)}")
+        last_id = cursor.fetchone()[0]
+        cursor.execute(
+            f"SELECT DISTINCT EXTRACT(YEAR FROM {quote(column)})::int "
+            f"FROM {quote(table)}"
+        )
+        years = {row[0] for row in cursor.fetchall()}
+        years.update(upcoming_years())
+
+        execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old)}")
+        # Without INCLUDING IDENTITY the id column becomes a plain bigint;
+        # it gets a sequence of its own below.
+        execute(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({quote(column)})"
+        )
+        execute(
+            f"CREATE TABLE {quote(default_partition(table))} "
+            f"PARTITION OF {quote(table)} DEFAULT"
+        )
+        for year in sorted(years):
+            create_year_partition(execute, quote, table, column, year)
+        execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old)}")
+        execute(f"DROP TABLE {quote(old)}")
+
+        sequence = f"{table}_id_seq"
+        execute(f"CREATE SEQUENCE {quote(sequence)} OWNED BY {quote(table)}.id")
+        execute(
+            f"SELECT setval('{sequence}', {max(last_id, 1)}, {str(last_id > 0).lower()})"
+        )
+        execute(
+            f"ALTER TABLE {quote(table)} ALTER COLUMN id "
+            f"SET DEFAULT nextval('{sequence}'::regclass)"
+        )
+        execute(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + '_pkey')} "
+            f"PRIMARY KEY (id, {quote(column)})"
+        )
+        for name, definition in constraints:
+            execute(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}"
+            )
+        for definition in indexes:
+            execute(definition)
+    return True
+
+
+def partition_tables(apps=global_apps, connection=default_connection, statements=None):
+    """Partition every table of ``PARTITION_KEYS`` that is not yet."""
+    return [
+        model._meta.db_table
+        for model, column in partitioned_models(apps)
+        if partition_table(model, column, connection, statements)
+    ]
+
+
+def rotate_partitions(apps=global_apps, connection=default_connection, statements=None):
+    """Create missing yearly partitions and return their names.
+
+    Covers the current year, ``PARTITION_YEARS_AHEAD`` years after it, and
+    every year with rows in a default partition. Tables that are not
+    partitioned are left alone. See ``writer()`` for ``statements``.
+    """
+    quote = connection.ops.quote_name
+    created = []
+    for model, column in partitioned_models(apps):
+        table = model._meta.db_table
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            if not is_partitioned(cursor, table):
+                continue
+            cursor.execute(
+                f"SELECT DISTINCT EXTRACT(YEAR FROM {quote(column)})::int "
+                f"FROM {quote(default_partition(table))}"
+            )
+            years = {row[0] for row in cursor.fetchall()}
+            years.update(upcoming_years())
+            existing = partition_names(cursor, table)
+            for year in sorted(years):
+                if year_partition(table, year) not in existing:
+                    created.append(
+                        create_year_partition(
+                            writer(cursor, statements), quote, table, column, year
+                        )
+                    )
+    return created
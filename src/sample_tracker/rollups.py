@@ -0,0 +1,224 @@
+"""Per study site and week status counts, refreshed incrementally.
+
+``refresh_rollups()`` finds the sites and collection weeks of samples
+whose row, or any of whose events, changed since the last refresh (by
+``updated_at``) and recomputes the ``SiteWeekRollup`` rows of those weeks
+from scratch. Deletes, and samples moved to another site or week, leave
+nothing newer behind in the weeks they left, so a full rebuild runs
+nightly as well.
+"""
+
+import datetime
+import operator
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, Max, Min, OuterRef, Q, Sum
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from .caching import invalidate_dashboard
+from .models import (
+    DNAExtraction,
+    MolecularDiagnostic,
+    QualityCheck,
+    RollupWatermark,
+    Sample,
+    SiteWeekRollup,
+    Storage,
+)
+
+WATERMARK = "site_week"
+# Each refresh re-reads this much before the watermark, so rows committed
+# by transactions that were still open at the last refresh are not missed.
+# Deleted samples leave nothing to find: their rollups are corrected by the
+# 04:00 full rebuild, except for archiving, which rebuilds its weeks itself
+# (``refresh_site_weeks()``), and deleted studies and sites, whose rollups
+# are deleted with them.
+REFRESH_OVERLAP = datetime.timedelta(minutes=5)
+
+# Rollup fields counting the samples with at least one such event.
+STAGES = {
+    "extracted_samples": Exists(DNAExtraction.objects.filter(sample=OuterRef("pk"))),
+    "diagnosed_samples": Exists(
+        MolecularDiagnostic.objects.filter(sample=OuterRef("pk"))
+    ),
+    "stored_samples": Exists(Storage.objects.filter(sample=OuterRef("pk"))),
+    "qc_checked_samples": Exists(QualityCheck.objects.filter(sample=OuterRef("pk"))),
+    "qc_accepted_samples": Exists(
+        QualityCheck.objects.filter(sample=OuterRef("pk"), status="Accepted")
+    ),
+}
+
+
+def week_of(day):
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def week_ranges(rows):
+    """Merge ``(site pk, first day, last day)`` rows into week ranges."""
+    ranges = {}
+    for site, first, last in rows:
+        if site in ranges:
+            first, last = min(first, ranges[site][0]), max(last, ranges[site][1])
+        ranges[site] = (first, last)
+    return {
+        site: (week_of(first), week_of(last)) for site, (first, last) in ranges.items()
+    }
+
+
+def changed_weeks(since):
+    """Return ``{site pk: (first week, last week)}`` of samples changed since."""
+    rows = []
+    sources = [(Sample.objects, "")]
+    sources += [
+        (model.objects, "sample__")
+        for model in (DNAExtraction, MolecularDiagnostic, Storage, QualityCheck)
+    ]
+    for manager, prefix in sources:
+        changed = (
+            manager.filter(updated_at__gt=since)
+            .values(site=F(f"{prefix}study_site_id"))
+            .annotate(
+                first=Min(f"{prefix}collection_date"),
+                last=Max(f"{prefix}collection_date"),
+            )
+            .order_by()
+        )
+        rows += [(row["site"], row["first"], row["last"]) for row in changed]
+    return week_ranges(rows)
+
+
+def in_weeks(weeks, site_field, date_field):
+    """``Q`` matching the ``{site pk: (first week, last week)}`` ranges."""
+    return reduce(
+        operator.or_,
+        (
+            Q(
+                **{
+                    site_field: site,
+                    f"{date_field}__gte": first,
+                    f"{date_field}__lt": last + datetime.timedelta(days=7),
+                }
+            )
+            for site, (first, last) in weeks.items()
+        ),
+    )
+
+
+def compute_rollups(samples):
+    """Build unsaved ``SiteWeekRollup`` rows from the ``samples`` queryset."""
+    rows = (
+        samples.annotate(week=TruncWeek("collection_date"))
+        .values("study_site_id", "study_site__study_id", "week")
+        .annotate(
+            samples=Count("pk"),
+            positive_samples=Count("pk", filter=Q(status="POS")),
+            **{
+                field: Count("pk", filter=condition)
+                for field, condition in STAGES.items()
+            },
+        )
+        .order_by()
+    )
+    return [
+        SiteWeekRollup(
+            study_id=row.pop("study_site__study_id"),
+            week=row.pop("week"),
+            **row,
+        )
+        for row in rows
+    ]
+
+
+def lock_watermark():
+    """Lock and return the watermark row, serialising rollup writers.
+
+    Call inside a transaction; two writers would otherwise insert the same
+    site week.
+    """
+    watermark, _created = RollupWatermark.objects.select_for_update().get_or_create(
+        name=WATERMARK
+    )
+    return watermark
+
+
+def replace_rollups(samples, stale):
+    """Replace the ``stale`` rollups with ones computed from ``samples``."""
+    rollups = compute_rollups(samples)
+    stale.delete()
+    SiteWeekRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
+
+
+def replace_site_weeks(weeks):
+    return replace_rollups(
+        Sample.objects.filter(in_weeks(weeks, "study_site_id", "collection_date")),
+        SiteWeekRollup.objects.filter(in_weeks(weeks, "study_site_id", "week")),
+    )
+
+
+def refresh_rollups(full=False):
+    """Bring the rollups up to date and return the number of rows written.
+
+    With ``full`` every rollup is rebuilt, dropping those of deleted
+    samples.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        watermark = lock_watermark()
+        if full or watermark.updated_until is None:
+            written = replace_rollups(
+                Sample.objects.all(), SiteWeekRollup.objects.all()
+            )
+        else:
+            weeks = changed_weeks(watermark.updated_until - REFRESH_OVERLAP)
+            written = replace_site_weeks(weeks) if weeks else 0
+        watermark.updated_until = now
+        watermark.save(update_fields=["updated_until"])
+    invalidate_dashboard()
+    return written
+
+
+def refresh_site_weeks(weeks):
+    """Rebuild the rollups of ``{site pk: (first week, last week)}`` now.
+
+    For writes that leave no newer ``updated_at`` behind, such as archiving
+    samples. Returns the number of rows written.
+    """
+    if not weeks:
+        return 0
+    with transaction.atomic():
+        lock_watermark()
+        written = replace_site_weeks(weeks)
+    invalidate_dashboard()
+    return written
+
+
+def site_summaries():
+    """Totals per study site over all weeks, with rates in percent.
+
+    Reads the rollups only, so it costs one row per site and week whatever
+    the number of samples.
+    """
+    fields = ["samples", "positive_samples", *STAGES]
+    # An aggregate cannot share its name with a field.
+    rows = list(
+        SiteWeekRollup.objects.values(
+            "study_id", "study__name", "study_site_id", "study_site__name"
+        )
+        .annotate(**{f"total_{field}": Sum(field) for field in fields})
+        .order_by("study__name", "study_site__name")
+    )
+    for row in rows:
+        for field in fields:
+            row[field] = row.pop(f"total_{field}")
+        row["positivity"] = percent(row["positive_samples"], row["samples"])
+        row["qc_acceptance"] = percent(
+            row["qc_accepted_samples"], row["qc_checked_samples"]
+        )
+    return rows
+
+
+def percent(part, whole):
+    return round(100 * part / whole, 1) if whole else None
@@ -0,0 +1,136 @@
+from django.core.exceptions import ValidationError
+from rest_framework import serializers
+
+from .extractions import resolve_plate_samples
+from .models import (
+    Address,
+    DNAExtraction,
+    MolecularDiagnostic,
+    Plate,
+    Pooling,
+    QualityCheck,
+    Sample,
+    Storage,
+    Study,
+    StudySite,
+)
+
+
+class SparseFieldsetSerializer(serializers.ModelSerializer):
+    """Model serializer that can be limited to a subset of its fields.
+
+    Pass ``fields=[...]`` to keep only those fields in the output.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class AddressSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Address
+        fields = "__all__"
+
+
+class StudySerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Study
+        fields = "__all__"
+
+
+class StudySiteSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = StudySite
+        fields = "__all__"
+
+
+class SampleSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Sample
+        fields = "__all__"
+
+
+class PlateSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Plate
+        fields = "__all__"
+
+
+class DNAExtractionSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = DNAExtraction
+        fields = "__all__"
+
+
+class MolecularDiagnosticSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = MolecularDiagnostic
+        fields = "__all__"
+
+
+class StorageSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Storage
+        fields = "__all__"
+
+
+class QualityCheckSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = QualityCheck
+        fields = "__all__"
+
+
+class PoolingSerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Pooling
+        fields = "__all__"
+
+
+class PlateExtractionSerializer(serializers.Serializer):
+    """A whole plate of DNA extractions; needs ``plate`` in the context."""
+
+    extraction_date = serializers.DateField()
+    expert_initials = serializers.CharField(max_length=10)
+    sample_ids = serializers.ListField(child=serializers.CharField())
+
+    def validate_sample_ids(self, sample_ids):
+        try:
+            self.sample_pks = resolve_plate_samples(self.context["plate"], sample_ids)
+        except ValidationError as exc:
+            raise serializers.ValidationError(exc.messages)
+        return sample_ids
+
+
+class LineageExtractionSerializer(serializers.ModelSerializer):
+    plate_number = serializers.CharField(source="plate.plate_number")
+
+    class Meta:
+        model = DNAExtraction
+        exclude = ["sample"]
+
+
+class SampleLineageSerializer(SampleSerializer):
+    """A sample with its history, read from ``Sample.objects.with_lineage()``."""
+
+    extractions = LineageExtractionSerializer(many=True, read_only=True)
+    diagnostics = serializers.SerializerMethodField()
+    storages = serializers.SerializerMethodField()
+    quality_checks = serializers.SerializerMethodField()
+
+    def _history(self, events, serializer_class):
+        data = serializer_class(events, many=True).data
+        for event in data:
+            event.pop("sample", None)
+        return data
+
+    def get_diagnostics(self, sample):
+        return self._history(sample.diagnostics, MolecularDiagnosticSerializer)
+
+    def get_storages(self, sample):
+        return self._history(sample.storages, StorageSerializer)
+
+    def get_quality_checks(self, sample):
+        return self._history(sample.quality_checks, QualityCheckSerializer)
@@ -0,0 +1,85 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .caching import bump_model_version, invalidate_dashboard, invalidate_lineage
+from .dbstats import record_connection
+from .models import (
+    Address,
+    DNAExtraction,
+    MolecularDiagnostic,
+    Plate,
+    Pooling,
+    QualityCheck,
+    Sample,
+    Storage,
+    Study,
+    StudySite,
+)
+
+
+@receiver([post_save, post_delete], sender=Study)
+@receiver([post_save, post_delete], sender=StudySite)
+@receiver([post_save, post_delete], sender=Sample)
+@receiver([post_save, post_delete], sender=QualityCheck)
+def dashboard_changed(sender, **kwargs):
+    """Drop the cached dashboard when a row it summarises changes."""
+    invalidate_dashboard()
+
+
+@receiver([post_save, post_delete], sender=Sample)
+def sample_changed(sender, instance, **kwargs):
+    invalidate_lineage(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=DNAExtraction)
+@receiver([post_save, post_delete], sender=MolecularDiagnostic)
+@receiver([post_save, post_delete], sender=Storage)
+@receiver([post_save, post_delete], sender=QualityCheck)
+def sample_history_changed(sender, instance, **kwargs):
+    """Drop the cached lineage of the sample an event belongs to."""
+    invalidate_lineage(instance.sample_id)
+
+
+@receiver([post_save, pre_delete], sender=Plate)
+def plate_changed(sender, instance, **kwargs):
+    """Drop the cached lineage of the samples extracted onto a plate.
+
+    Before a delete, while the extractions still point at the plate.
+    """
+    invalidate_lineage(
+        *DNAExtraction.objects.filter(plate=instance).values_list(
+            "sample_id", flat=True
+        )
+    )
+
+
+@receiver([post_save, post_delete], sender=Address)
+@receiver([post_save, post_delete], sender=Study)
+@receiver([post_save, post_delete], sender=StudySite)
+@receiver([post_save, post_delete], sender=Sample)
+@receiver([post_save, post_delete], sender=Plate)
+@receiver([post_save, post_delete], sender=DNAExtraction)
+@receiver([post_save, post_delete], sender=MolecularDiagnostic)
+@receiver([post_save, post_delete], sender=Storage)
+@receiver([post_save, post_delete], sender=QualityCheck)
+@receiver([post_save, post_delete], sender=Pooling)
+def model_changed(sender, **kwargs):
+    """Orphan the cached template fragments rendered from ``sender``."""
+    bump_model_version(sender)
+
+
+# Receivers that only drop caches. Bulk deletes skip them and invalidate
+# the caches once per batch instead (see sample_tracker.deletion).
+CACHE_RECEIVERS = (
+    dashboard_changed,
+    sample_changed,
+    sample_history_changed,
+    plate_changed,
+    model_changed,
+)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    record_connection(connection)
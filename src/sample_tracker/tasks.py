@@ -0,0 +1,71 @@
+from celery import shared_task
+from django.conf import settings
+from django.db import connection
+
+from . import archive, partitioning, rollups
+from .deletion import run_deletion
+from .imports import run_sample_import
+from .models import Archive, Deletion, SampleImport
+
+
+@shared_task
+def import_samples(import_id):
+    """Import the manifest attached to a ``SampleImport``."""
+    job = SampleImport.objects.get(pk=import_id)
+    run_sample_import(job)
+    return {"created_rows": job.created_rows, "errors": len(job.errors)}
+
+
+@shared_task
+def delete_in_chunks(deletion_id):
+    """Carry out a ``Deletion`` in bounded batches."""
+    deletion = Deletion.objects.get(pk=deletion_id)
+    run_deletion(deletion)
+    return {"deleted_rows": deletion.deleted_rows}
+
+
+@shared_task
+def archive_samples():
+    """Archive one batch of samples of finished studies.
+
+    Queues itself again while full batches remain, so a large backlog is
+    worked through in short transactions.
+    """
+    pks = list(
+        archive.archivable_samples()
+        .order_by("pk")
+        .values_list("pk", flat=True)[: settings.ARCHIVE_BATCH_SIZE]
+    )
+    archived = archive.archive_samples(pks) if pks else 0
+    if len(pks) == settings.ARCHIVE_BATCH_SIZE:
+        archive_samples.delay()
+    return {"archived": archived}
+
+
+@shared_task
+def restore_study_samples(study_id):
+    """Restore every archived sample of a study, a batch at a time."""
+    restored = 0
+    while True:
+        batch = list(
+            Archive.objects.filter(study_id=study_id).order_by("pk")[
+                : settings.ARCHIVE_BATCH_SIZE
+            ]
+        )
+        if not batch:
+            return {"restored": restored}
+        restored += archive.restore_samples(batch)
+
+
+@shared_task
+def rotate_partitions():
+    """Create the partitions of coming years on partitioned tables."""
+    if connection.vendor != "postgresql":
+        return {"created": []}
+    return {"created": partitioning.rotate_partitions()}
+
+
+@shared_task
+def refresh_rollups(full=False):
+    """Update the per site and week rollups; see ``sample_tracker.rollups``."""
+    return {"rollups": rollups.refresh_rollups(full=full)}
@@ -1,3 +1,1204 @@
-from django.test import TestCase
+import datetime
+import importlib
+import io
+import time
+from types import SimpleNamespace
+from unittest import mock, skipIf, skipUnless
 
-# Create your tests here.
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.db.models import Count, F, Max
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from django.utils.http import http_date
+
+from accounts.models import User
+from reslab_manager.testing import QueryBudgetMixin, format_queries
+
+from .archive import archivable_samples, archive_samples, restore_samples
+from .deletion import run_deletion
+from .imports import run_sample_import
+from .management.commands.audit_query_plans import iter_patterns
+from .models import (
+    Address,
+    Archive,
+    Deletion,
+    DNAExtraction,
+    MolecularDiagnostic,
+    Plate,
+    Pooling,
+    QualityCheck,
+    Sample,
+    SampleImport,
+    SiteWeekRollup,
+    Storage,
+    Study,
+    StudySite,
+)
+from .pagination import KeysetPaginator
+from .partitioning import is_partitioned
+from .rollups import refresh_rollups, site_summaries
+
+# Most queries each page may run, with the cache disabled. Lists are paged
+# and detail pages load related rows up front, so none of these may grow
+# with the number of rows.
+QUERY_BUDGETS = {
+    "sample_tracker:dashboard_home": 6,
+    "sample_tracker:database_status": 1,
+    "sample_tracker:sample_autocomplete": 1,
+    "sample_tracker:plate_autocomplete": 1,
+    "sample_tracker:study_list": 2,
+    "sample_tracker:study_detail": 2,
+    "sample_tracker:study_create": 0,
+    "sample_tracker:study_update": 1,
+    "sample_tracker:study_delete": 1,
+    "sample_tracker:study_export": 2,
+    "sample_tracker:study_archive_restore": 0,
+    "sample_tracker:study_site_list": 2,
+    "sample_tracker:study_site_detail": 1,
+    "sample_tracker:study_site_create": 2,
+    "sample_tracker:study_site_update": 3,
+    "sample_tracker:study_site_delete": 1,
+    "sample_tracker:sample_list": 2,
+    "sample_tracker:sample_detail": 5,
+    "sample_tracker:sample_barcode": 6,
+    "sample_tracker:sample_restore": 0,
+    "sample_tracker:sample_create": 1,
+    "sample_tracker:sample_import_create": 0,
+    "sample_tracker:sample_import_detail": 1,
+    "sample_tracker:sample_import_status": 1,
+    "sample_tracker:deletion_detail": 1,
+    "sample_tracker:deletion_status": 1,
+    "sample_tracker:plate_list": 2,
+    "sample_tracker:plate_detail": 2,
+    "sample_tracker:plate_extraction_create": 1,
+    "sample_tracker:dna_extraction_list": 2,
+    "sample_tracker:dna_extraction_detail": 1,
+    "sample_tracker:dna_extraction_create": 0,
+    "sample_tracker:dna_extraction_update": 3,
+    "sample_tracker:molecular_diagnostic_list": 2,
+    "sample_tracker:molecular_diagnostic_detail": 1,
+    "sample_tracker:molecular_diagnostic_create": 0,
+    "sample_tracker:molecular_diagnostic_update": 2,
+    "sample_tracker:storage_list": 2,
+    "sample_tracker:storage_create": 0,
+    "sample_tracker:storage_update": 2,
+    "sample_tracker:quality_check_list": 2,
+    "sample_tracker:quality_check_detail": 1,
+    "sample_tracker:quality_check_create": 0,
+    "sample_tracker:quality_check_update": 2,
+    "sample_tracker:pooling_list": 2,
+    "sample_tracker:pooling_detail": 1,
+    "sample_tracker:pooling_create": 0,
+    "sample_tracker:pooling_update": 2,
+}
+
+# Pages whose templates do not exist yet; they fail before a budget applies.
+MISSING_TEMPLATES = {
+    "sample_tracker:address_list",
+    "sample_tracker:address_create",
+    "sample_tracker:address_update",
+    "sample_tracker:address_delete",
+    "sample_tracker:sample_update",
+    "sample_tracker:sample_delete",
+    "sample_tracker:plate_create",
+    "sample_tracker:plate_update",
+    "sample_tracker:plate_delete",
+    "sample_tracker:dna_extraction_delete",
+    "sample_tracker:molecular_diagnostic_delete",
+    "sample_tracker:storage_delete",
+    "sample_tracker:quality_check_delete",
+    "sample_tracker:pooling_delete",
+}
+
+# Routes that only accept POST answer GETs without touching the database.
+STATUS_CODES = {
+    "sample_tracker:study_archive_restore": 405,
+    "sample_tracker:sample_restore": 405,
+}
+
+QUERY_PARAMS = {
+    "sample_tracker:sample_autocomplete": {"q": "BUD"},
+    "sample_tracker:plate_autocomplete": {"q": "BUD"},
+}
+
+
+def create_rows(samples):
+    """Create a study, site and plate with ``samples`` fully processed samples."""
+    n = Study.objects.count() + 1
+    day = datetime.date(2024, 1, 1)
+    study = Study.objects.create(
+        name=f"Budget study {n}",
+        code=f"BUD-{n}",
+        description="Query budget fixture.",
+        start_date=day,
+        end_date=day + datetime.timedelta(days=365),
+    )
+    address = Address.objects.create(ward="Ward", district="District", postal_code="1")
+    site = StudySite.objects.create(
+        study=study,
+        name=f"Budget site {n}",
+        address=address,
+        phone="+255700000000",
+        email="site@example.org",
+    )
+    plate = Plate.objects.create(
+        plate_number=f"BUD-P{n}",
+        plate_label="Plate",
+        status="POS",
+        volume=100,
+        freezer_number="1",
+        shelf_number="1",
+    )
+    first = Sample.objects.count()
+    created = Sample.objects.bulk_create(
+        Sample(
+            sample_id=f"BUD{first + i:06d}",
+            sample_type="DBS",
+            study_site=site,
+            collection_date=day + datetime.timedelta(days=i),
+            status="POS" if i % 3 else "NEG",
+            container_label="Box",
+            container_location="Freezer",
+            receiver_initials="AB",
+        )
+        for i in range(samples)
+    )
+    for model, values in (
+        (DNAExtraction, {"plate": plate, "extraction_date": day}),
+        (MolecularDiagnostic, {"technique": "qPCR", "processing_date": day}),
+        (
+            Storage,
+            {
+                "container_number": "1",
+                "container_label": "Rack",
+                "container_location": "Freezer",
+                "storage_type": "Archived",
+                "storage_date": day,
+            },
+        ),
+        (QualityCheck, {"status": "Accepted", "qc_date": day}),
+    ):
+        model.objects.bulk_create(
+            model(sample=sample, expert_initials="AB", **values) for sample in created
+        )
+    Pooling.objects.create(
+        pooling_date=day,
+        pool_name=f"Pool {n}",
+        capture_plate=plate,
+        number_of_plates=1,
+        rack_compartment_number="1",
+        fridge_freezer_number="1",
+        expert_initials="AB",
+    )
+    SampleImport.objects.create(filename=f"manifest-{n}.csv", manifest="sample_id\n")
+    Deletion.objects.create(
+        object_label="sample_tracker.study", object_pk=0, object_repr="Deleted"
+    )
+
+
+def route_requests():
+    """Yield ``(route name, url, query params)`` for every sample_tracker route.
+
+    Routes taking a primary key use the first row of the view's model.
+    """
+    for name, pattern in iter_patterns(get_resolver().url_patterns):
+        if not name or not name.startswith("sample_tracker:"):
+            continue
+        kwargs = {}
+        converters = pattern.pattern.converters
+        if "pk" in converters:
+            view_class = pattern.callback.view_class
+            model = view_class.model or view_class.queryset.model
+            kwargs["pk"] = model.objects.order_by("pk").first().pk
+        if "sample_id" in converters:
+            kwargs["sample_id"] = Sample.objects.order_by("pk").first().sample_id
+        if "dataset" in converters:
+            kwargs.update(dataset="samples", file_format="csv")
+        yield name, reverse(name, kwargs=kwargs), QUERY_PARAMS.get(name)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+    REQUEST_METRICS_SAMPLE_RATE=0,
+)
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Hold every page to a fixed number of queries and a render time.
+
+    The cache is disabled so the budgets are the worst case.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(60)
+        create_rows(20)
+
+    def test_every_route_has_a_budget(self):
+        names = {name for name, _url, _params in route_requests()}
+        self.assertEqual(
+            names - set(QUERY_BUDGETS) - MISSING_TEMPLATES,
+            set(),
+            "Add a query budget for new routes.",
+        )
+        self.assertEqual(set(QUERY_BUDGETS) - names, set(), "Stale query budgets.")
+
+    def test_query_budgets(self):
+        for name, url, params in route_requests():
+            with self.subTest(route=name):
+                if name in MISSING_TEMPLATES:
+                    self.skipTest("template missing")
+                self.assertQueryBudget(
+                    url,
+                    QUERY_BUDGETS[name],
+                    data=params,
+                    status_code=STATUS_CODES.get(name, 200),
+                )
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        before = {}
+        for name, url, params in route_requests():
+            if name not in MISSING_TEMPLATES:
+                before[name] = len(self.measure(url, data=params)[1])
+
+        # Grow every table, including the rows the detail pages show.
+        create_rows(150)
+        first_plate = Plate.objects.order_by("pk").first()
+        DNAExtraction.objects.bulk_create(
+            DNAExtraction(
+                sample=sample,
+                plate=first_plate,
+                extraction_date=datetime.date(2024, 6, 1),
+                expert_initials="CD",
+            )
+            for sample in Sample.objects.order_by("-pk")[:100]
+        )
+        first_sample = Sample.objects.order_by("pk").first()
+        QualityCheck.objects.bulk_create(
+            QualityCheck(
+                sample=first_sample,
+                status="Rejected",
+                qc_date=datetime.date(2024, 6, 1),
+                expert_initials="CD",
+            )
+            for _ in range(20)
+        )
+
+        for name, url, params in route_requests():
+            if name not in before:
+                continue
+            with self.subTest(route=name):
+                _response, queries, _seconds = self.measure(url, data=params)
+                if len(queries) != before[name]:
+                    self.fail(
+                        f"{url} ran {before[name]} queries before adding rows "
+                        f"and {len(queries)} after:\n{format_queries(queries)}"
+                    )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+    REQUEST_METRICS_SAMPLE_RATE=0,
+)
+class ArchiveTests(QueryBudgetMixin, TestCase):
+    """Archive samples of finished studies, read them and restore them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(5)
+
+    def snapshot(self):
+        return {
+            model: list(model.objects.order_by("pk").values())
+            for model in (
+                Sample,
+                DNAExtraction,
+                MolecularDiagnostic,
+                Storage,
+                QualityCheck,
+            )
+        }
+
+    def test_archivable_samples(self):
+        # The fixture study ends 2024-12-31 and its rows were just written.
+        self.assertFalse(archivable_samples().exists())
+        later = datetime.date.today() + datetime.timedelta(days=365)
+        self.assertEqual(archivable_samples(today=later).count(), 5)
+
+    def test_archive_and_restore(self):
+        before = self.snapshot()
+        sample = Sample.objects.order_by("pk").first()
+        refresh_rollups(full=True)
+
+        self.assertEqual(archive_samples(Sample.objects.values("pk")), 5)
+        self.assertFalse(Sample.objects.exists())
+        self.assertFalse(DNAExtraction.objects.exists())
+        self.assertEqual(Archive.objects.count(), 5)
+        self.assertEqual(site_summaries(), [])
+
+        for name, kwargs in (
+            ("sample_tracker:sample_detail", {"pk": sample.pk}),
+            ("sample_tracker:sample_barcode", {"sample_id": sample.sample_id}),
+        ):
+            response = self.assertQueryBudget(reverse(name, kwargs=kwargs), 3)
+            self.assertContains(response, "Archived sample")
+            self.assertContains(response, "BUD-P1")
+
+        restore_samples(Archive.objects.all())
+        self.assertFalse(Archive.objects.exists())
+        self.assertEqual([row["samples"] for row in site_summaries()], [5])
+        after = self.snapshot()
+        for model, rows in before.items():
+            self.assertEqual(after[model], rows, model.__name__)
+
+    def test_restore_view(self):
+        sample = Sample.objects.order_by("pk").first()
+        archive_samples([sample.pk])
+        response = self.client.post(
+            reverse("sample_tracker:sample_restore", args=[sample.sample_id])
+        )
+        self.assertRedirects(
+            response, reverse("sample_tracker:sample_detail", args=[sample.pk])
+        )
+        self.assertTrue(Sample.objects.filter(pk=sample.pk).exists())
+        self.assertEqual(DNAExtraction.objects.filter(sample=sample).count(), 1)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+    REQUEST_METRICS_SAMPLE_RATE=0,
+)
+class DeletionTests(TestCase):
+    """Delete studies and sites in the background."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(30)
+        create_rows(5)
+
+    def delete(self, name, obj):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(reverse(name, args=[obj.pk]))
+        deletion = Deletion.objects.latest("pk")
+        self.assertRedirects(
+            response, reverse("sample_tracker:deletion_detail", args=[deletion.pk])
+        )
+        self.assertEqual(len(callbacks), 1)
+        obj.refresh_from_db()
+        self.assertTrue(obj.pending_deletion)
+        return run_deletion(deletion)
+
+    def test_delete_study(self):
+        study = Study.objects.order_by("pk").first()
+        site = study.study_sites.get()
+        archive_samples(Sample.objects.filter(study_site=site).values("pk")[:3])
+
+        deletion = self.delete("sample_tracker:study_delete", study)
+
+        self.assertEqual(deletion.status, Deletion.COMPLETED)
+        # 1 study, 1 site, 27 samples with 4 events each, 3 archives and
+        # the rollup of the week archiving rebuilt.
+        self.assertEqual(deletion.total_rows, 1 + 1 + 27 * 5 + 3 + 1)
+        self.assertEqual(deletion.deleted_rows, deletion.total_rows)
+        self.assertEqual(deletion.progress, 100)
+        self.assertFalse(Study.objects.filter(pk=study.pk).exists())
+        self.assertFalse(Archive.objects.exists())
+        self.assertEqual(Sample.objects.count(), 5)
+        self.assertEqual(QualityCheck.objects.count(), 5)
+
+    def test_delete_study_site(self):
+        site = StudySite.objects.order_by("pk").last()
+        deletion = self.delete("sample_tracker:study_site_delete", site)
+        self.assertEqual(deletion.deleted_rows, 1 + 5 * 5)
+        self.assertEqual(Sample.objects.count(), 30)
+        self.assertTrue(Study.objects.filter(pk=site.study_id).exists())
+        response = self.client.get(
+            reverse("sample_tracker:deletion_status", args=[deletion.pk])
+        )
+        self.assertEqual(response.json()["status"], Deletion.COMPLETED)
+
+    def test_delete_pending(self):
+        site = StudySite.objects.order_by("pk").last()
+        url = reverse("sample_tracker:study_site_delete", args=[site.pk])
+        self.client.post(url)
+        deletion = Deletion.objects.latest("pk")
+        count = Deletion.objects.count()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(url, follow=True)
+        self.assertRedirects(
+            response, reverse("sample_tracker:deletion_detail", args=[deletion.pk])
+        )
+        self.assertContains(response, "is already being deleted")
+        self.assertEqual(callbacks, [])
+        self.assertEqual(Deletion.objects.count(), count)
+
+    def test_failed_deletion_can_be_retried(self):
+        site = StudySite.objects.order_by("pk").last()
+        with mock.patch(
+            "sample_tracker.deletion.delete_batch", side_effect=RuntimeError("gone")
+        ):
+            with self.assertRaises(RuntimeError):
+                self.delete("sample_tracker:study_site_delete", site)
+
+        deletion = Deletion.objects.latest("pk")
+        self.assertEqual(deletion.status, Deletion.FAILED)
+        site.refresh_from_db()
+        self.assertFalse(site.pending_deletion)
+        response = self.client.get(reverse("sample_tracker:study_site_list"))
+        self.assertContains(response, site.name)
+
+        deletion = self.delete("sample_tracker:study_site_delete", site)
+        self.assertEqual(deletion.status, Deletion.COMPLETED)
+
+
+class RollupTests(TestCase):
+    """Roll sample status up per study site and week."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(30)
+        create_rows(5)
+        # Older than the overlap each refresh re-reads.
+        long_ago = timezone.now() - datetime.timedelta(days=1)
+        for model in (
+            Sample,
+            DNAExtraction,
+            MolecularDiagnostic,
+            Storage,
+            QualityCheck,
+        ):
+            model.objects.update(updated_at=long_ago)
+
+    def summary(self, site):
+        return next(row for row in site_summaries() if row["study_site_id"] == site.pk)
+
+    def test_full_refresh(self):
+        # 30 daily samples from a Monday span 5 weeks, 5 samples 1 week.
+        self.assertEqual(refresh_rollups(full=True), 6)
+        site = StudySite.objects.order_by("pk").first()
+        summary = self.summary(site)
+        self.assertEqual(summary["samples"], 30)
+        self.assertEqual(summary["positive_samples"], 20)
+        self.assertEqual(summary["positivity"], 66.7)
+        self.assertEqual(summary["qc_acceptance"], 100)
+        self.assertEqual(summary["stored_samples"], 30)
+
+    def test_incremental_refresh(self):
+        refresh_rollups(full=True)
+        first, other = StudySite.objects.order_by("pk")
+        untouched = set(SiteWeekRollup.objects.exclude(week="2024-01-01"))
+
+        # A rejected quality check in the first week of the first site.
+        check = QualityCheck.objects.get(sample__sample_id="BUD000000")
+        check.status = "Rejected"
+        check.save()
+        self.assertEqual(refresh_rollups(), 1)
+
+        self.assertEqual(self.summary(first)["qc_accepted_samples"], 29)
+        self.assertEqual(self.summary(other)["qc_accepted_samples"], 5)
+        self.assertLessEqual(
+            untouched, set(SiteWeekRollup.objects.all()), "Other weeks were rebuilt"
+        )
+        self.assertEqual(refresh_rollups(), 1, "Changes within the overlap re-read")
+
+    def test_dashboard(self):
+        refresh_rollups()
+        response = self.client.get(reverse("sample_tracker:dashboard_home"))
+        self.assertContains(response, "66.7%")
+
+
+class KeysetPaginationTests(TestCase):
+    """Page through rows by cursor."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for _ in range(5):
+            create_rows(1)
+        # Ties on the leading key are broken by id.
+        Study.objects.update(created_at=timezone.now())
+        cls.pks = list(Study.objects.order_by("-pk").values_list("pk", flat=True))
+
+    def paginator(self):
+        return KeysetPaginator(Study.objects.all(), ("-created_at", "-id"), 2)
+
+    def test_next_and_previous_cursors(self):
+        paginator = self.paginator()
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+
+        self.assertEqual(
+            [[study.pk for study in page] for page in pages],
+            [self.pks[0:2], self.pks[2:4], self.pks[4:]],
+        )
+        self.assertFalse(pages[0].has_previous())
+        previous = paginator.page(pages[-1].previous_cursor)
+        self.assertEqual([study.pk for study in previous], self.pks[2:4])
+        self.assertTrue(previous.has_next())
+        first = paginator.page(previous.previous_cursor)
+        self.assertEqual([study.pk for study in first], self.pks[0:2])
+        self.assertFalse(first.has_previous())
+
+    def test_invalid_cursors(self):
+        for cursor in ("garbage", "W10", "WyJ4IixbXV0"):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse("sample_tracker:study_list"), {"cursor": cursor}
+                )
+                self.assertEqual(response.status_code, 404)
+
+
+@override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+class APITests(TestCase):
+    """Read and write through the REST API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for _ in range(3):
+            create_rows(1)
+        cls.user = User.objects.create_user(email="lab@example.org", password="x")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_permissions(self):
+        url = reverse("study-list")
+        data = {
+            "name": "New study",
+            "code": "NEW",
+            "description": "API",
+            "start_date": "2024-01-01",
+            "end_date": "2024-12-31",
+        }
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.post(url, data).status_code, 403)
+
+        # Staff hold every model permission.
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.post(url, data).status_code, 201)
+
+    def test_cursors(self):
+        url, ids = reverse("study-list"), []
+        params = {"page_size": 2}
+        while url:
+            response = self.client.get(url, params)
+            ids += [study["id"] for study in response.json()["results"]]
+            url, params = response.json()["next"], None
+        self.assertEqual(
+            ids,
+            list(
+                Study.objects.order_by("-created_at", "-id").values_list(
+                    "pk", flat=True
+                )
+            ),
+        )
+
+    def test_sparse_fields(self):
+        response = self.client.get(reverse("sample-list"), {"fields": "id,sample_id"})
+        self.assertEqual(
+            {tuple(row) for row in response.json()["results"]}, {("id", "sample_id")}
+        )
+        response = self.client.get(reverse("sample-list"), {"fields": "id,nope"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("nope", response.json()["fields"])
+
+    def test_not_modified(self):
+        study = Study.objects.first()
+        for url in (reverse("study-list"), reverse("study-detail", args=[study.pk])):
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], etag)
+
+                study.save()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response["ETag"], etag)
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "reslab_manager.cache.InstrumentedRedisCache",
+            # Nothing listens here, so every command is interrupted.
+            "LOCATION": "redis://127.0.0.1:1/0",
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                "IGNORE_EXCEPTIONS": True,
+            },
+        }
+    },
+    REQUEST_METRICS_SAMPLE_RATE=0,
+)
+class CacheOutageTests(TestCase):
+    """Serve pages as cache misses while Redis is unreachable."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(3)
+
+    def test_get_many_returns_a_fresh_dict(self):
+        values = cache.get_many(["a", "b"])
+        values["a"] = 1
+        self.assertEqual(cache.get_many(["a", "b"]), {})
+
+    def test_pages(self):
+        study = Study.objects.get()
+        urls = [
+            reverse("sample_tracker:dashboard_home"),
+            reverse("sample_tracker:study_detail", args=[study.pk]),
+            reverse("sample_tracker:study_site_list"),
+            reverse("sample_tracker:storage_list"),
+        ]
+        # Twice, so a first request cannot leave state that breaks the next.
+        for url in urls * 2:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                metrics = response.wsgi_request.metrics
+                self.assertEqual(metrics.cache_hits, 0)
+                self.assertGreater(metrics.cache_misses, 0)
+
+
+@override_settings(
+    # Model versions need a cache that keeps them.
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    REQUEST_METRICS_SAMPLE_RATE=0,
+)
+class ConditionalGetTests(TestCase):
+    """Answer unchanged pages with 304 Not Modified."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(3)
+        create_rows(3)
+
+    def test_detail(self):
+        study = Study.objects.first()
+        url = reverse("sample_tracker:study_detail", args=[study.pk])
+        response = self.client.get(url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        study.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_csrf_rotation(self):
+        # Forms on the page embed the CSRF token, so a new secret must not
+        # be answered with a cached page.
+        study = Study.objects.first()
+        url = reverse("sample_tracker:study_detail", args=[study.pk])
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = get_random_string(32)
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = get_random_string(32)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list(self):
+        url = reverse("sample_tracker:storage_list")
+        response = self.client.get(url)
+        self.assertNotIn("Last-Modified", response)
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # The newest row stays, so only the model version marks the change.
+        Storage.objects.order_by("updated_at").first().delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_pending_messages_are_rendered(self):
+        study = Study.objects.first()
+        url = reverse("sample_tracker:study_detail", args=[study.pk])
+        etag = self.client.get(url)["ETag"]
+
+        self.client.post(
+            reverse("sample_tracker:study_archive_restore", args=[study.pk])
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Restoring the archived samples")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class RequestMetricsTests(TestCase):
+    """Never let recording metrics fail a request."""
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_metrics_failure_keeps_the_response(self):
+        with (
+            mock.patch(
+                "reslab_manager.instrumentation.observe_request",
+                side_effect=ValueError("broken counter"),
+            ),
+            self.assertLogs("reslab_manager.instrumentation", "ERROR"),
+        ):
+            response = self.client.get(reverse("sample_tracker:dashboard_home"))
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    REQUEST_METRICS_SAMPLE_RATE=0,
+)
+class DashboardCacheTests(TestCase):
+    """Serve the dashboard from cache until a row it summarises changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(3)
+        refresh_rollups(full=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def dashboard(self):
+        return self.client.get(reverse("sample_tracker:dashboard_home")).context
+
+    def test_served_from_cache(self):
+        self.dashboard()
+        with self.assertNumQueries(0):
+            self.dashboard()
+
+    def test_sample_changes(self):
+        self.assertEqual(self.dashboard()["sample_count"], 3)
+        sample = Sample.objects.order_by("-collection_date").first()
+        sample.pk, sample.sample_id = None, "NEW000001"
+        sample.collection_date += datetime.timedelta(days=1)
+        sample.save()
+        context = self.dashboard()
+        self.assertEqual(context["sample_count"], 4)
+        self.assertEqual(context["recent_samples"][0].sample_id, "NEW000001")
+
+    def test_study_site_changes(self):
+        self.dashboard()
+        site = StudySite.objects.get()
+        site.name = "Renamed site"
+        site.save()
+        context = self.dashboard()
+        self.assertEqual(context["recent_samples"][0].study_site.name, "Renamed site")
+        self.assertEqual(
+            context["site_summaries"][0]["study_site__name"], "Renamed site"
+        )
+
+    def test_quality_check_changes(self):
+        self.assertEqual(self.dashboard()["accepted_quality_count"], 3)
+        check = QualityCheck.objects.first()
+        check.status = "Rejected"
+        check.save()
+        context = self.dashboard()
+        self.assertEqual(context["accepted_quality_count"], 2)
+        self.assertEqual(context["rejected_quality_count"], 1)
+
+    def test_rollup_refresh(self):
+        self.assertEqual(
+            self.dashboard()["site_summaries"][0]["qc_accepted_samples"], 3
+        )
+        QualityCheck.objects.update(status="Rejected")
+        refresh_rollups(full=True)
+        self.assertEqual(
+            self.dashboard()["site_summaries"][0]["qc_accepted_samples"], 0
+        )
+
+
+class SampleImportTests(TestCase):
+    """Import sample manifests in batches."""
+
+    HEADER = (
+        "sample_id,sample_type,study_site,collection_date,status,"
+        "container_label,container_location,receiver_initials\n"
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(1)
+
+    def run_import(self, *lines):
+        job = SampleImport.objects.create(
+            filename="manifest.csv", manifest=self.HEADER + "".join(lines)
+        )
+        return run_sample_import(job)
+
+    def row(self, sample_id, site="Budget site 1", sample_type="DBS", day="2024-02-01"):
+        return f"{sample_id},{sample_type},{site},{day},POS,Box,Freezer,AB\n"
+
+    def errors(self, job):
+        return {error["line"]: set(error["errors"]) for error in job.errors}
+
+    @mock.patch("sample_tracker.imports.IMPORT_BATCH_SIZE", 2)
+    def test_import(self):
+        job = self.run_import(
+            self.row("NEW001"),
+            self.row("NEW002"),
+            self.row("NEW001"),
+            self.row("NEW003", site="Nowhere"),
+            self.row("BUD000000"),
+            self.row("NEW004", sample_type="XYZ"),
+            self.row("NEW005", day="2024-13-01"),
+            self.row("NEW006"),
+        )
+        self.assertEqual(job.status, SampleImport.COMPLETED)
+        self.assertEqual(
+            (job.total_rows, job.processed_rows, job.created_rows), (8, 8, 3)
+        )
+        self.assertEqual(
+            self.errors(job),
+            {
+                4: {"sample_id"},
+                5: {"study_site"},
+                6: {"sample_id"},
+                7: {"sample_type"},
+                8: {"collection_date"},
+            },
+        )
+        self.assertIn("Duplicate", job.errors[0]["errors"]["sample_id"][0])
+        self.assertIn("already exists", job.errors[2]["errors"]["sample_id"][0])
+        self.assertEqual(
+            set(
+                Sample.objects.filter(sample_id__startswith="NEW").values_list(
+                    "sample_id", flat=True
+                )
+            ),
+            {"NEW001", "NEW002", "NEW006"},
+        )
+
+    def test_integrity_error_flags_the_batch(self):
+        with mock.patch.object(
+            Sample.objects, "bulk_create", side_effect=IntegrityError("race")
+        ):
+            job = self.run_import(self.row("NEW001"), self.row("NEW002"))
+        self.assertEqual(job.created_rows, 0)
+        self.assertEqual(self.errors(job), {2: {"__all__"}, 3: {"__all__"}})
+        self.assertFalse(Sample.objects.filter(sample_id__startswith="NEW").exists())
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+    REQUEST_METRICS_SAMPLE_RATE=0,
+)
+class SampleSearchTests(QueryBudgetMixin, TestCase):
+    """Find samples by identifier and label."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(12)
+        Sample.objects.filter(sample_id="BUD000003").update(
+            container_label="Rack A7", small_bag_number="SB-77"
+        )
+        Sample.objects.filter(sample_id="BUD000004").update(sample_id="X1")
+
+    def found(self, term):
+        return set(Sample.objects.search(term).values_list("sample_id", flat=True))
+
+    def test_search(self):
+        self.assertEqual(self.found("rack a7"), {"BUD000003"})
+        self.assertEqual(self.found("sb-77"), {"BUD000003"})
+        self.assertEqual(self.found("00001"), {"BUD000001", "BUD000010", "BUD000011"})
+        self.assertEqual(len(self.found("")), 12)
+
+    def test_short_terms_match_whole_ids(self):
+        self.assertEqual(self.found("x1"), {"X1"})
+        self.assertEqual(self.found("X"), set())
+
+    def test_sample_list(self):
+        response = self.assertQueryBudget(
+            reverse("sample_tracker:sample_list"), 2, data={"q": "rack a7"}
+        )
+        self.assertEqual(
+            [sample.sample_id for sample in response.context["samples"]],
+            ["BUD000003"],
+        )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+    REQUEST_METRICS_SAMPLE_RATE=0,
+)
+class AutocompleteTests(QueryBudgetMixin, TestCase):
+    """Page autocomplete options by label."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(25)
+        create_rows(1)
+
+    def options(self, name, params, max_queries=1):
+        response = self.assertQueryBudget(
+            reverse(f"sample_tracker:{name}"), max_queries, data=params
+        )
+        data = response.json()
+        return [result["name"] for result in data["results"]], data["after"]
+
+    def test_pages(self):
+        names, after = self.options("sample_autocomplete", {"q": "BUD"})
+        self.assertEqual(names, [f"BUD{i:06d}" for i in range(20)])
+        self.assertEqual(after, "BUD000019")
+
+        names, after = self.options("sample_autocomplete", {"q": "BUD", "after": after})
+        self.assertEqual(names, [f"BUD{i:06d}" for i in range(20, 26)])
+        self.assertIsNone(after)
+
+    def test_short_terms_match_prefixes(self):
+        names, _after = self.options("sample_autocomplete", {"q": "bu"})
+        self.assertEqual(len(names), 20)
+        names, _after = self.options("sample_autocomplete", {"q": "UD"})
+        self.assertEqual(names, [])
+
+    def test_plates(self):
+        self.assertEqual(
+            self.options("plate_autocomplete", {"q": "p2"}), (["BUD-P2"], None)
+        )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    REQUEST_METRICS_SAMPLE_RATE=0,
+)
+class LineageCacheTests(TestCase):
+    """Keep the cached sample detail page in step with related rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(2)
+
+    def setUp(self):
+        cache.clear()
+        self.sample = Sample.objects.order_by("pk").first()
+        self.url = reverse("sample_tracker:sample_detail", args=[self.sample.pk])
+
+    def test_renamed_study_site(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, "Budget site 1")
+        site = StudySite.objects.get()
+        site.name = "Renamed site"
+        site.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertContains(response, "Renamed site")
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code,
+            304,
+        )
+
+    def test_deleted_plate(self):
+        self.assertContains(self.client.get(self.url), "BUD-P1")
+        Pooling.objects.all().delete()
+        Plate.objects.get().delete()
+        self.assertNotContains(self.client.get(self.url), "BUD-P1")
+
+
+@override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+class PlateExtractionTests(TestCase):
+    """Record a whole plate of DNA extractions, through the form and the API."""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_rows(4)
+        cls.used = Plate.objects.get()
+        cls.empty = Plate.objects.create(
+            plate_number="EMPTY-P1",
+            plate_label="Plate",
+            status="POS",
+            volume=100,
+            freezer_number="1",
+            shelf_number="1",
+        )
+        cls.user = User.objects.create_user(
+            email="lab@example.org", password="x", is_staff=True
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post_form(self, plate, sample_ids):
+        """Return the sample ID errors of the form, or None on success."""
+        response = self.client.post(
+            reverse("sample_tracker:plate_extraction_create", args=[plate.pk]),
+            {
+                "extraction_date": "2024-03-01",
+                "expert_initials": "AB",
+                "sample_ids": "\n".join(sample_ids),
+            },
+        )
+        if response.status_code == 302:
+            return None
+        return response.context["form"].errors["sample_ids"]
+
+    def post_api(self, plate, sample_ids):
+        response = self.client.post(
+            reverse("plate-extractions", args=[plate.pk]),
+            {
+                "extraction_date": "2024-03-01",
+                "expert_initials": "AB",
+                "sample_ids": sample_ids,
+            },
+            content_type="application/json",
+        )
+        if response.status_code == 201:
+            return None
+        self.assertEqual(response.status_code, 400)
+        return response.json()["sample_ids"]
+
+    def assertRejected(self, plate, sample_ids, message):
+        for post in (self.post_form, self.post_api):
+            with self.subTest(post=post.__name__):
+                errors = post(plate, sample_ids)
+                self.assertIsNotNone(errors)
+                self.assertIn(message, " ".join(errors))
+        self.assertFalse(DNAExtraction.objects.filter(plate=self.empty).exists())
+
+    def test_duplicate(self):
+        self.assertRejected(
+            self.empty, ["BUD000000", "BUD000000"], "more than once: BUD000000"
+        )
+
+    def test_unknown(self):
+        self.assertRejected(
+            self.empty, ["BUD000000", "NOPE"], "Unknown sample IDs: NOPE"
+        )
+
+    def test_already_extracted(self):
+        self.assertRejected(
+            self.used, ["BUD000001"], "Already extracted onto plate BUD-P1: BUD000001"
+        )
+
+    @mock.patch("sample_tracker.extractions.PLATE_MAX_WELLS", 5)
+    def test_over_capacity(self):
+        # BUD-P1 already holds the 4 fixture samples.
+        create_rows(2)
+        new = ["BUD000004", "BUD000005"]
+        self.assertRejected(self.used, new, "has 1 free wells; 2 were entered")
+
+    def test_create(self):
+        self.assertIsNone(self.post_form(self.empty, ["BUD000000", "BUD000001"]))
+        self.assertIsNone(self.post_api(self.empty, ["BUD000002"]))
+        self.assertEqual(
+            set(
+                DNAExtraction.objects.filter(plate=self.empty).values_list(
+                    "sample__sample_id", flat=True
+                )
+            ),
+            {"BUD000000", "BUD000001", "BUD000002"},
+        )
+
+
+class GenerateLabDataTests(TestCase):
+    """Generate a small, consistent synthetic data set."""
+
+    def test_bulk(self):
+        call_command(
+            "generate_lab_data",
+            samples=600,
+            studies=2,
+            sites_per_study=2,
+            seed=1,
+            prefix="GEN",
+            batch_size=250,
+            method="bulk",
+            stdout=io.StringIO(),
+        )
+        samples = Sample.objects.filter(sample_id__startswith="GEN")
+        self.assertEqual(samples.count(), 600)
+        self.assertEqual(Study.objects.filter(code__startswith="GEN").count(), 2)
+        self.assertEqual(samples.filter(storage__isnull=True).count(), 0)
+
+        extractions = DNAExtraction.objects.all()
+        plates = Plate.objects.annotate(wells=Count("dnaextraction"))
+        self.assertEqual(plates.filter(wells=0).count(), 0)
+        self.assertLessEqual(plates.aggregate(Max("wells"))["wells__max"], 96)
+        self.assertEqual(sum(plate.wells for plate in plates), extractions.count())
+        # Some samples are re-extracted, but never twice onto one plate.
+        self.assertGreater(
+            samples.annotate(n=Count("dnaextraction")).filter(n=2).count(), 0
+        )
+        self.assertFalse(
+            extractions.values("plate", "sample")
+            .annotate(n=Count("pk"))
+            .filter(n__gt=1)
+            .exists()
+        )
+        self.assertFalse(
+            extractions.filter(
+                extraction_date__lt=F("sample__collection_date")
+            ).exists()
+        )
+        self.assertFalse(
+            MolecularDiagnostic.objects.filter(
+                sample__dnaextraction__isnull=True
+            ).exists()
+        )
+
+
+class PartitioningTests(TestCase):
+    """Partition the event tables only where asked to, and show the SQL."""
+
+    def test_migration_needs_postgresql_and_opt_in(self):
+        migration = importlib.import_module(
+            "sample_tracker.migrations.0007_partition_event_tables"
+        )
+        editor = SimpleNamespace(connection=connection)
+        settings_values = [False]
+        if connection.vendor != "postgresql":
+            settings_values.append(True)
+        for enabled in settings_values:
+            with (
+                self.subTest(DB_PARTITIONING=enabled),
+                override_settings(DB_PARTITIONING=enabled),
+                CaptureQueriesContext(connection) as queries,
+            ):
+                migration.partition_event_tables(global_apps, editor)
+            self.assertEqual(len(queries), 0)
+
+    @skipIf(connection.vendor == "postgresql", "PostgreSQL partitions")
+    def test_command_needs_postgresql(self):
+        with self.assertRaisesMessage(CommandError, "needs PostgreSQL"):
+            call_command("partition_tables", dry_run=True)
+
+    @skipUnless(connection.vendor == "postgresql", "PostgreSQL only")
+    def test_dry_run(self):
+        out = io.StringIO()
+        call_command("partition_tables", dry_run=True, stdout=out)
+        sql = out.getvalue()
+        year = timezone.localdate().year
+        for statement in (
+            'ALTER TABLE "sample_tracker_storage" RENAME TO '
+            '"sample_tracker_storage_unpartitioned";',
+            'PARTITION BY RANGE ("storage_date");',
+            'CREATE TABLE "sample_tracker_qualitycheck_default" '
+            'PARTITION OF "sample_tracker_qualitycheck" DEFAULT;',
+            'ALTER TABLE "sample_tracker_moleculardiagnostic" ATTACH PARTITION '
+            f'"sample_tracker_moleculardiagnostic_y{year}" '
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01');",
+            "SELECT setval('sample_tracker_storage_id_seq', 1, false);",
+            'ADD CONSTRAINT "sample_tracker_qualitycheck_pkey" '
+            'PRIMARY KEY (id, "qc_date");',
+        ):
+            self.assertIn(statement, sql)
+        # Nothing ran.
+        with connection.cursor() as cursor:
+            for model in (Storage, QualityCheck, MolecularDiagnostic):
+                self.assertFalse(is_partitioned(cursor, model._meta.db_table))
@@ -7,6 +7,20 @@ urlpatterns = [
     path(
         "", views.DashboardView.as_view(), name="dashboard_home"
     ),  # Default route for the dashboard
+    path("status/db/", views.DatabaseStatusView.as_view(), name="database_status"),
+    # =====================
+    # Autocomplete URLs
+    # =====================
+    path(
+        "autocomplete/samples/",
+        views.SampleAutocompleteView.as_view(),
+        name="sample_autocomplete",
+    ),
+    path(
+        "autocomplete/plates/",
+        views.PlateAutocompleteView.as_view(),
+        name="plate_autocomplete",
+    ),
     # =====================
     # Address URLs
     # =====================
@@ -34,6 +48,16 @@ urlpatterns = [
     path(
         "studies/<int:pk>/delete/", views.StudyDeleteView.as_view(), name="study_delete"
     ),
+    path(
+        "studies/<int:pk>/export/<slug:dataset>.<slug:file_format>",
+        views.StudyExportView.as_view(),
+        name="study_export",
+    ),
+    path(
+        "studies/<int:pk>/archive/restore/",
+        views.StudyArchiveRestoreView.as_view(),
+        name="study_archive_restore",
+    ),
     # =====================
     # Study Site URLs
     # =====================
@@ -63,6 +87,16 @@ urlpatterns = [
     # =====================
     path("samples/", views.SampleListView.as_view(), name="sample_list"),
     path("samples/<int:pk>/", views.SampleDetailView.as_view(), name="sample_detail"),
+    path(
+        "samples/barcode/<str:sample_id>/",
+        views.SampleDetailView.as_view(),
+        name="sample_barcode",
+    ),
+    path(
+        "samples/barcode/<str:sample_id>/restore/",
+        views.SampleRestoreView.as_view(),
+        name="sample_restore",
+    ),
     path("samples/add/", views.SampleCreateView.as_view(), name="sample_create"),
     path(
         "samples/<int:pk>/edit/", views.SampleUpdateView.as_view(), name="sample_update"
@@ -73,10 +107,47 @@ urlpatterns = [
         name="sample_delete",
     ),
     # =====================
+    # Sample Import URLs
+    # =====================
+    path(
+        "samples/import/",
+        views.SampleImportCreateView.as_view(),
+        name="sample_import_create",
+    ),
+    path(
+        "samples/import/<int:pk>/",
+        views.SampleImportDetailView.as_view(),
+        name="sample_import_detail",
+    ),
+    path(
+        "samples/import/<int:pk>/status/",
+        views.SampleImportStatusView.as_view(),
+        name="sample_import_status",
+    ),
+    # =====================
+    # Deletion URLs
+    # =====================
+    path(
+        "deletions/<int:pk>/",
+        views.DeletionDetailView.as_view(),
+        name="deletion_detail",
+    ),
+    path(
+        "deletions/<int:pk>/status/",
+        views.DeletionStatusView.as_view(),
+        name="deletion_status",
+    ),
+    # =====================
     # Plate URLs
     # =====================
     path("plates/", views.PlateListView.as_view(), name="plate_list"),
+    path("plates/<int:pk>/", views.PlateDetailView.as_view(), name="plate_detail"),
     path("plates/add/", views.PlateCreateView.as_view(), name="plate_create"),
+    path(
+        "plates/<int:pk>/extractions/add/",
+        views.PlateExtractionCreateView.as_view(),
+        name="plate_extraction_create",
+    ),
     path("plates/<int:pk>/edit/", views.PlateUpdateView.as_view(), name="plate_update"),
     path(
         "plates/<int:pk>/delete/", views.PlateDeleteView.as_view(), name="plate_delete"
@@ -89,6 +160,11 @@ urlpatterns = [
         views.DNAExtractionListView.as_view(),
         name="dna_extraction_list",
     ),
+    path(
+        "dna-extractions/<int:pk>/",
+        views.DNAExtractionDetailView.as_view(),
+        name="dna_extraction_detail",
+    ),
     path(
         "dna-extractions/add/",
         views.DNAExtractionCreateView.as_view(),
@@ -112,6 +188,11 @@ urlpatterns = [
         views.MolecularDiagnosticListView.as_view(),
         name="molecular_diagnostic_list",
     ),
+    path(
+        "molecular-diagnostics/<int:pk>/",
+        views.MolecularDiagnosticDetailView.as_view(),
+        name="molecular_diagnostic_detail",
+    ),
     path(
         "molecular-diagnostics/add/",
         views.MolecularDiagnosticCreateView.as_view(),
@@ -150,6 +231,11 @@ urlpatterns = [
         views.QualityCheckListView.as_view(),
         name="quality_check_list",
     ),
+    path(
+        "quality-checks/<int:pk>/",
+        views.QualityCheckDetailView.as_view(),
+        name="quality_check_detail",
+    ),
     path(
         "quality-checks/add/",
         views.QualityCheckCreateView.as_view(),
@@ -169,6 +255,9 @@ urlpatterns = [
     # Pooling URLs
     # =====================
     path("poolings/", views.PoolingListView.as_view(), name="pooling_list"),
+    path(
+        "poolings/<int:pk>/", views.PoolingDetailView.as_view(), name="pooling_detail"
+    ),
     path("poolings/add/", views.PoolingCreateView.as_view(), name="pooling_create"),
     path(
         "poolings/<int:pk>/edit/",
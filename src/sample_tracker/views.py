@@ -1,70 +1,193 @@
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connection, transaction
 from django.db.models import Count, Q
-from django.urls import reverse_lazy
+from django.http import (
+    Http404,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.urls import reverse, reverse_lazy
 from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
+    FormView,
     ListView,
     TemplateView,
     UpdateView,
+    View,
 )
+from django.views.generic.detail import SingleObjectMixin
 
+from .archive import archived_sample, restore_samples
+from .caching import DASHBOARD_CACHE_KEY, lineage_cache_key, model_versions
+from .dbstats import connection_stats
+from .exports import EXPORT_DATASETS, EXPORT_FORMATS
+from .extractions import create_plate_extractions
 from .forms import (
     AddressForm,
     DNAExtractionForm,
     MolecularDiagnosticForm,
+    PlateExtractionForm,
     PlateForm,
     PoolingForm,
     QualityCheckForm,
     SampleForm,
+    SampleImportForm,
     StorageForm,
     StudyForm,
     StudySiteForm,
 )
+from .managers import SEARCH_MIN_LENGTH
+from .mixins import BackgroundDeleteMixin, ConditionalGetMixin, RelatedObjectsMixin
 from .models import (
     Address,
+    Archive,
+    Deletion,
     DNAExtraction,
     MolecularDiagnostic,
     Plate,
     Pooling,
     QualityCheck,
+    RollupWatermark,
     Sample,
+    SampleImport,
     Storage,
     Study,
     StudySite,
 )
+from .pagination import KeysetPaginationMixin
+from .rollups import WATERMARK as ROLLUP_WATERMARK
+from .rollups import site_summaries
+from .tasks import import_samples, restore_study_samples
 
 
 class DashboardView(TemplateView):
     template_name = "dashboard/home.html"
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-
-        # Add dynamic data for the dashboard
-        context["study_count"] = Study.objects.count()
-        context["sample_count"] = Sample.objects.count()
-        context["positive_sample_count"] = Sample.objects.filter(status="POS").count()
-        context["negative_sample_count"] = Sample.objects.filter(status="NEG").count()
+    def get_dashboard_data(self):
+        """Compute the dashboard counters with one aggregate query per table."""
+        data = {"study_count": Study.objects.count()}
+        data.update(
+            Sample.objects.aggregate(
+                sample_count=Count("id"),
+                positive_sample_count=Count("id", filter=Q(status="POS")),
+                negative_sample_count=Count("id", filter=Q(status="NEG")),
+            )
+        )
 
         # Quality Check Data
-        context["accepted_quality_count"] = QualityCheck.objects.filter(
-            status="Accepted"
-        ).count()
-        context["rejected_quality_count"] = QualityCheck.objects.filter(
-            status="Rejected"
-        ).count()
+        data.update(
+            QualityCheck.objects.aggregate(
+                accepted_quality_count=Count("id", filter=Q(status="Accepted")),
+                rejected_quality_count=Count("id", filter=Q(status="Rejected")),
+            )
+        )
 
         # Recent Samples (Limit to 5 for display)
-        context["recent_samples"] = Sample.objects.order_by("-collection_date")[:5]
+        data["recent_samples"] = list(
+            Sample.objects.select_related("study_site").order_by("-collection_date")[:5]
+        )
+
+        # Per-site breakdown, read from the rollups rather than the samples.
+        data["site_summaries"] = site_summaries()
+        data["rollups_updated_until"] = (
+            RollupWatermark.objects.filter(name=ROLLUP_WATERMARK)
+            .values_list("updated_until", flat=True)
+            .first()
+        )
+        return data
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
 
+        # Served from cache; signals drop the entry when the underlying rows
+        # change and the timeout bounds staleness from bulk writes.
+        context.update(
+            cache.get_or_set(
+                DASHBOARD_CACHE_KEY,
+                self.get_dashboard_data,
+                settings.DASHBOARD_CACHE_TIMEOUT,
+            )
+        )
         return context
 
 
+class DatabaseStatusView(View):
+    """Database health check with this worker's connection counters."""
+
+    def get(self, request, *args, **kwargs):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            status, code = "ok", 200
+        except DatabaseError:
+            status, code = "unavailable", 503
+        return JsonResponse({"status": status, **connection_stats()}, status=code)
+
+
+# =====================
+# Autocomplete Views
+# =====================
+class AutocompleteView(View):
+    """Options for an ``AutocompleteSelect`` as JSON.
+
+    Results are ordered by ``label_field``, which must be unique and
+    indexed, and paged with ``?after=<last label>`` so every page is an
+    index range scan. The response uses Semantic UI's remote dropdown format.
+    """
+
+    model = None
+    label_field = None
+    page_size = 20
+
+    def get_queryset(self, term):
+        return self.model.objects.filter(**{f"{self.label_field}__icontains": term})
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset(request.GET.get("q", "").strip())
+        after = request.GET.get("after")
+        if after:
+            queryset = queryset.filter(**{f"{self.label_field}__gt": after})
+        rows = list(
+            queryset.order_by(self.label_field).values_list("pk", self.label_field)[
+                : self.page_size + 1
+            ]
+        )
+        more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        return JsonResponse(
+            {
+                "success": True,
+                "results": [{"value": pk, "name": label} for pk, label in rows],
+                "after": rows[-1][1] if more else None,
+            }
+        )
+
+
+class SampleAutocompleteView(AutocompleteView):
+    model = Sample
+    label_field = "sample_id"
+
+    def get_queryset(self, term):
+        if len(term) < SEARCH_MIN_LENGTH:
+            return Sample.objects.filter(sample_id__istartswith=term)
+        return Sample.objects.search(term)
+
+
+class PlateAutocompleteView(AutocompleteView):
+    model = Plate
+    label_field = "plate_number"
+
+
 # =====================
 # Address Views
 # =====================
-class AddressListView(ListView):
+class AddressListView(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Address
     template_name = "address_list.html"
     context_object_name = "addresses"
@@ -93,16 +216,62 @@ class AddressDeleteView(DeleteView):
 # =====================
 # Study Views
 # =====================
-class StudyListView(ListView):
+class StudyListView(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Study
+    queryset = Study.objects.filter(pending_deletion=False)
     template_name = "sample_tracker/study/study_list.html"
     context_object_name = "studies"
 
 
-class StudyDetailView(DetailView):
+class StudyDetailView(ConditionalGetMixin, DetailView):
     model = Study
     template_name = "sample_tracker/study/study_detail.html"
     context_object_name = "study"
+    fragment_models = (Archive,)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["export_datasets"] = EXPORT_DATASETS.items()
+        context["archived_samples"] = self.object.archived_samples.count()
+        return context
+
+
+class StudyArchiveRestoreView(SingleObjectMixin, View):
+    """Queue the restore of every archived sample of a study."""
+
+    model = Study
+
+    def post(self, request, *args, **kwargs):
+        study = self.get_object()
+        transaction.on_commit(lambda: restore_study_samples.delay(study.pk))
+        messages.info(
+            request, f"Restoring the archived samples of {study} in the background."
+        )
+        return HttpResponseRedirect(
+            reverse("sample_tracker:study_detail", args=[study.pk])
+        )
+
+
+class StudyExportView(SingleObjectMixin, View):
+    """Stream one of a study's datasets as CSV or TSV."""
+
+    model = Study
+
+    def get(self, request, *args, **kwargs):
+        dataset = EXPORT_DATASETS.get(kwargs["dataset"])
+        if dataset is None or kwargs["file_format"] not in EXPORT_FORMATS:
+            raise Http404("Unknown export.")
+        delimiter, content_type = EXPORT_FORMATS[kwargs["file_format"]]
+
+        study = self.get_object()
+        filename = (
+            f"{study.code or study.pk}-{kwargs['dataset']}.{kwargs['file_format']}"
+        )
+        response = StreamingHttpResponse(
+            dataset.stream(study, delimiter), content_type=content_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
 
 
 class StudyCreateView(CreateView):
@@ -129,7 +298,7 @@ class StudyUpdateView(UpdateView):
         return context
 
 
-class StudyDeleteView(DeleteView):
+class StudyDeleteView(BackgroundDeleteMixin, DeleteView):
     model = Study
     template_name = "sample_tracker/study/confirm_delete.html"
     success_url = reverse_lazy("sample_tracker:study_list")
@@ -138,16 +307,21 @@ class StudyDeleteView(DeleteView):
 # =====================
 # Study Site Views
 # =====================
-class StudySiteListView(ListView):
+class StudySiteListView(
+    ConditionalGetMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView
+):
     model = StudySite
+    queryset = StudySite.objects.filter(pending_deletion=False)
     template_name = "sample_tracker/study-site/study_site_list.html"
     context_object_name = "study_sites"
+    select_related = ("study",)
 
 
-class StudySiteDetailView(DetailView):
+class StudySiteDetailView(ConditionalGetMixin, RelatedObjectsMixin, DetailView):
     model = StudySite
     template_name = "sample_tracker/study-site/study_site_detail.html"
     context_object_name = "study_site"
+    select_related = ("study", "address")
 
 
 class StudySiteCreateView(CreateView):
@@ -174,25 +348,124 @@ class StudySiteUpdateView(UpdateView):
         return context
 
 
-class StudySiteDeleteView(DeleteView):
+class StudySiteDeleteView(BackgroundDeleteMixin, DeleteView):
     model = StudySite
-    template_name = "confirm_delete.html"
+    template_name = "sample_tracker/study-site/confirm_delete.html"
     success_url = reverse_lazy("sample_tracker:study_site_list")
 
 
 # =====================
 # Sample Views
 # =====================
-class SampleListView(ListView):
+class SampleListView(
+    ConditionalGetMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView
+):
     model = Sample
     template_name = "sample_tracker/sample/sample_list.html"
     context_object_name = "samples"
+    keyset_ordering = ("-collection_date", "-id")
+    select_related = ("study_site",)
+    only_fields = (
+        "sample_id",
+        "sample_type",
+        "collection_date",
+        "status",
+        "study_site__name",
+    )
+
+    def get_queryset(self):
+        return super().get_queryset().search(self.request.GET.get("q"))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.request.GET.get("q", "")
+        return context
 
 
-class SampleDetailView(DetailView):
+class SampleDetailView(ConditionalGetMixin, DetailView):
+    """A sample with its full lineage, addressed by pk or by barcode."""
+
     model = Sample
-    template_name = "ssample_tracker/ample/sample_detail.html"
+    template_name = "sample_tracker/sample/sample_detail.html"
     context_object_name = "sample"
+    queryset = Sample.objects.with_lineage()
+    fragment_models = (
+        StudySite,
+        DNAExtraction,
+        Plate,
+        MolecularDiagnostic,
+        Storage,
+        QualityCheck,
+        Archive,
+    )
+    archive = None
+
+    def get_object(self, queryset=None):
+        if "sample_id" in self.kwargs:
+            pk = (
+                Sample.objects.filter(sample_id=self.kwargs["sample_id"])
+                .values_list("pk", flat=True)
+                .first()
+            )
+            if pk is None:
+                return self.get_archived_object(sample_id=self.kwargs["sample_id"])
+            self.kwargs["pk"] = pk
+
+        # The cached sample carries its study site, which no sample signal
+        # covers; an entry cached under another site version is stale.
+        key = lineage_cache_key(self.kwargs["pk"])
+        site_version = model_versions(StudySite)
+        cached = cache.get(key)
+        if cached is not None and cached[0] == site_version:
+            return cached[1]
+        try:
+            sample = super().get_object(queryset)
+        except Http404:
+            return self.get_archived_object(sample_pk=self.kwargs["pk"])
+        cache.set(key, (site_version, sample), settings.LINEAGE_CACHE_TIMEOUT)
+        return sample
+
+    def get_archived_object(self, **lookup):
+        """Read a sample missing from the hot tables from the archive."""
+        self.archive = (
+            Archive.objects.select_related("study_site").filter(**lookup).first()
+        )
+        if self.archive is None:
+            raise Http404("No sample found matching the query.")
+        return archived_sample(self.archive)
+
+    def get_last_modified(self):
+        if self.archive is not None:
+            return self.archive.updated_at
+        return super().get_last_modified()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["archive"] = self.archive
+        return context
+
+
+class SampleRestoreView(SingleObjectMixin, View):
+    """Move an archived sample back into the hot tables."""
+
+    model = Archive
+    slug_field = "sample_id"
+    slug_url_kwarg = "sample_id"
+
+    def post(self, request, *args, **kwargs):
+        archive = self.get_object()
+        try:
+            restore_samples([archive])
+        except ValidationError as exc:
+            for message in exc.messages:
+                messages.error(request, message)
+            return HttpResponseRedirect(
+                reverse("sample_tracker:sample_barcode", args=[archive.sample_id])
+            )
+        messages.success(request, f"Restored sample {archive.sample_id}.")
+        return HttpResponseRedirect(
+            reverse("sample_tracker:sample_detail", args=[archive.sample_pk])
+        )
 
 
 class SampleCreateView(CreateView):
@@ -225,15 +498,146 @@ class SampleDeleteView(DeleteView):
     success_url = reverse_lazy("sample_list")
 
 
+# =====================
+# Sample Import Views
+# =====================
+class SampleImportCreateView(CreateView):
+    model = SampleImport
+    form_class = SampleImportForm
+    template_name = "sample_tracker/sample-import/sample_import_form.html"
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        import_id = self.object.pk
+        transaction.on_commit(lambda: import_samples.delay(import_id))
+        return response
+
+    def get_success_url(self):
+        return reverse("sample_tracker:sample_import_detail", args=[self.object.pk])
+
+
+class SampleImportDetailView(DetailView):
+    model = SampleImport
+    template_name = "sample_tracker/sample-import/sample_import_detail.html"
+    context_object_name = "sample_import"
+    queryset = SampleImport.objects.defer("manifest")
+
+
+class SampleImportStatusView(SingleObjectMixin, View):
+    """Progress of an import as JSON, polled by the detail page."""
+
+    queryset = SampleImport.objects.defer("manifest", "errors")
+
+    def get(self, request, *args, **kwargs):
+        sample_import = self.get_object()
+        return JsonResponse(
+            {
+                "status": sample_import.status,
+                "progress": sample_import.progress,
+                "total_rows": sample_import.total_rows,
+                "processed_rows": sample_import.processed_rows,
+                "created_rows": sample_import.created_rows,
+                "finished": sample_import.is_finished,
+            }
+        )
+
+
+# =====================
+# Deletion Views
+# =====================
+class DeletionDetailView(DetailView):
+    model = Deletion
+    template_name = "sample_tracker/deletion/deletion_detail.html"
+    context_object_name = "deletion"
+    list_urls = {
+        "sample_tracker.study": "sample_tracker:study_list",
+        "sample_tracker.studysite": "sample_tracker:study_site_list",
+    }
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["list_url"] = reverse(self.list_urls[self.object.object_label])
+        return context
+
+
+class DeletionStatusView(SingleObjectMixin, View):
+    """Progress of a background deletion as JSON, polled by its page."""
+
+    model = Deletion
+
+    def get(self, request, *args, **kwargs):
+        deletion = self.get_object()
+        return JsonResponse(
+            {
+                "status": deletion.status,
+                "progress": deletion.progress,
+                "total_rows": deletion.total_rows,
+                "deleted_rows": deletion.deleted_rows,
+                "finished": deletion.is_finished,
+            }
+        )
+
+
 # =====================
 # Plate Views
 # =====================
-class PlateListView(ListView):
+class PlateListView(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Plate
-    template_name = "plate/plate_list.html"
+    template_name = "sample_tracker/plate/plate_list.html"
     context_object_name = "plates"
 
 
+class PlateDetailView(ConditionalGetMixin, DetailView):
+    model = Plate
+    template_name = "sample_tracker/plate/plate_detail.html"
+    context_object_name = "plate"
+    fragment_models = (DNAExtraction, Sample)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Bounded by the plate size, so no pagination is needed.
+        context["extractions"] = (
+            self.object.dnaextraction_set.select_related("sample")
+            .only("plate", "extraction_date", "expert_initials", "sample__sample_id")
+            .order_by("id")
+        )
+        return context
+
+
+class PlateExtractionCreateView(SingleObjectMixin, FormView):
+    """Record the DNA extractions of a whole plate in one request."""
+
+    model = Plate
+    form_class = PlateExtractionForm
+    template_name = "sample_tracker/plate/plate_extraction_form.html"
+    context_object_name = "plate"
+
+    def dispatch(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["plate"] = self.object
+        return kwargs
+
+    def form_valid(self, form):
+        extractions = create_plate_extractions(
+            self.object,
+            form.cleaned_data["extraction_date"],
+            form.cleaned_data["expert_initials"],
+            form.sample_pks,
+        )
+        messages.success(
+            self.request,
+            f"Recorded {len(extractions)} DNA extractions on plate {self.object}.",
+        )
+        return super().form_valid(form)
+
+    def get_success_url(self):
+        return reverse("sample_tracker:plate_detail", args=[self.object.pk])
+
+
 class PlateCreateView(CreateView):
     model = Plate
     form_class = PlateForm
@@ -267,23 +671,28 @@ class PlateDeleteView(DeleteView):
 # =====================
 # DNA Extraction Views
 # =====================
-class DNAExtractionListView(ListView):
+class DNAExtractionListView(
+    ConditionalGetMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView
+):
     model = DNAExtraction
-    template_name = "dna-extraction/dna_extraction_list.html"
+    template_name = "sample_tracker/dna-extraction/dna_exctraction_list.html"
     context_object_name = "dna_extractions"
+    keyset_ordering = ("-extraction_date", "-id")
+    select_related = ("sample", "plate")
 
 
-class DNAExtractionDetailView(DetailView):
+class DNAExtractionDetailView(ConditionalGetMixin, RelatedObjectsMixin, DetailView):
     model = DNAExtraction
-    template_name = "dna-extraction/dna_extraction_detail.html"
+    template_name = "sample_tracker/dna-extraction/dna_exctraction_detail.html"
     context_object_name = "dna_extraction"
+    select_related = ("sample", "plate")
 
 
 class DNAExtractionCreateView(CreateView):
     model = DNAExtraction
     form_class = DNAExtractionForm
-    template_name = "dna-extraction/dna_extraction_form.html"
-    success_url = reverse_lazy("dna_extraction_list")
+    template_name = "sample_tracker/dna-extraction/dna_extraction_form.html"
+    success_url = reverse_lazy("sample_tracker:dna_extraction_list")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -294,8 +703,8 @@ class DNAExtractionCreateView(CreateView):
 class DNAExtractionUpdateView(UpdateView):
     model = DNAExtraction
     form_class = DNAExtractionForm
-    template_name = "dna-extraction/dna_extraction_form.html"
-    success_url = reverse_lazy("dna_extraction_list")
+    template_name = "sample_tracker/dna-extraction/dna_extraction_form.html"
+    success_url = reverse_lazy("sample_tracker:dna_extraction_list")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -303,32 +712,42 @@ class DNAExtractionUpdateView(UpdateView):
         return context
 
 
-class DNAExtractionDeleteView(DeleteView):
+class DNAExtractionDeleteView(RelatedObjectsMixin, DeleteView):
     model = DNAExtraction
     template_name = "dna-extraction/confirm_delete.html"
     success_url = reverse_lazy("dna_extraction_list")
+    select_related = ("sample",)
 
 
 # =====================
 # Molecular Diagnostics Views
 # =====================
-class MolecularDiagnosticListView(ListView):
+class MolecularDiagnosticListView(
+    ConditionalGetMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView
+):
     model = MolecularDiagnostic
-    template_name = "molecular-diagnostic/molecular_diagnostic_list.html"
+    template_name = "sample_tracker/molecular-diagnostic/molecular_diagnostic_list.html"
     context_object_name = "molecular_diagnostics"
+    keyset_ordering = ("-processing_date", "-id")
+    select_related = ("sample",)
 
 
-class MolecularDiagnosticDetailView(DetailView):
+class MolecularDiagnosticDetailView(
+    ConditionalGetMixin, RelatedObjectsMixin, DetailView
+):
     model = MolecularDiagnostic
-    template_name = "molecular-diagnostic/molecular_diagnostic_detail.html"
+    template_name = (
+        "sample_tracker/molecular-diagnostic/molecular_diagnostic_detail.html"
+    )
     context_object_name = "molecular_diagnostic"
+    select_related = ("sample",)
 
 
 class MolecularDiagnosticCreateView(CreateView):
     model = MolecularDiagnostic
     form_class = MolecularDiagnosticForm
-    template_name = "molecular-diagnostic/molecular_diagnostic_form.html"
-    success_url = reverse_lazy("molecular_diagnostic_list")
+    template_name = "sample_tracker/molecular-diagnostic/molecular_diagnostic_form.html"
+    success_url = reverse_lazy("sample_tracker:molecular_diagnostic_list")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -339,8 +758,8 @@ class MolecularDiagnosticCreateView(CreateView):
 class MolecularDiagnosticUpdateView(UpdateView):
     model = MolecularDiagnostic
     form_class = MolecularDiagnosticForm
-    template_name = "molecular-diagnostic/molecular_diagnostic_form.html"
-    success_url = reverse_lazy("molecular_diagnostic_list")
+    template_name = "sample_tracker/molecular-diagnostic/molecular_diagnostic_form.html"
+    success_url = reverse_lazy("sample_tracker:molecular_diagnostic_list")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -348,26 +767,31 @@ class MolecularDiagnosticUpdateView(UpdateView):
         return context
 
 
-class MolecularDiagnosticDeleteView(DeleteView):
+class MolecularDiagnosticDeleteView(RelatedObjectsMixin, DeleteView):
     model = MolecularDiagnostic
     template_name = "molecular-diagnostic/confirm_delete.html"
     success_url = reverse_lazy("molecular_diagnostic_list")
+    select_related = ("sample",)
 
 
 # =====================
 # Storage Views
 # =====================
-class StorageListView(ListView):
+class StorageListView(
+    ConditionalGetMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView
+):
     model = Storage
-    template_name = "storage/storage_list.html"
+    template_name = "sample_tracker/storage/storage_list.html"
     context_object_name = "storages"
+    keyset_ordering = ("-storage_date", "-id")
+    select_related = ("sample",)
 
 
 class StorageCreateView(CreateView):
     model = Storage
     form_class = StorageForm
-    template_name = "storage/storage_form.html"
-    success_url = reverse_lazy("storage_list")
+    template_name = "sample_tracker/storage/storage_form.html"
+    success_url = reverse_lazy("sample_tracker:storage_list")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -378,8 +802,8 @@ class StorageCreateView(CreateView):
 class StorageUpdateView(UpdateView):
     model = Storage
     form_class = StorageForm
-    template_name = "storage/storage_form.html"
-    success_url = reverse_lazy("storage_list")
+    template_name = "sample_tracker/storage/storage_form.html"
+    success_url = reverse_lazy("sample_tracker:storage_list")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -387,32 +811,38 @@ class StorageUpdateView(UpdateView):
         return context
 
 
-class StorageDeleteView(DeleteView):
+class StorageDeleteView(RelatedObjectsMixin, DeleteView):
     model = Storage
     template_name = "storage/confirm_delete.html"
     success_url = reverse_lazy("storage_list")
+    select_related = ("sample",)
 
 
 # =====================
 # Quality Check Views
 # =====================
-class QualityCheckListView(ListView):
+class QualityCheckListView(
+    ConditionalGetMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView
+):
     model = QualityCheck
-    template_name = "quality-check/quality_check_list.html"
+    template_name = "sample_tracker/quality-check/quality_check_list.html"
     context_object_name = "quality_checks"
+    keyset_ordering = ("-qc_date", "-id")
+    select_related = ("sample",)
 
 
-class QualityCheckDetailView(DetailView):
+class QualityCheckDetailView(ConditionalGetMixin, RelatedObjectsMixin, DetailView):
     model = QualityCheck
-    template_name = "quality-check/quality_check_detail.html"
+    template_name = "sample_tracker/quality-check/quality_check_detail.html"
     context_object_name = "quality_check"
+    select_related = ("sample",)
 
 
 class QualityCheckCreateView(CreateView):
     model = QualityCheck
     form_class = QualityCheckForm
-    template_name = "quality-check/quality_check_form.html"
-    success_url = reverse_lazy("quality_check_list")
+    template_name = "sample_tracker/quality-check/quality_check_form.html"
+    success_url = reverse_lazy("sample_tracker:quality_check_list")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -423,8 +853,8 @@ class QualityCheckCreateView(CreateView):
 class QualityCheckUpdateView(UpdateView):
     model = QualityCheck
     form_class = QualityCheckForm
-    template_name = "quality-check/quality_check_form.html"
-    success_url = reverse_lazy("quality_check_list")
+    template_name = "sample_tracker/quality-check/quality_check_form.html"
+    success_url = reverse_lazy("sample_tracker:quality_check_list")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -432,32 +862,38 @@ class QualityCheckUpdateView(UpdateView):
         return context
 
 
-class QualityCheckDeleteView(DeleteView):
+class QualityCheckDeleteView(RelatedObjectsMixin, DeleteView):
     model = QualityCheck
     template_name = "quality-check/confirm_delete.html"
     success_url = reverse_lazy("quality_check_list")
+    select_related = ("sample",)
 
 
 # =====================
 # Pooling Views
 # =====================
-class PoolingListView(ListView):
+class PoolingListView(
+    ConditionalGetMixin, RelatedObjectsMixin, KeysetPaginationMixin, ListView
+):
     model = Pooling
-    template_name = "pooling/pooling_list.html"
+    template_name = "sample_tracker/pooling/pooling_list.html"
     context_object_name = "poolings"
+    keyset_ordering = ("-pooling_date", "-id")
+    select_related = ("capture_plate",)
 
 
-class PoolingDetailView(DetailView):
+class PoolingDetailView(ConditionalGetMixin, RelatedObjectsMixin, DetailView):
     model = Pooling
-    template_name = "pooling/pooling_detail.html"
+    template_name = "sample_tracker/pooling/pooling_detail.html"
     context_object_name = "pooling"
+    select_related = ("capture_plate",)
 
 
 class PoolingCreateView(CreateView):
     model = Pooling
     form_class = PoolingForm
-    template_name = "pooling/pooling_form.html"
-    success_url = reverse_lazy("pooling_list")
+    template_name = "sample_tracker/pooling/pooling_form.html"
+    success_url = reverse_lazy("sample_tracker:pooling_list")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -468,8 +904,8 @@ class PoolingCreateView(CreateView):
 class PoolingUpdateView(UpdateView):
     model = Pooling
     form_class = PoolingForm
-    template_name = "pooling/pooling_form.html"
-    success_url = reverse_lazy("pooling_list")
+    template_name = "sample_tracker/pooling/pooling_form.html"
+    success_url = reverse_lazy("sample_tracker:pooling_list")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)